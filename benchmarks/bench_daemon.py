@@ -0,0 +1,111 @@
+"""
+Compares `tdf done` run directly against the same command sent to a daemon.
+
+Seeds a throwaway HOME with one space, then times `tdf done`/`tdf undo` on the
+same todo three ways: a direct run (``python -m todoforge.main``), a thin
+client process forwarding to a warm ``tdf daemon`` (``python -m
+todoforge.client``), and the daemon round trip alone, sent from this process.
+An empty interpreter start is timed too, as the floor for both process runs.
+
+Usage:
+    python -m benchmarks.bench_daemon [--runs 20] [--todos 1000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from todoforge import client
+
+
+def _seed_home(home: Path, todos: int) -> str:
+    folder = home / ".config" / "todoforge"
+    folder.mkdir(parents=True)
+    (folder / "config.json").write_text(
+        json.dumps({"current_space": "bench", "spaces": ["bench"]})
+    )
+    ids = [f"{i:040x}" for i in range(todos)]
+    (folder / "bench_todo.json").write_text(
+        json.dumps(
+            {
+                "todos": [
+                    {"done": False, "id": todo_id, "title": f"Task {i}"}
+                    for i, todo_id in enumerate(ids)
+                ]
+            }
+        )
+    )
+    return ids[-1]
+
+
+def _time_processes(args: list[str], todo_id: str, env: dict, runs: int) -> float:
+    timings = []
+    for i in range(runs):
+        command = ["done" if i % 2 == 0 else "undo", todo_id]
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args, *command], env=env, check=True, capture_output=True
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _time_round_trips(socket_path: str, todo_id: str, runs: int) -> float:
+    timings = []
+    for i in range(runs):
+        command = ["done" if i % 2 == 0 else "undo", todo_id]
+        start = time.perf_counter()
+        reply = client.run_command(command, socket_path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert reply is not None and reply["code"] == 0, reply
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--todos", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        todo_id = _seed_home(home, args.todos)[:12]
+        env = {**os.environ, "HOME": str(home)}
+        socket_path = str(home / ".config" / "todoforge" / "daemon.sock")
+
+        interpreter = _time_processes(["-c", "pass"], todo_id, env, args.runs)
+        direct = _time_processes(["-m", "todoforge.main"], todo_id, env, args.runs)
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "todoforge.main", "daemon"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            while client.request({"op": "ping"}, socket_path) is None:
+                time.sleep(0.05)
+            _time_round_trips(socket_path, todo_id, 3)
+
+            forwarded = _time_processes(
+                ["-m", "todoforge.client"], todo_id, env, args.runs
+            )
+            round_trip = _time_round_trips(socket_path, todo_id, args.runs)
+        finally:
+            client.request({"op": "stop"}, socket_path)
+            daemon.wait(timeout=10)
+
+    print(f"{'path':<32}{'median (ms)':>12}")
+    print(f"{'empty interpreter start':<32}{interpreter:>12.1f}")
+    print(f"{'tdf done, direct':<32}{direct:>12.1f}")
+    print(f"{'tdf done, client + daemon':<32}{forwarded:>12.1f}")
+    print(f"{'daemon round trip only':<32}{round_trip:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
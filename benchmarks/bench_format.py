@@ -0,0 +1,72 @@
+"""
+Compares the json and compact space formats on a large space.
+
+Seeds one space through a JsonBackend, then for each format reports the size of
+the snapshot, the time to load the whole space and the time to list its first
+open todos, as `tdf ls --limit` does. The file cache is cleared before every
+run so each one reads the snapshot again.
+
+Usage:
+    python -m benchmarks.bench_format [--todos 100000] [--limit 50] [--repeat 10]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.config import todo_config
+
+
+def _time_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        todo_config.clear_cache()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        backend = JsonBackend(root)
+        backend.save(
+            "bench",
+            {
+                "todos": [
+                    {
+                        "created_at": "2024-01-01T00:00:00+00:00",
+                        "done": i % 3 == 0,
+                        "id": f"{i:040x}",
+                        "title": f"Task number {i}",
+                    }
+                    for i in range(args.todos)
+                ]
+            },
+        )
+
+        print(f"{'format':<10}{'size (KB)':>12}{'load (ms)':>12}{'ls -n (ms)':>12}")
+        for space_format in ("json", "compact"):
+            backend.convert_space("bench", space_format)
+            size = backend._snapshot_filepath("bench").stat().st_size / 1024
+            load = _time_ms(lambda: backend.load("bench"), args.repeat)
+            first = _time_ms(
+                lambda: list(islice(backend.iter_todos("bench"), args.limit)),
+                args.repeat,
+            )
+            print(f"{space_format:<10}{size:>12.0f}{load:>12.1f}{first:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures the per-operation overhead of the space file locks.
+
+Runs the same `done`-style update against a JsonBackend with and without the
+``fcntl`` lock and prints the mean cost of each, plus the cost of a bare
+lock/unlock cycle.
+
+Usage:
+    python -m benchmarks.bench_locking [--ops 2000]
+"""
+
+import argparse
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.locking import file_lock
+
+
+@contextmanager
+def _no_lock(filepath):
+    yield
+
+
+def _time_updates(root: Path, ops: int) -> float:
+    backend = JsonBackend(root)
+    backend.create_space("bench")
+    backend.add(
+        "bench",
+        [{"done": False, "id": f"{i:08x}", "title": f"Task {i}"} for i in range(1000)],
+    )
+
+    start = time.perf_counter()
+    for i in range(ops):
+        backend.update("bench", [f"{i % 1000:08x}"], {"done": i % 2 == 0})
+    return (time.perf_counter() - start) / ops
+
+
+def _time_bare_lock(root: Path, ops: int) -> float:
+    lockfile = root / "bench_todo.lock"
+    start = time.perf_counter()
+    for _ in range(ops):
+        with file_lock(lockfile):
+            pass
+    return (time.perf_counter() - start) / ops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as locked, tempfile.TemporaryDirectory() as unlocked:
+        with_lock = _time_updates(Path(locked), args.ops)
+        with patch("todoforge.utils.backends.jsonfile.file_lock", _no_lock):
+            without_lock = _time_updates(Path(unlocked), args.ops)
+        bare_lock = _time_bare_lock(Path(locked), args.ops)
+
+    print(f"{'operation':<24}{'mean (us/op)':>14}")
+    print(f"{'update without lock':<24}{without_lock * 1e6:>14.1f}")
+    print(f"{'update with lock':<24}{with_lock * 1e6:>14.1f}")
+    print(f"{'bare lock/unlock':<24}{bare_lock * 1e6:>14.1f}")
+    print(f"{'locking overhead':<24}{(with_lock - without_lock) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares ways of loading a large space into memory.
+
+Seeds a JSON snapshot with deterministic todos, then loads it as plain dicts
+(what ``get_todos()`` returns), validated into ``TodoModel`` instances, and
+validated into slotted ``TodoRecord``s. Load times are the median of several
+runs; memory is what the loaded todos still hold once loading is done, as
+measured by ``tracemalloc`` on a separate run.
+
+Usage:
+    python -m benchmarks.bench_records [--todos 1000000] [--repeat 3]
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from todoforge.utils.models import TODO_LIST_ADAPTER, load_records
+
+
+def _snapshot(todos: int) -> bytes:
+    return json.dumps(
+        {
+            "todos": [
+                {
+                    "created_at": "2024-01-01T00:00:00+00:00",
+                    "done": i % 3 == 0,
+                    "id": f"{i:026x}",
+                    "title": f"Task number {i}",
+                }
+                for i in range(todos)
+            ]
+        },
+        sort_keys=True,
+        indent=4,
+    ).encode("utf-8")
+
+
+def _time_s(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _retained_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        loaded = fn()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del loaded
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = _snapshot(args.todos)
+    loaders = {
+        "dicts": lambda: json.loads(data)["todos"],
+        "TodoModel": lambda: TODO_LIST_ADAPTER.validate_python(
+            json.loads(data)["todos"]
+        ),
+        "TodoRecord": lambda: load_records(json.loads(data)["todos"]),
+    }
+
+    print(f"{args.todos} todos, {len(data) / 1024 / 1024:.0f}MB snapshot")
+    print(f"{'loaded as':<12}{'load (s)':>10}{'bytes/todo':>12}")
+    for name, loader in loaders.items():
+        seconds = _time_s(loader, args.repeat)
+        per_todo = _retained_bytes(loader) / args.todos
+        print(f"{name:<12}{seconds:>10.2f}{per_todo:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Measures full-text search latency over many todos spread across spaces.
+
+Seeds the spaces with deterministic titles through a JsonBackend, builds their
+search indexes, then times single-term, prefix and multi-term queries against
+the current space and across every space, before and after logging changes.
+
+Usage:
+    python -m benchmarks.bench_search [--todos 100000] [--spaces 10] [--repeat 20]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.search import SearchIndex, parse_query
+
+WORDS = (
+    "fix write review report deploy release update refactor test docs plan "
+    "design invoice call email meeting budget backup migrate upgrade clean "
+    "database server client api cache index query search login payment"
+).split()
+
+QUERIES = ("report", "rep*", "fix database", "re* api", "nonexistent")
+
+
+def _seed(root: Path, todos: int, spaces: int) -> list[str]:
+    rng = random.Random(0)
+    backend = JsonBackend(root)
+    names = [f"space{i}" for i in range(spaces)]
+    for s, name in enumerate(names):
+        backend.save(
+            name,
+            {
+                "todos": [
+                    {
+                        "done": False,
+                        "id": f"{s:04x}{i:08x}",
+                        "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))),
+                    }
+                    for i in range(todos // spaces)
+                ]
+            },
+        )
+    return names
+
+
+def _time_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _report(label: str, indexes: list[SearchIndex], repeat: int) -> None:
+    print(f"\n{label}")
+    print(f"{'query':<16}{'matches':>10}{'space (ms)':>12}{'all (ms)':>12}")
+    for query in QUERIES:
+        terms = parse_query(query)
+        matches = sum(len(index.search(terms)) for index in indexes)
+        one = _time_ms(lambda: indexes[0].search(terms), repeat)
+        every = _time_ms(lambda: [index.search(terms) for index in indexes], repeat)
+        print(f"{query:<16}{matches:>10}{one:>12.2f}{every:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--spaces", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        backend = JsonBackend(root)
+        names = _seed(root, args.todos, args.spaces)
+
+        start = time.perf_counter()
+        indexes = []
+        for name in names:
+            index = SearchIndex(root, name)
+            index.build(backend.load(name)["todos"])
+            indexes.append(index)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"built {len(indexes)} indexes over {args.todos} todos in {build_ms:.0f}ms"
+        )
+
+        _report("fresh segments", indexes, args.repeat)
+
+        start = time.perf_counter()
+        for i in range(200):
+            indexes[0].add([{"id": f"new{i:08x}", "title": f"report backup {i}"}])
+        add_us = (time.perf_counter() - start) / 200 * 1e6
+        print(f"\nincremental add: {add_us:.0f}us per todo")
+
+        _report("after 200 logged adds", indexes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
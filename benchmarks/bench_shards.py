@@ -0,0 +1,92 @@
+"""
+Compares the bytes `tdf done` and `tdf edit` write for each space format.
+
+Seeds one large space through a JsonBackend, then for each format runs a stream
+of edits, alternating marking a todo done and changing its title, on either the
+most recent todos or todos picked at random. Every edit only appends to the
+operation log, so the bytes that matter are those of the compactions the log
+triggers once it grows past its threshold; the mean includes them and the max
+is the edit that paid for one.
+
+Usage:
+    python -m benchmarks.bench_shards [--todos 100000] [--edits 5000] [--seed 0]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from todoforge.utils import profiling
+from todoforge.utils.backends import JsonBackend
+
+FORMATS = ("json", "compact", "sharded")
+
+
+def _edit(backend: JsonBackend, todo_id: str, i: int) -> int:
+    """Applies one edit and returns the bytes it wrote."""
+    profiler = profiling.start()
+    try:
+        if i % 2:
+            backend.update("bench", [todo_id], {"title": f"Edited task {i}"})
+        else:
+            backend.update("bench", [todo_id], {"done": True})
+    finally:
+        profiling.stop()
+    return profiler.command.bytes_written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ids = [f"{i:040x}" for i in range(args.todos)]
+    workloads = {
+        "recent": [ids[-1 - i % 100] for i in range(args.edits)],
+        "random": random.Random(args.seed).choices(ids, k=args.edits),
+    }
+
+    print(
+        f"{'format':<10}{'workload':<10}{'mean (KB)':>12}{'max (KB)':>12}"
+        f"{'edit (ms)':>12}"
+    )
+    for space_format in FORMATS:
+        for workload, todo_ids in workloads.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                backend = JsonBackend(Path(tmp))
+                backend.save(
+                    "bench",
+                    {
+                        "todos": [
+                            {
+                                "created_at": "2024-01-01T00:00:00+00:00",
+                                "done": False,
+                                "id": todo_id,
+                                "title": f"Task number {i}",
+                            }
+                            for i, todo_id in enumerate(ids)
+                        ]
+                    },
+                )
+                backend.convert_space("bench", space_format)
+
+                start = time.perf_counter()
+                written = [
+                    _edit(backend, todo_id, i) for i, todo_id in enumerate(todo_ids)
+                ]
+                elapsed = (time.perf_counter() - start) * 1000 / len(todo_ids)
+
+            print(
+                f"{space_format:<10}{workload:<10}"
+                f"{statistics.mean(written) / 1024:>12.2f}"
+                f"{max(written) / 1024:>12.0f}{elapsed:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Measures the cold start of every `tdf` subcommand.
+
+Each subcommand is run in a fresh interpreter with ``python -X importtime``
+against a throwaway HOME holding a small space. The wall time and the total
+import time are recorded per subcommand and checked against the regression
+budget in ``startup_budget.json``, together with a list of modules that the
+subcommand must not import at all.
+
+The budgets are set in ms on a machine where the reference, an interpreter
+that only imports typer, takes the ``reference`` times of the budget file. The
+reference is measured here too, right before every run, and the budgets are
+scaled by how much slower it is, so they hold on slower or busier machines.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--output results.json] [--check]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BUDGET_FILE = Path(__file__).with_name("startup_budget.json")
+
+TODO_ID = "0123456789abcdef0123456789abcdef01234567"
+
+REFERENCE = ["-c", "import typer"]
+
+COMMANDS = {
+    "help": ["--help"],
+    "ls": ["ls"],
+    "add": ["add", "benchmark task"],
+    "done": ["done", TODO_ID[:8]],
+    "undo": ["undo", TODO_ID[:8]],
+    "spaces ls": ["spaces", "ls"],
+}
+
+
+def _seed_home(home: Path) -> None:
+    folder = home / ".config" / "todoforge"
+    folder.mkdir(parents=True)
+    (folder / "config.json").write_text(
+        json.dumps({"current_space": "bench", "spaces": ["bench"]})
+    )
+    (folder / "bench_todo.json").write_text(
+        json.dumps({"todos": [{"done": False, "id": TODO_ID, "title": "Task"}]})
+    )
+
+
+def _parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    """Returns the total import time in ms and the names of imported modules."""
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def run_command(args: list[str], home: Path) -> tuple[float, float, set[str]]:
+    return run_python(["-m", "todoforge.main", *args], home)
+
+
+def run_python(args: list[str], home: Path) -> tuple[float, float, set[str]]:
+    env = {**os.environ, "HOME": str(home), "COLUMNS": "120"}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_ms, modules = _parse_importtime(result.stderr)
+    return wall_ms, import_ms, modules
+
+
+def measure(runs: int) -> dict:
+    results = {}
+    reference_walls, reference_imports = [], []
+    for name, args in COMMANDS.items():
+        walls, imports, modules = [], [], set()
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as home:
+                _seed_home(Path(home))
+                # Run next to the command, so both see the same load.
+                wall_ms, import_ms, _ = run_python(REFERENCE, Path(home))
+                reference_walls.append(wall_ms)
+                reference_imports.append(import_ms)
+                wall_ms, import_ms, imported = run_command(args, Path(home))
+            walls.append(wall_ms)
+            imports.append(import_ms)
+            modules |= imported
+        results[name] = {
+            "wall_ms": round(statistics.median(walls), 2),
+            "import_ms": round(statistics.median(imports), 2),
+            "modules": sorted(modules),
+        }
+    results["reference"] = {
+        "wall_ms": round(statistics.median(reference_walls), 2),
+        "import_ms": round(statistics.median(reference_imports), 2),
+        "modules": [],
+    }
+    return results
+
+
+def check(results: dict, budget: dict) -> list[str]:
+    failures = []
+    # Budgets are only ever loosened, so a fast machine does not fail on noise.
+    scale = {
+        metric: max(1.0, results["reference"][metric] / budget["reference"][metric])
+        for metric in ("wall_ms", "import_ms")
+    }
+    for name, result in results.items():
+        if name == "reference":
+            continue
+        limits = budget["commands"].get(name, budget["default"])
+        for metric in ("wall_ms", "import_ms"):
+            limit = limits[metric] * scale[metric]
+            if result[metric] > limit:
+                failures.append(
+                    f"{name}: {metric} {result[metric]:.1f} > budget {limit:.1f}"
+                )
+        forbidden = set(limits.get("forbidden_modules", [])) & set(result["modules"])
+        if forbidden:
+            failures.append(f"{name}: imports {', '.join(sorted(forbidden))}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument(
+        "--check", action="store_true", help="Fail if a budget is exceeded"
+    )
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+
+    print(f"{'command':<12}{'wall (ms)':>12}{'imports (ms)':>14}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['wall_ms']:>12.1f}{result['import_ms']:>14.1f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.check:
+        failures = check(results, json.loads(BUDGET_FILE.read_text()))
+        for failure in failures:
+            print(f"over budget: {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Deterministic generator of large todoforge homes for benchmarks.
+
+The same arguments always produce the same spaces, ids and titles, so results
+from different machines and commits compare like for like. Todos get
+time-ordered ids spread over the year before `START`, about a third of them are
+done, and titles are drawn from a small vocabulary so search has realistic hits.
+
+Usage:
+    python -m benchmarks.generate HOME [--todos 100000] [--spaces 20] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from todoforge.utils.ids import format_id
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+SPAN = timedelta(days=365)
+DONE_RATIO = 0.3
+
+WORDS = (
+    "fix write review report deploy release update refactor test docs plan "
+    "design invoice call email meeting budget backup migrate upgrade clean "
+    "database server client api cache index query search login payment"
+).split()
+
+MAIN_SPACE = "bench"
+SMALL_SPACE_TODOS = 100
+
+
+def generate_todos(count: int, seed: int = 0) -> Iterator[dict]:
+    """Yields `count` todos in creation order."""
+    rng = random.Random(seed)
+    start_ms = int((START - SPAN).timestamp() * 1000)
+    step_ms = max(1, int(SPAN.total_seconds() * 1000) // max(count, 1))
+    for i in range(count):
+        timestamp_ms = start_ms + i * step_ms
+        created_at = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+        yield {
+            "created_at": created_at.isoformat(),
+            "done": rng.random() < DONE_RATIO,
+            "id": format_id(timestamp_ms, rng.getrandbits(80)),
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))),
+        }
+
+
+def seed_home(home: Path, todos: int, spaces: int = 20, seed: int = 0) -> list[dict]:
+    """
+    Writes a todoforge home with a `todos`-sized current space and `spaces` small ones.
+
+    Returns the todos of the current space.
+    """
+    from todoforge.utils.backends import JsonBackend
+
+    folder = home / ".config" / "todoforge"
+    folder.mkdir(parents=True, exist_ok=True)
+    backend = JsonBackend(folder)
+
+    main_todos = list(generate_todos(todos, seed=seed))
+    backend.save(MAIN_SPACE, {"todos": main_todos})
+    names = [MAIN_SPACE]
+    for i in range(spaces):
+        name = f"space{i}"
+        backend.save(
+            name,
+            {"todos": list(generate_todos(SMALL_SPACE_TODOS, seed=seed + i + 1))},
+        )
+        names.append(name)
+
+    (folder / "config.json").write_text(
+        json.dumps({"current_space": MAIN_SPACE, "spaces": names}, indent=4)
+    )
+    return main_todos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("home", type=Path)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--spaces", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seed_home(args.home, args.todos, args.spaces, args.seed)
+    print(f"Seeded {args.home} with {args.todos} todos and {args.spaces} more spaces")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Times every `tdf` command path on spaces of growing size.
+
+For each size a throwaway HOME is seeded by ``benchmarks.generate`` with a
+current space of that many todos plus smaller spaces. Every command is then
+timed twice:
+
+- in-process: a worker interpreter imports the app once and runs the command
+  through Typer's test runner, so the time is the command's own work with warm
+  caches, as in ``tdf daemon``;
+- subprocess: a fresh ``python -m todoforge.main`` per run, as from a shell.
+
+`toggle` is interactive, so only its load/toggle/save path is timed in-process.
+Results are written as JSON and can be compared against a saved run: a command
+that got slower than the baseline by more than `--tolerance` (and by more than
+`--min-delta` milliseconds, to ignore noise) fails the run.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1000,10000,100000] [--repeat 5]
+        [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generate import seed_home
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Each command maps a run number and the ids of the current space to the
+# arguments and stdin of that run. Runs touch different todos and spaces, and
+# spaces are added before they are renamed and renamed before they are removed.
+COMMANDS: dict[str, Callable[[int, list[str]], tuple[list[str], str | None]]] = {
+    "ls --limit 50": lambda i, ids: (["ls", "--limit", "50"], None),
+    "ls --format ndjson": lambda i, ids: (["ls", "--format", "ndjson"], None),
+    "add": lambda i, ids: (["add", f"benchmark task {i}"], None),
+    "done": lambda i, ids: (["done", ids[i]], None),
+    "remove": lambda i, ids: (["remove", ids[-1 - i]], None),
+    "spaces add": lambda i, ids: (["spaces", "add", f"tmp{i}"], None),
+    "spaces rename": lambda i, ids: (
+        ["spaces", "rename", f"tmp{i}", f"renamed{i}"],
+        None,
+    ),
+    "spaces remove": lambda i, ids: (["spaces", "remove", f"renamed{i}"], "y\ny\n"),
+}
+IN_PROCESS_ONLY = ("toggle",)
+
+
+def _median_ms(timings: list[float]) -> float:
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def run_worker(repeat: int, offset: int) -> dict[str, float]:
+    """Times every command in this process, against the HOME it was started with."""
+    from typer.testing import CliRunner
+
+    from todoforge.main import app
+    from todoforge.utils.db import get_todos, save_todos
+    from todoforge.utils.helper import handle_toggle_space_key
+
+    runner = CliRunner()
+    ids = [todo["id"] for todo in get_todos()["todos"]]
+    results = {}
+    for name, command in COMMANDS.items():
+        timings = []
+        for i in range(offset, offset + repeat):
+            args, stdin = command(i, ids)
+            start = time.perf_counter()
+            result = runner.invoke(app, args, input=stdin)
+            timings.append(time.perf_counter() - start)
+            if result.exit_code != 0:
+                raise RuntimeError(f"tdf {' '.join(args)} failed:\n{result.output}")
+        results[name] = _median_ms(timings)
+
+    timings = []
+    for i in range(offset, offset + repeat):
+        start = time.perf_counter()
+        todos = get_todos()["todos"]
+        save_todos({"todos": handle_toggle_space_key(todos, i)})
+        timings.append(time.perf_counter() - start)
+    results["toggle"] = _median_ms(timings)
+    return results
+
+
+def _env(home: Path) -> dict[str, str]:
+    return {**os.environ, "HOME": str(home), "COLUMNS": "120"}
+
+
+def time_in_process(home: Path, repeat: int, offset: int) -> dict[str, float]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.suite",
+            "--worker",
+            "--repeat",
+            str(repeat),
+            "--offset",
+            str(offset),
+        ],
+        env=_env(home),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"The benchmark worker failed:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def time_subprocesses(
+    home: Path, ids: list[str], repeat: int, offset: int
+) -> dict[str, float]:
+    results = {}
+    for name, command in COMMANDS.items():
+        timings = []
+        for i in range(offset, offset + repeat):
+            args, stdin = command(i, ids)
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "todoforge.main", *args],
+                env=_env(home),
+                input=stdin,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            timings.append(time.perf_counter() - start)
+        results[name] = _median_ms(timings)
+    return results
+
+
+def measure(sizes: list[int], repeat: int, spaces: int) -> dict:
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            home = Path(tmp)
+            ids = [todo["id"] for todo in seed_home(home, size, spaces)]
+
+            in_process = time_in_process(home, repeat, offset=0)
+            # Later runs use other todos and space names than the worker did.
+            subprocesses = time_subprocesses(home, ids, repeat, offset=repeat)
+
+        results[str(size)] = {
+            name: {
+                "in_process_ms": in_process[name],
+                "subprocess_ms": subprocesses.get(name),
+            }
+            for name in [*COMMANDS, *IN_PROCESS_ONLY]
+        }
+    return results
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, min_delta: float
+) -> list[str]:
+    regressions = []
+    for size, commands in results.items():
+        for name, metrics in commands.items():
+            previous = baseline.get(size, {}).get(name, {})
+            for metric, value in metrics.items():
+                before = previous.get(metric)
+                if value is None or before is None:
+                    continue
+                if value > before * (1 + tolerance) and value - before > min_delta:
+                    regressions.append(
+                        f"{name} ({size} todos): {metric} {value:.1f} > baseline {before:.1f}"
+                    )
+    return regressions
+
+
+def _print(results: dict) -> None:
+    print(
+        f"{'todos':>8}  {'command':<20}{'in-process (ms)':>16}{'subprocess (ms)':>16}"
+    )
+    for size, commands in results.items():
+        for name, metrics in commands.items():
+            subprocess_ms = metrics["subprocess_ms"]
+            print(
+                f"{size:>8}  {name:<20}{metrics['in_process_ms']:>16.1f}"
+                f"{'-' if subprocess_ms is None else f'{subprocess_ms:.1f}':>16}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma separated todo counts of the current space, e.g. 1000,1000000",
+    )
+    parser.add_argument("--spaces", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Fail on regressions against it")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=5.0)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--offset", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat, args.offset)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = measure(sizes, args.repeat, args.spaces)
+    _print(results)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                indent=4,
+                sort_keys=True,
+            )
+        )
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-from pathlib import Path
-from unittest.mock import patch
+import json
+from unittest.mock import MagicMock, patch
 
 import pytest
 from typer.testing import CliRunner
@@ -11,44 +11,84 @@ runner = CliRunner()
 
 
 @pytest.fixture
-def mock_todo_config():
+def mock_todo_config(tmp_path):
+    config_path = tmp_path / "config.json"
     with patch.object(
         todo_config, "get_current_space"
     ) as mock_get_current_space, patch.object(
         todo_config, "get_spaces_list"
     ) as mock_get_spaces_list, patch.object(
         todo_config, "save"
-    ) as mock_save:
+    ) as mock_save, patch.object(
+        todo_config, "get_space_config", return_value={}
+    ), patch(
+        "todoforge.commands.spaces.DEFAULT_TODO_CONFIG", new=config_path
+    ), patch(
+        "todoforge.utils.journal.DEFAULT_TODO_CONFIG", new=config_path
+    ):
         yield mock_get_current_space, mock_get_spaces_list, mock_save
 
 
+@pytest.fixture(autouse=True)
+def mock_registry():
+    with patch("todoforge.commands.spaces.registry") as mock_registry, patch(
+        "todoforge.utils.journal.registry", new=mock_registry
+    ):
+        yield mock_registry
+
+
 @pytest.fixture
-def mock_default_todo_folder():
-    with patch(
-        "todoforge.commands.spaces.DEFAULT_TODO_FOLDER",
-        new=Path("/tmp/todoforge_folder"),
-    ) as mock_folder:
-        yield mock_folder
+def mock_backend(tmp_path):
+    backend = MagicMock(root=tmp_path)
+    with patch("todoforge.commands.spaces.get_backend", return_value=backend):
+        yield backend
 
 
 def test_add_space_command_where_todo_folder_does_not_exists(
-    mock_todo_config, mock_default_todo_folder
+    mock_todo_config, mock_backend, mock_registry
 ):
-    mock_get_current_space, _, mock_save = mock_todo_config
-    mock_get_current_space.return_value = "work"
+    mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_current_space.return_value = ""
+    mock_get_space_list.return_value = []
     mock_save.return_value = None
 
     result = runner.invoke(app, ["add", "work"])
 
     assert result.exit_code == 0
     assert "Space work has been created successfully" in result.output
-    mock_save.assert_called()
-    assert mock_save.call_count == 2
+    mock_backend.create_space.assert_called_once_with("work")
+    mock_save.assert_called_once()
+    assert mock_save.call_args.kwargs["content"] == {
+        "current_space": "work",
+        "spaces": ["work"],
+    }
+    mock_registry.record_document.assert_called_once_with(
+        mock_backend, "work", {"todos": []}
+    )
+    assert mock_backend.list_spaces.call_count == 0
 
 
-def test_add_space_command_with_invalid_space_name(
-    mock_todo_config, mock_default_todo_folder
+def test_add_space_command_keeps_the_current_space(
+    mock_todo_config, mock_backend, tmp_path
 ):
+    mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
+    # The config is read again under its lock, not through the cached getters.
+    mock_get_current_space.return_value = ""
+    mock_get_space_list.return_value = []
+    (tmp_path / "config.json").write_text(
+        json.dumps({"current_space": "work", "spaces": ["work"]})
+    )
+
+    result = runner.invoke(app, ["add", "personal"])
+
+    assert result.exit_code == 0
+    assert mock_save.call_args.kwargs["content"] == {
+        "current_space": "work",
+        "spaces": ["work", "personal"],
+    }
+
+
+def test_add_space_command_with_invalid_space_name(mock_todo_config, mock_backend):
     mock_get_current_space, _, mock_save = mock_todo_config
     mock_get_current_space.return_value = "work"
     mock_save.return_value = None
@@ -62,23 +102,25 @@ def test_add_space_command_with_invalid_space_name(
     )
 
 
-def test_ls_spaces(mock_todo_config):
+def test_ls_spaces(mock_todo_config, mock_backend, mock_registry):
     mock_get_current_space, mock_get_space_list, _ = mock_todo_config
     mock_get_space_list.return_value = ["work", "personal"]
     mock_get_current_space.return_value = "personal"
+    mock_registry.get_stats.return_value = {
+        "work": {"todos": 12, "open": 3},
+        "personal": {"todos": 4, "open": 4},
+    }
 
     result = runner.invoke(app, ["ls"])
 
     assert result.exit_code == 0
-    assert "* personal" in result.output
-    assert "work" in result.output
+    assert "* personal   4 open /  4 todos" in result.output
+    assert "  work       3 open / 12 todos" in result.output
+    mock_registry.get_stats.assert_called_once_with(mock_backend, ["work", "personal"])
+    assert mock_backend.load.call_count == 0
 
 
-@patch(
-    "todoforge.commands.spaces.DEFAULT_TODO_CONFIG",
-    new=Path("/tmp/todoforge_folder/default_config.json"),
-)
-def test_switch_space(mock_todo_config):
+def test_switch_space(mock_todo_config, tmp_path):
     mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
     mock_get_space_list.return_value = ["work", "personal"]
     mock_get_current_space.return_value = "personal"
@@ -88,9 +130,9 @@ def test_switch_space(mock_todo_config):
 
     assert result.exit_code == 0
     assert "Switched to 'work' space" in result.output
+    # Only the current space changes, so a space added meanwhile is kept.
     mock_save.assert_called_with(
-        filepath=Path("/tmp/todoforge_folder/default_config.json"),
-        content={"current_space": "work", "spaces": ["work", "personal"]},
+        filepath=tmp_path / "config.json", content={"current_space": "work"}
     )
 
 
@@ -109,56 +151,133 @@ def test_switch_space_with_incorrect_space_name(mock_todo_config):
     )
 
 
-def test_rename_space(mock_todo_config, mock_default_todo_folder):
-    with patch("pathlib.Path.rename") as mock_rename:
-        mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
-        mock_get_space_list.return_value = ["work", "personal"]
-        mock_get_current_space.return_value = "personal"
-        mock_save.return_value = None
+def test_rename_space(mock_todo_config, mock_backend):
+    mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_space_list.return_value = ["work", "personal"]
+    mock_get_current_space.return_value = "personal"
+    mock_save.return_value = None
+
+    result = runner.invoke(app, ["rename", "personal", "home"])
+
+    assert result.exit_code == 0
+    assert "Space personal has been renamed to home" in result.output
+    mock_backend.rename_space.assert_called_once_with("personal", "home")
+    mock_save.assert_called()
+    assert not (mock_backend.root / "spaces.journal").exists()
 
-        result = runner.invoke(app, ["rename", "personal", "home"])
 
-        assert result.exit_code == 0
-        assert "Space personal has been renamed to home" in result.output
-        mock_rename.assert_called_once_with(
-            Path("/tmp/todoforge_folder/home_todo.json")
-        )
-        mock_save.assert_called()
+def test_rename_space_that_does_not_exist(mock_todo_config, mock_backend):
+    _, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_space_list.return_value = ["work"]
 
+    result = runner.invoke(app, ["rename", "personal", "home"])
 
-def test_remove_space(mock_todo_config, mock_default_todo_folder):
-    with patch("pathlib.Path.unlink") as mock_unlink, patch(
-        "pathlib.Path.exists"
-    ) as mock_exists:
-        mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
-        mock_get_space_list.return_value = ["work", "personal"]
-        mock_get_current_space.return_value = "personal"
-        mock_save.return_value = None
-        mock_exists.return_value = True
+    assert result.exit_code == 1
+    assert "Space 'personal' does not exist." in result.output
+    assert mock_backend.rename_space.call_count == 0
+    assert mock_save.call_count == 0
 
-        result = runner.invoke(app, ["remove", "personal"], input="y\ny\n")
 
-        assert result.exit_code == 0
-        assert "Space 'personal' has been removed" in result.output
-        mock_unlink.assert_called_once_with()
-        mock_save.assert_called_once()
+def test_rename_space_to_an_existing_name(mock_todo_config, mock_backend):
+    _, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_space_list.return_value = ["work", "personal"]
 
+    result = runner.invoke(app, ["rename", "personal", "work"])
 
-def test_remove_space_with_invalid_space_name(
-    mock_todo_config, mock_default_todo_folder
-):
-    with patch("pathlib.Path.unlink") as mock_unlink, patch(
-        "pathlib.Path.exists"
-    ) as mock_exists:
-        mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
-        mock_get_space_list.return_value = ["work"]
-        mock_get_current_space.return_value = "work"
-        mock_save.return_value = None
-        mock_exists.return_value = False
-
-        result = runner.invoke(app, ["remove", "personal"], input="y\ny\n")
-
-        assert result.exit_code == 1
-        assert "Space 'personal_todo.json' does not exist." in result.output
-        assert mock_unlink.call_count == 0
-        assert mock_save.call_count == 0
+    assert result.exit_code == 1
+    assert "Space 'work' already exists." in result.output
+    assert mock_backend.rename_space.call_count == 0
+    assert mock_save.call_count == 0
+
+
+def test_remove_space(mock_todo_config, mock_backend):
+    mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_space_list.return_value = ["work", "personal"]
+    mock_get_current_space.return_value = "personal"
+    mock_save.return_value = None
+    mock_backend.has_space.return_value = True
+
+    result = runner.invoke(app, ["remove", "personal"], input="y\ny\n")
+
+    assert result.exit_code == 0
+    assert "Space 'personal' has been removed" in result.output
+    mock_backend.remove_space.assert_called_once_with("personal")
+    mock_save.assert_called_once()
+
+
+def test_remove_space_with_invalid_space_name(mock_todo_config, mock_backend):
+    mock_get_current_space, mock_get_space_list, mock_save = mock_todo_config
+    mock_get_space_list.return_value = ["work"]
+    mock_get_current_space.return_value = "work"
+    mock_save.return_value = None
+    mock_backend.has_space.return_value = False
+
+    result = runner.invoke(app, ["remove", "personal"], input="y\ny\n")
+
+    assert result.exit_code == 1
+    assert "Space 'personal' does not exist." in result.output
+    assert mock_backend.remove_space.call_count == 0
+    assert mock_save.call_count == 0
+
+
+def test_convert_space(mock_todo_config, mock_backend):
+    mock_backend.has_space.return_value = True
+    mock_backend.space_format.return_value = "json"
+
+    result = runner.invoke(app, ["convert", "work", "--to", "compact"])
+
+    assert result.exit_code == 0
+    assert "Space 'work' is now stored as compact." in result.output
+    mock_backend.convert_space.assert_called_once_with("work", "compact")
+
+
+def test_convert_space_already_in_format(mock_todo_config, mock_backend):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_backend.has_space.return_value = True
+    mock_backend.space_format.return_value = "compact"
+
+    result = runner.invoke(app, ["convert", ".", "--to", "compact"])
+
+    assert result.exit_code == 0
+    assert "Space 'work' is already stored as compact." in result.output
+    assert mock_backend.convert_space.call_count == 0
+
+
+def test_convert_space_with_unknown_format(mock_todo_config, mock_backend):
+    mock_backend.has_space.return_value = True
+    mock_backend.space_format.return_value = "json"
+    mock_backend.convert_space.side_effect = ValueError("Unknown space format 'xml'")
+
+    result = runner.invoke(app, ["convert", "work", "--to", "xml"])
+
+    assert result.exit_code == 1
+    assert "Unknown space format 'xml'" in result.output
+
+
+def test_reindex_spaces(mock_todo_config, mock_backend, mock_registry, tmp_path):
+    _, _, mock_save = mock_todo_config
+    (tmp_path / "config.json").write_text(
+        json.dumps({"current_space": "old", "spaces": ["work", "old", "personal"]})
+    )
+    mock_backend.list_spaces.return_value = ["personal", "work", "found"]
+    search_files = [
+        mock_backend.root / "work_search.idx",
+        mock_backend.root / "work_search.stamp",
+    ]
+    for search_file in search_files:
+        search_file.write_text("")
+
+    result = runner.invoke(app, ["reindex"])
+
+    assert result.exit_code == 0
+    assert "Reindexed 3 spaces." in result.output
+    assert mock_save.call_args.kwargs["content"] == {
+        "current_space": "work",
+        "spaces": ["work", "personal", "found"],
+    }
+    mock_registry.reindex.assert_called_once_with(
+        mock_backend, ["work", "personal", "found"]
+    )
+    # Search indexes are rebuilt by the next search.
+    assert not any(search_file.exists() for search_file in search_files)
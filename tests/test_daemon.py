@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from todoforge import client
+from todoforge.daemon import Daemon
+from todoforge.utils import backends
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.config import todo_config
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "aaaa1111", "title": "Write report"},
+            {"done": False, "id": "bbbb2222", "title": "Buy milk"},
+        ],
+    )
+    return backend
+
+
+@pytest.fixture
+def daemon(tmp_path, backend):
+    socket_path = str(tmp_path / "daemon.sock")
+    daemon = Daemon(socket_path, flush_interval=60, backend=backend)
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=asyncio.run, args=(daemon.serve(ready=ready.set),), daemon=True
+    )
+
+    with patch.object(
+        todo_config, "get_current_space", return_value="work"
+    ), patch.object(todo_config, "get_spaces_list", return_value=["work"]), patch(
+        "todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=tmp_path / "config.json"
+    ):
+        thread.start()
+        assert ready.wait(timeout=5)
+        yield daemon, socket_path
+        client.request({"op": "stop"}, socket_path)
+        thread.join(timeout=5)
+
+
+def test_daemon_runs_commands_and_flushes_on_release(daemon, backend):
+    _, socket_path = daemon
+
+    reply = client.run_command(["done", "aaaa"], socket_path)
+
+    assert reply["code"] == 0
+    assert "Todo task updated successfully." in reply["stdout"]
+    assert backend.load("work")["todos"][0]["done"] is False
+
+    reply = client.run_command(
+        ["ls", "--format", "ndjson", "--status", "done"], socket_path
+    )
+    assert [json.loads(line)["id"] for line in reply["stdout"].splitlines()] == [
+        "aaaa1111"
+    ]
+
+    client.release(socket_path)
+    assert backend.load("work")["todos"][0]["done"] is True
+
+
+def test_daemon_reports_exit_codes_and_errors(daemon):
+    _, socket_path = daemon
+
+    reply = client.run_command(["search", "nothing"], socket_path)
+    assert reply["code"] == 1
+    assert "No todos match 'nothing'." in reply["stdout"]
+
+    reply = client.run_command(["ls", "--status", "maybe"], socket_path)
+    assert reply["code"] == 2
+    assert "Invalid value" in reply["stderr"]
+
+
+def test_daemon_flushes_and_removes_its_socket_on_stop(tmp_path, daemon, backend):
+    _, socket_path = daemon
+    client.run_command(["remove", "bbbb"], socket_path)
+
+    assert client.request({"op": "stop"}, socket_path) == {"ok": True}
+    for _ in range(100):
+        if not (tmp_path / "daemon.sock").exists():
+            break
+        threading.Event().wait(0.05)
+
+    assert not (tmp_path / "daemon.sock").exists()
+    assert [todo["id"] for todo in backend.load("work")["todos"]] == ["aaaa1111"]
+    assert backends._active_backend is None
+
+
+def test_request_without_a_daemon(tmp_path):
+    assert client.request({"op": "ping"}, str(tmp_path / "missing.sock")) is None
+
+    (tmp_path / "stale.sock").touch()
+    assert client.request({"op": "ping"}, str(tmp_path / "stale.sock")) is None
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        (["done", "1234"], True),
+        (["ls", "--all-spaces"], True),
+        (["spaces", "switch", "work"], True),
+        (["spaces", "remove", "work"], False),
+        (["add", "-"], False),
+        (["add", "--from-file", "todos.txt"], False),
+        (["toggle"], False),
+        (["edit", "1234"], False),
+        (["daemon"], False),
+        ([], False),
+    ],
+)
+def test_is_forwardable(argv, expected):
+    assert client.is_forwardable(argv) is expected
+
+
+def test_client_run_replays_the_daemon_reply(capsys):
+    reply = {"code": 3, "stdout": "out\n", "stderr": "err\n"}
+    with patch.object(client.sys, "argv", ["tdf", "ls"]), patch.object(
+        client, "run_command", return_value=reply
+    ):
+        with pytest.raises(SystemExit) as excinfo:
+            client.run()
+
+    assert excinfo.value.code == 3
+    assert capsys.readouterr() == ("out\n", "err\n")
+
+
+def test_client_run_does_not_forward_traced_commands(monkeypatch):
+    monkeypatch.setenv("TDF_TRACE", "json")
+    with patch.object(client.sys, "argv", ["tdf", "ls"]), patch.object(
+        client, "run_command"
+    ) as mock_run_command, patch("todoforge.main.run") as mock_run:
+        client.run()
+
+    mock_run_command.assert_not_called()
+    mock_run.assert_called_once()
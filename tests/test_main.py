@@ -1,22 +1,25 @@
+import json
+import subprocess
+import sys
+from datetime import timedelta
 from unittest.mock import patch
 
 import pytest
 from typer.testing import CliRunner
 
 from todoforge.main import app, todo_config  # type: ignore[attr-defined]
+from todoforge.utils.selectors import TodoSelector
 
 runner = CliRunner()
 
 
 @pytest.fixture
 def mock_todo_config():
-    with patch.object(
-        todo_config, "get_current_space"
-    ) as mock_get_current_space, patch.object(
-        todo_config, "get_spaces_list"
-    ) as mock_get_spaces_list, patch.object(
-        todo_config, "save"
-    ) as mock_save:
+    with (
+        patch.object(todo_config, "get_current_space") as mock_get_current_space,
+        patch.object(todo_config, "get_spaces_list") as mock_get_spaces_list,
+        patch.object(todo_config, "save") as mock_save,
+    ):
         mock_get_spaces_list.return_value = ["work, personal"]
         yield mock_get_current_space, mock_get_spaces_list, mock_save
 
@@ -30,7 +33,16 @@ def mock_get_todos():
         ]
     }
 
-    with patch("todoforge.main.get_todos") as mock_get_todos:
+    def iter_todos(done=None):
+        todos = mock_get_todos.return_value["todos"]
+        for status in (False, True) if done is None else (done,):
+            yield from (todo for todo in todos if todo["done"] == status)
+
+    with (
+        patch("todoforge.main.get_todos") as mock_get_todos,
+        patch("todoforge.main.iter_todos", side_effect=iter_todos),
+        patch("todoforge.main.id_prefix_lengths", return_value={}),
+    ):
         mock_get_todos.return_value = todos_list
         yield mock_get_todos
 
@@ -48,6 +60,19 @@ def test_ls_command_that_should_list_todos_in_current_space(
     assert "Test Task #2 |  ✔   |" in result.output
 
 
+def test_ls_command_with_profile(mock_todo_config, mock_get_todos):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    result = runner.invoke(app, ["--profile", "ls"])
+
+    assert result.exit_code == 0
+    assert "Test Task #1 |  ✘   |" in result.output
+    for phase in ("startup", "command", "  query", "  render"):
+        assert f"\n{phase} " in result.stderr
+    assert "total " in result.stderr
+
+
 def test_ls_command_where_current_space_is_empty(mock_todo_config):
 
     mock_get_current_space, _, _ = mock_todo_config
@@ -77,67 +102,360 @@ def test_ls_command_where_len_of_todos_is_zero(mock_todo_config, mock_get_todos)
     )
 
 
-def test_add_command_that_should_add_todo_to_todo_list(mock_get_todos):
+def test_ls_command_with_status_and_limit(mock_todo_config, mock_get_todos):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_todos.return_value = {
+        "todos": [
+            {"done": i % 2 == 0, "id": f"{i:04}", "title": f"Task #{i}"}
+            for i in range(10)
+        ]
+    }
+
+    result = runner.invoke(
+        app, ["ls", "--status", "open", "--limit", "2", "--offset", "1"]
+    )
+
+    assert result.exit_code == 0
+    assert "Task #3 " in result.output
+    assert "Task #5 " in result.output
+    assert "Task #1 " not in result.output
+    assert "Task #7 " not in result.output
+    assert "Task #0 " not in result.output
+
+
+def test_ls_command_with_page(mock_todo_config, mock_get_todos):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_todos.return_value = {
+        "todos": [
+            {"done": False, "id": f"{i:04}", "title": f"Task #{i}"} for i in range(7)
+        ]
+    }
+
+    result = runner.invoke(app, ["ls", "--page", "2", "--limit", "3", "-f"])
+
+    assert result.exit_code == 0
+    assert [line.split()[1] for line in result.output.splitlines()[4:-1]] == [
+        "0003",
+        "0004",
+        "0005",
+    ]
+
+
+def test_ls_command_with_ndjson_format(mock_todo_config, mock_get_todos):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    result = runner.invoke(app, ["ls", "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"done": False, "id": "1234", "title": "Test Task #1"},
+        {"done": True, "id": "2345", "title": "Test Task #2"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "output_format, expected",
+    [
+        ("plain", "[ ] 1234  Test Task #1\n[x] 2345  Test Task #2\n"),
+        (
+            "tsv",
+            "id\ttitle\tdone\n1234\tTest Task #1\tfalse\n2345\tTest Task #2\ttrue\n",
+        ),
+    ],
+)
+def test_ls_command_with_text_formats(
+    mock_todo_config, mock_get_todos, output_format, expected
+):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    result = runner.invoke(app, ["ls", "--format", output_format])
+
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+def test_ls_command_with_json_format_and_no_todos(mock_todo_config, mock_get_todos):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_todos.return_value = {"todos": []}
+
+    result = runner.invoke(app, ["ls", "--format", "json"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output) == []
+
+
+def test_search_command_in_current_space(mock_todo_config):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    with (
+        patch(
+            "todoforge.main.search_todos",
+            return_value=[{"id": "12345678", "title": "Write report"}],
+        ) as mock_search_todos,
+        patch("todoforge.main.short_todo_id", return_value="1234"),
+    ):
+        result = runner.invoke(app, ["search", "rep*", "write"])
+
+    assert result.exit_code == 0
+    assert "| 1234 | Write report |" in result.output
+    terms, space = mock_search_todos.call_args.args
+    assert space == "work"
+    assert [(term.text, term.prefix) for term in terms] == [
+        ("rep", True),
+        ("write", False),
+    ]
+
+
+def test_search_command_across_all_spaces(mock_todo_config):
+    _, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_spaces_list.return_value = ["work", "home"]
+
+    def search_todos(terms, space):
+        return [{"id": f"{space}-id", "title": f"{space} report"}]
+
+    with patch("todoforge.main.search_todos", side_effect=search_todos):
+        result = runner.invoke(app, ["search", "report", "--all-spaces", "-f"])
+
+    assert result.exit_code == 0
+    assert "| work  | work-id | work report |" in result.output
+    assert "| home  | home-id | home report |" in result.output
+
+
+def test_search_command_without_matches(mock_todo_config):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    with patch("todoforge.main.search_todos", return_value=[]):
+        result = runner.invoke(app, ["search", "nothing"])
+
+    assert result.exit_code == 1
+    assert "No todos match 'nothing'." in result.output
+
+
+@pytest.fixture
+def mock_load_spaces():
+    documents = {
+        "work": {
+            "todos": [
+                {"done": True, "id": "11112222", "title": "Work Task #1"},
+                {"done": False, "id": "11113333", "title": "Work Task #2"},
+            ]
+        },
+        "home": {"todos": [{"done": False, "id": "44445555", "title": "Home Task"}]},
+    }
+    with patch("todoforge.main.load_spaces", return_value=documents) as mock:
+        yield mock
+
+
+def test_ls_command_with_all_spaces(mock_todo_config, mock_load_spaces):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    result = runner.invoke(app, ["ls", "--all-spaces"])
+
+    assert result.exit_code == 0
+    rows = [line for line in result.output.splitlines() if "Task" in line]
+    assert [row.split("|")[1:4] for row in rows] == [
+        [" work  ", " 11113 ", " Work Task #2 "],
+        [" work  ", " 11112 ", " Work Task #1 "],
+        [" home  ", " 4444  ", " Home Task    "],
+    ]
+
+
+def test_ls_command_with_all_spaces_and_ndjson_format(
+    mock_todo_config, mock_load_spaces
+):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    result = runner.invoke(
+        app, ["ls", "--all-spaces", "--status", "open", "--format", "ndjson"]
+    )
+
+    assert result.exit_code == 0
+    assert [
+        (todo["space"], todo["id"])
+        for todo in map(json.loads, result.output.splitlines())
+    ] == [("work", "11113333"), ("home", "44445555")]
+
+
+def test_summary_command(mock_todo_config, mock_load_spaces):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "home"
+    mock_get_spaces_list.return_value = ["work", "home"]
+
+    result = runner.invoke(app, ["summary"])
+
+    assert result.exit_code == 0
+    mock_load_spaces.assert_called_once_with(["work", "home"])
+    assert "|   work |    1 |    1 |      50% |" in result.output
+    assert "| * home |    1 |    0 |       0% |" in result.output
+    assert "| Total  |    2 |    1 |      33% |" in result.output
+
+
+def test_summary_command_with_an_invalid_todo(mock_todo_config, mock_load_spaces):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "home"
+    mock_get_spaces_list.return_value = ["work", "home"]
+    del mock_load_spaces.return_value["home"]["todos"][0]["title"]
+
+    result = runner.invoke(app, ["summary"])
+
+    assert result.exit_code == 1
+    assert "space 'home' holds an invalid todo." in result.output
+    assert "title" in result.output
+
+
+def test_add_command_that_should_add_todo_to_todo_list():
 
     new_todo_title = "New Task"
-    with patch("todoforge.main.save_todos") as mock_save_todos:
-        mock_save_todos.return_value = None
+    with patch("todoforge.main.add_todos") as mock_add_todos:
+        mock_add_todos.return_value = None
 
         result = runner.invoke(app, ["add", new_todo_title])
 
         assert result.exit_code == 0
-        assert len(mock_get_todos.return_value["todos"]) == 3
+        mock_add_todos.assert_called_once()
+        (added_todo,) = mock_add_todos.call_args.kwargs["todos"]
+        assert added_todo["title"] == new_todo_title
+        assert added_todo["done"] is False
+
+
+def test_add_command_that_should_raise_an_exception():
+    with patch("todoforge.main.add_todos") as mock_add_todos:
+        mock_add_todos.side_effect = OSError("disk is full")
+
+        result = runner.invoke(app, ["add", "new task"])
+
+        assert "Oops... something went wrong!" in result.output
+
+
+def test_add_command_that_should_read_titles_from_stdin():
+    read_lines = []
+
+    def add_todos_from_lines(lines, done):
+        read_lines.extend(lines)
+        return len(read_lines)
+
+    with patch("todoforge.main.add_todos_from_lines", side_effect=add_todos_from_lines):
+        result = runner.invoke(app, ["add", "-"], input="Task #1\nTask #2\n")
+
+        assert result.exit_code == 0
+        assert "Added 2 tasks in" in result.output
+        assert read_lines == ["Task #1\n", "Task #2\n"]
+
 
+def test_add_command_that_should_read_titles_from_file(tmp_path):
+    titles_file = tmp_path / "titles.txt"
+    titles_file.write_text("Task #1\n\nTask #2\nTask #3\n")
 
-def test_add_command_that_should_raise_an_exception(mock_get_todos):
-    mock_get_todos.return_value = None
+    with patch("todoforge.utils.helper.add_todos") as mock_add_todos:
+        result = runner.invoke(app, ["add", "--from-file", str(titles_file), "--done"])
 
-    result = runner.invoke(app, ["add", "new task"])
+        assert result.exit_code == 0
+        assert "Added 3 tasks in" in result.output
+        mock_add_todos.assert_called_once()
+        todos = mock_add_todos.call_args.kwargs["todos"]
+        assert [todo["title"] for todo in todos] == ["Task #1", "Task #2", "Task #3"]
+        assert all(todo["done"] for todo in todos)
 
-    assert "Oops... something went wrong!" in result.output
+
+def test_add_command_without_title():
+    result = runner.invoke(app, ["add"])
+
+    assert result.exit_code == 1
+    assert "Oops... missing task title." in result.output
 
 
 def test_toggle_command(mock_get_todos, mock_todo_config):
     mock_get_current_space, _, _ = mock_todo_config
     mock_get_current_space.return_value = "work"
 
-    with patch("todoforge.main.show_options") as mock_show_options, patch(
-        "todoforge.main.save_todos"
-    ) as mock_save_todos:
-        mock_show_options.return_value = {
-            "id": "9876",
-            "title": "Status Changed",
-            "done": True,
-        }
-
-        mock_save_todos.return_value = None
+    def toggle_first(title, items, callback):
+        callback(items, 0)
+        return items
 
+    with (
+        patch(
+            "todoforge.utils.ui.menu.show_options", side_effect=toggle_first
+        ) as mock_show_options,
+        patch("todoforge.utils.toggles.ToggleJournal") as mock_toggle_journal,
+    ):
         result = runner.invoke(app, ["toggle"])
 
         assert result.exit_code == 0
-        mock_save_todos.assert_called_once_with(
-            {"todos": {"id": "9876", "title": "Status Changed", "done": True}}
-        )
+        mock_toggle_journal.assert_called_once_with("work")
+        mock_show_options.assert_called_once()
+        journal = mock_toggle_journal.return_value.__enter__.return_value
+        journal.append.assert_called_once_with("1234", True)
+        mock_toggle_journal.return_value.__exit__.assert_called_once()
 
 
 def test_done_command_that_should_update_the_status_to_True():
 
-    with patch("todoforge.main.update_todo_status") as mock_update_todo_status:
-        mock_update_todo_status.return_value = None
+    with patch("todoforge.main.update_todos_status") as mock_update_todos_status:
+        mock_update_todos_status.return_value = None
 
         runner.invoke(app, ["done", "1234"])
 
-        mock_update_todo_status.assert_called_once_with(todo_id="1234", status=True)
+        mock_update_todos_status.assert_called_once_with(
+            todo_ids=["1234"], status=True, selector=TodoSelector()
+        )
+
+
+def test_done_command_with_many_ids_and_filters():
+
+    with patch("todoforge.main.update_todos_status") as mock_update_todos_status:
+        mock_update_todos_status.return_value = None
+
+        result = runner.invoke(
+            app,
+            ["done", "1234", "2345", "--title-matches", "^Test", "--older-than", "2d"],
+        )
+
+        assert result.exit_code == 0
+        kwargs = mock_update_todos_status.call_args.kwargs
+        assert kwargs["todo_ids"] == ["1234", "2345"]
+        assert kwargs["selector"].title_matches.pattern == "^Test"
+        assert kwargs["selector"].older_than == timedelta(days=2)
+
+
+def test_done_command_without_ids_or_filters():
+
+    with patch("todoforge.main.update_todos_status") as mock_update_todos_status:
+        result = runner.invoke(app, ["done"])
+
+        assert result.exit_code == 1
+        assert "please pass at least one todo id or a filter" in result.output
+        mock_update_todos_status.assert_not_called()
+
+
+def test_done_command_with_invalid_duration():
+
+    with patch("todoforge.main.update_todos_status") as mock_update_todos_status:
+        result = runner.invoke(app, ["done", "--older-than", "soon"])
+
+        assert result.exit_code == 1
+        assert "Invalid duration 'soon'" in result.output
+        mock_update_todos_status.assert_not_called()
 
 
 def test_undo_command_that_should_update_the_status_to_True():
 
-    with patch("todoforge.main.update_todo_status") as mock_update_todo_status:
-        mock_update_todo_status.return_value = None
+    with patch("todoforge.main.update_todos_status") as mock_update_todos_status:
+        mock_update_todos_status.return_value = None
 
         runner.invoke(app, ["undo", "1234"])
 
-        mock_update_todo_status.assert_called_once_with(todo_id="1234", status=False)
+        mock_update_todos_status.assert_called_once_with(
+            todo_ids=["1234"], status=False, selector=TodoSelector()
+        )
 
 
 def test_edit_command_that_should_edit_title_of_given_todo():
@@ -157,10 +475,271 @@ def test_edit_command_that_should_edit_title_of_given_todo():
 
 def test_remove_command_that_should_remove_task_from_todo_list():
 
-    with patch("todoforge.main.remove_task_from_todo") as mock_remove_task_from_todo:
-        mock_remove_task_from_todo.return_value = None
+    with patch("todoforge.main.remove_tasks_from_todo") as mock_remove_tasks_from_todo:
+        mock_remove_tasks_from_todo.return_value = None
 
         result = runner.invoke(app, ["remove", "2345"])
 
         assert result.exit_code == 0
-        mock_remove_task_from_todo.assert_called_once_with(todo_id="2345")
+        mock_remove_tasks_from_todo.assert_called_once_with(
+            todo_ids=["2345"], selector=TodoSelector()
+        )
+
+
+def test_remove_command_with_all_done_filter():
+
+    with patch("todoforge.main.remove_tasks_from_todo") as mock_remove_tasks_from_todo:
+        mock_remove_tasks_from_todo.return_value = None
+
+        result = runner.invoke(app, ["remove", "--all-done"])
+
+        assert result.exit_code == 0
+        mock_remove_tasks_from_todo.assert_called_once_with(
+            todo_ids=[], selector=TodoSelector(all_done=True)
+        )
+
+
+def test_export_command_streams_the_space_to_stdout(mock_todo_config):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work", "personal"]
+    todos = [{"done": False, "id": "1234", "title": "Test Task #1"}]
+
+    with patch("todoforge.main.stream_todos", return_value=iter(todos)) as mock_stream:
+        result = runner.invoke(app, ["export", "--format", "csv"])
+
+    assert result.exit_code == 0
+    assert result.stdout == "id,title,done,created_at\n1234,Test Task #1,false,\n"
+    mock_stream.assert_called_once_with("work")
+
+
+def test_export_command_to_a_file_of_another_space(mock_todo_config, tmp_path):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work", "personal"]
+    todos = [{"done": False, "id": "1234", "title": "Test Task #1"}]
+    output = tmp_path / "personal.ndjson"
+
+    with patch("todoforge.main.stream_todos", return_value=iter(todos)) as mock_stream:
+        result = runner.invoke(
+            app, ["export", "--space", "personal", "--output", str(output)]
+        )
+
+    assert result.exit_code == 0
+    assert "Exported 1 todos of 'personal'" in result.output
+    assert [json.loads(line) for line in output.read_text().splitlines()] == todos
+    mock_stream.assert_called_once_with("personal")
+
+    result = runner.invoke(app, ["export", "--space", "other"])
+
+    assert result.exit_code == 1
+    assert "Space 'other' does not exist." in result.output
+
+
+def test_import_command_reads_csv_files_and_stdin(mock_todo_config, tmp_path):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work"]
+    csv_file = tmp_path / "todos.csv"
+    csv_file.write_text("id,title,done\n1234,Test Task #1,true\n")
+    imported = []
+
+    def import_todos(records, space):
+        imported.append((list(records), space))
+        return 1, 0
+
+    with patch("todoforge.main.import_todos", side_effect=import_todos):
+        result = runner.invoke(app, ["import", str(csv_file)])
+
+        assert result.exit_code == 0
+        assert "Imported 1 todos into 'work'" in result.output
+        assert imported.pop() == (
+            [{"id": "1234", "title": "Test Task #1", "done": "true"}],
+            "work",
+        )
+
+        result = runner.invoke(app, ["import", "-"], input='{"title": "Task"}\n')
+
+        assert result.exit_code == 0
+        assert imported.pop() == ([{"title": "Task"}], "work")
+
+
+def test_import_command_with_an_invalid_record(mock_todo_config):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work"]
+
+    with patch(
+        "todoforge.main.import_todos",
+        side_effect=ValueError("Record 2 is not a valid todo: title field required"),
+    ):
+        result = runner.invoke(app, ["import", "-"], input="{}\n")
+
+    assert result.exit_code == 1
+    assert "Record 2 is not a valid todo" in result.output
+
+
+def test_ls_command_with_archived(mock_todo_config):
+    mock_get_current_space, mock_get_spaces_list, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work", "personal"]
+    archived = {
+        "work": [{"done": True, "id": "1234", "title": "Test Task #1"}],
+        "personal": [{"done": True, "id": "2345", "title": "Test Task #2"}],
+    }
+
+    with patch(
+        "todoforge.main.iter_archived_todos",
+        side_effect=lambda space: iter(archived[space]),
+    ) as mock_iter_archived:
+        result = runner.invoke(app, ["ls", "--archived"])
+
+        assert result.exit_code == 0
+        assert "Work's Archived Todos" in result.output
+        assert "| 1234 | Test Task #1 |" in result.output
+        mock_iter_archived.assert_called_once_with("work")
+
+        result = runner.invoke(
+            app, ["ls", "--archived", "--all-spaces", "--format", "ndjson"]
+        )
+
+        assert result.exit_code == 0
+        assert [json.loads(line)["space"] for line in result.output.splitlines()] == [
+            "work",
+            "personal",
+        ]
+
+        result = runner.invoke(app, ["ls", "--archived", "--status", "open"])
+
+        assert result.exit_code == 1
+        assert "No archived todos yet." in result.output
+
+
+def test_ls_command_keeps_ids_short_after_a_bulk_add(tmp_path):
+    from todoforge.utils.backends import JsonBackend
+    from todoforge.utils.ids import new_id
+
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    backend.add("work", [{"done": False, "id": new_id(), "title": "Older Task"}])
+    backend.add(
+        "work",
+        [{"done": False, "id": new_id(), "title": f"Task #{i}"} for i in range(50)],
+    )
+
+    with (
+        patch("todoforge.utils.db.get_backend", return_value=backend),
+        patch.object(todo_config, "get_current_space", return_value="work"),
+    ):
+        result = runner.invoke(app, ["ls", "--limit", "100"])
+
+    assert result.exit_code == 0
+    ids = [
+        line.split("|")[1].strip()
+        for line in result.output.splitlines()
+        if "Task" in line
+    ]
+    assert len(ids) == 51
+    assert max(len(todo_id) for todo_id in ids) < 20
+
+
+def test_archive_command(mock_todo_config):
+    mock_get_current_space, mock_get_spaces_list, mock_save = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work"]
+
+    with patch("todoforge.main.archive_todos", return_value=3) as mock_archive_todos:
+        result = runner.invoke(app, ["archive", "--older-than", "30d", "--keep", "5"])
+
+    assert result.exit_code == 0
+    assert "Archived 3 completed todos of 'work'." in result.output
+    mock_archive_todos.assert_called_once_with(
+        "work", older_than=timedelta(days=30), keep=5
+    )
+    mock_save.assert_not_called()
+
+    result = runner.invoke(app, ["archive", "--older-than", "soon"])
+
+    assert result.exit_code == 1
+    assert "Invalid duration 'soon'" in result.output
+
+
+def test_archive_command_saves_and_drops_the_policy(mock_todo_config, tmp_path):
+    mock_get_current_space, mock_get_spaces_list, mock_save = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get_spaces_list.return_value = ["work"]
+    config = {"current_space": "work", "spaces": ["work"]}
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config))
+
+    with (
+        patch("todoforge.utils.constants.DEFAULT_TODO_CONFIG", new=config_path),
+        patch("todoforge.main.archive_todos", return_value=0) as mock_archive_todos,
+    ):
+        result = runner.invoke(app, ["archive", "--auto"])
+
+        assert result.exit_code == 1
+        assert "Pass --older-than or --keep" in result.output
+
+        result = runner.invoke(app, ["archive", "--auto", "--keep", "100"])
+
+        assert result.exit_code == 0
+        assert "after every tdf done" in result.output
+        assert mock_save.call_args.kwargs["content"] == {
+            **config,
+            "archive_policy": {"keep": 100},
+        }
+        mock_archive_todos.assert_called_once_with("work", older_than=None, keep=100)
+
+        config_path.write_text(json.dumps({**config, "archive_policy": {"keep": 100}}))
+        result = runner.invoke(app, ["archive", "--no-auto"])
+
+        assert result.exit_code == 0
+        assert mock_save.call_args.kwargs["content"] == {
+            "current_space": "work",
+            "spaces": ["work"],
+        }
+        assert mock_archive_todos.call_count == 1
+
+
+def test_migrate_command_that_should_move_spaces_to_given_backend():
+
+    with patch("todoforge.main.migrate_spaces") as mock_migrate_spaces:
+        mock_migrate_spaces.return_value = None
+
+        result = runner.invoke(app, ["migrate", "--to", "sqlite"])
+
+        assert result.exit_code == 0
+        mock_migrate_spaces.assert_called_once_with(backend_name="sqlite")
+
+
+def test_migrate_command_with_unknown_backend():
+
+    with patch("todoforge.main.migrate_spaces") as mock_migrate_spaces:
+        mock_migrate_spaces.side_effect = ValueError("Unknown storage backend 'csv'.")
+
+        result = runner.invoke(app, ["migrate", "--to", "csv"])
+
+        assert result.exit_code == 1
+        assert "Unknown storage backend 'csv'." in result.output
+
+
+def test_importing_main_does_not_import_heavy_modules():
+    heavy_modules = [
+        "curses",
+        "gzip",
+        "pydantic",
+        "rich.console",
+        "rich.table",
+        "sqlite3",
+    ]
+    code = (
+        "import sys, todoforge.main; "
+        f"print([m for m in {heavy_modules!r} if m in sys.modules])"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,117 @@
+import gzip
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from todoforge.utils.archive import Archive, select_todos
+
+
+def make_todos(count, start=0):
+    return [
+        {
+            "created_at": f"2026-01-{i + 1:02d}T00:00:00+00:00",
+            "done": True,
+            "id": f"{i:04d}",
+            "title": f"Task #{i}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return Archive(tmp_path, "work")
+
+
+def append(archive, todos):
+    archive.append(todos)
+    archive.commit()
+
+
+def test_appends_are_read_back_in_order(archive):
+    assert list(archive.iter_todos()) == []
+
+    append(archive, make_todos(2))
+    append(archive, make_todos(3, start=2))
+
+    assert list(archive.iter_todos()) == make_todos(5)
+    # Every append is a gzip member of its own, so the file is plain gzip.
+    with gzip.open(archive.filepath, "rt") as f:
+        assert len(f.readlines()) == 5
+    assert not archive.pending_filepath.exists()
+
+
+def test_a_pending_append_only_yields_todos_that_left_the_space(archive):
+    append(archive, make_todos(2))
+    archive.append(make_todos(2, start=2))
+    live = []
+
+    def existing_ids(todo_ids):
+        live.append(todo_ids)
+        return {"0003"} & set(todo_ids)
+
+    assert list(archive.iter_todos(live=existing_ids)) == make_todos(3)
+    # Only the ids of the pending member are checked against the space.
+    assert live == [["0002", "0003"]]
+
+    assert archive.recover() == ["0002", "0003"]
+    archive.commit()
+
+    assert list(archive.iter_todos()) == make_todos(4)
+    assert archive.recover() == []
+
+
+def test_a_torn_append_is_skipped_and_cut_off_on_recovery(archive):
+    append(archive, make_todos(2))
+    size = archive.size()
+    archive.pending_filepath.write_text(str(size))
+    with open(archive.filepath, "ab") as f:
+        f.write(gzip.compress(b'{"id": "torn"}\n' * 100)[:30])
+
+    assert list(archive.iter_todos(live=lambda todo_ids: set())) == make_todos(2)
+
+    assert archive.recover() == []
+    assert archive.size() == size
+    assert not archive.pending_filepath.exists()
+
+    append(archive, make_todos(1, start=2))
+
+    assert list(archive.iter_todos()) == make_todos(3)
+
+
+def test_touch_records_when_the_space_was_checked(archive):
+    assert archive.checked_at() is None
+
+    archive.touch()
+
+    assert list(archive.iter_todos()) == []
+    checked_at = archive.checked_at()
+    assert datetime.now(timezone.utc) - checked_at < timedelta(minutes=1)
+
+
+def test_rename_and_clear(archive, tmp_path):
+    append(archive, make_todos(1))
+
+    archive.rename("job")
+    archive.rename("job")
+
+    renamed = Archive(tmp_path, "job")
+    assert not archive.exists()
+    assert list(renamed.iter_todos()) == make_todos(1)
+
+    renamed.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_select_todos():
+    todos = make_todos(5)
+    todos[4]["done"] = False
+    now = datetime(2026, 1, 4, 12, tzinfo=timezone.utc)
+
+    assert select_todos(todos) == todos[:4]
+    assert select_todos(todos, older_than=timedelta(days=2), now=now) == todos[:2]
+    assert select_todos(todos, keep=1) == todos[:3]
+    assert select_todos(todos, keep=10) == []
+    assert select_todos(todos, older_than=timedelta(days=3), keep=2, now=now) == (
+        todos[:2]
+    )
@@ -0,0 +1,623 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import oplog
+from todoforge.utils.backends import (
+    BufferedBackend,
+    JsonBackend,
+    SqliteBackend,
+    copy_space,
+)
+from todoforge.utils.config import todo_config
+from todoforge.utils.idindex import AmbiguousIdError, IdIndex
+from todoforge.utils.statusindex import StatusIndex
+
+
+def buffered_json_backend(root):
+    return BufferedBackend(JsonBackend(root))
+
+
+def compact_json_backend(root):
+    backend = JsonBackend(root)
+    backend.create_space("work")
+    backend.convert_space("work", "compact")
+    return backend
+
+
+def sharded_json_backend(root):
+    backend = JsonBackend(root)
+    backend.create_space("work")
+    backend.convert_space("work", "sharded")
+    return backend
+
+
+@pytest.fixture(
+    params=[
+        JsonBackend,
+        SqliteBackend,
+        buffered_json_backend,
+        compact_json_backend,
+        sharded_json_backend,
+    ]
+)
+def backend(request, tmp_path):
+    backend = request.param(tmp_path)
+    backend.create_space("work")
+    yield backend
+    if isinstance(backend, SqliteBackend):
+        backend.close()
+
+
+def test_create_and_list_spaces(backend):
+    backend.create_space("personal")
+
+    assert backend.has_space("personal")
+    assert not backend.has_space("other")
+    assert sorted(backend.list_spaces()) == ["personal", "work"]
+    assert backend.load("personal") == {"todos": []}
+
+
+def test_add_update_and_remove_todos(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "Test Task #1"},
+            {"done": False, "id": "2345", "title": "Test Task #2"},
+        ],
+    )
+    backend.update("work", ["1234"], {"done": True, "title": "Updated Task"})
+    backend.remove("work", ["2345"])
+
+    assert backend.load("work")["todos"] == [
+        {"done": True, "id": "1234", "title": "Updated Task"}
+    ]
+
+
+def test_extra_fields_and_document_keys_are_kept(backend):
+    backend.save(
+        "work",
+        {
+            "todos": [{"done": False, "id": "1234", "title": "Task", "tag": "a"}],
+            "version": 1,
+        },
+    )
+    backend.update("work", ["1234"], {"tag": "b"})
+
+    assert backend.load("work") == {
+        "todos": [{"done": False, "id": "1234", "title": "Task", "tag": "b"}],
+        "version": 1,
+    }
+
+
+def test_resolve_returns_full_id_for_partial_id(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "Test Task #1"},
+            {"done": False, "id": "1299", "title": "Test Task #2"},
+            {"done": False, "id": "12", "title": "Test Task #3"},
+        ],
+    )
+
+    assert backend.resolve("work", "123") == "1234"
+    assert backend.resolve("work", "12") == "12"
+    assert backend.resolve("work", "99") is None
+
+
+def test_resolve_raises_for_ambiguous_partial_id(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "Test Task #1"},
+            {"done": False, "id": "1299", "title": "Test Task #2"},
+        ],
+    )
+
+    with pytest.raises(AmbiguousIdError) as excinfo:
+        backend.resolve("work", "1")
+
+    assert excinfo.value.matches == ["1234", "1299"]
+
+
+def test_rename_and_remove_space(backend):
+    backend.add("work", [{"done": False, "id": "1234", "title": "Test Task #1"}])
+
+    backend.rename_space("work", "home")
+
+    assert not backend.has_space("work")
+    assert backend.load("home")["todos"][0]["id"] == "1234"
+
+    backend.remove_space("home")
+
+    assert not backend.has_space("home")
+    if isinstance(backend, JsonBackend):
+        # Lock files go along with the space.
+        assert list(backend.root.glob("*_todo*")) == []
+
+
+def test_sqlite_backend_uses_wal_and_indexed_lookups(tmp_path):
+    backend = SqliteBackend(tmp_path)
+    backend.create_space("work")
+
+    (journal_mode,) = backend.conn.execute("PRAGMA journal_mode").fetchone()
+    plan = backend.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM todos WHERE space = ? AND id = ?",
+        ("work", "1234"),
+    ).fetchall()
+
+    assert journal_mode == "wal"
+    assert "todos_space_id" in str(plan)
+    backend.close()
+
+
+def test_copy_space_moves_todos_between_backends(tmp_path):
+    source = JsonBackend(tmp_path)
+    target = SqliteBackend(tmp_path)
+    source.create_space("work")
+    source.add("work", [{"done": True, "id": "1234", "title": "Test Task #1"}])
+
+    assert copy_space(source=source, target=target, space="work") == 1
+    assert target.load("work") == source.load("work")
+    target.close()
+
+
+def test_json_backend_rebuilds_a_stale_id_index(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    backend.add("work", [{"done": False, "id": "1234", "title": "Test Task #1"}])
+
+    # Simulate a crash between appending to the log and updating the index.
+    backend._oplog("work").append(
+        {"op": "add", "todos": [{"done": False, "id": "5678", "title": "Task #2"}]}
+    )
+    os.utime(tmp_path / "work_todo.ids", ns=(0, 0))
+
+    assert backend.resolve("work", "56") == "5678"
+
+
+def test_json_backend_keeps_the_status_index_up_to_date(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "one"},
+            {"done": True, "id": "2345", "title": "two"},
+            {"done": False, "id": "3456", "title": "three"},
+        ],
+    )
+    backend.update("work", ["1234"], {"done": True})
+    backend.update("work", ["3456"], {"title": "Three"})
+    backend.remove("work", ["2345"])
+
+    status = StatusIndex(tmp_path / "work_todo.status")
+    assert status.entries() == [("1234", True), ("3456", False)]
+    with patch.object(backend, "load", side_effect=AssertionError):
+        assert backend.status_counts("work", ["1234", "3456"]) == (1, 1)
+    assert [todo["title"] for todo in backend.iter_todos("work")] == ["Three", "one"]
+
+    # Simulate a crash between appending to the log and updating the index.
+    backend._oplog("work").append(
+        {"op": "update", "ids": ["1234"], "fields": {"done": False}}
+    )
+    os.utime(status.filepath, ns=(0, 0))
+
+    assert [todo["id"] for todo in backend.iter_todos("work", done=False)] == [
+        "1234",
+        "3456",
+    ]
+
+
+def test_sharded_space_status_index_follows_the_order_of_the_shards(tmp_path):
+    backend = sharded_json_backend(tmp_path)
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "2222", "title": "two"},
+            {"done": True, "id": "3333", "title": "three"},
+        ],
+    )
+    backend.compact("work")
+    # An id that sorts first is stored last until the log is folded.
+    backend.add("work", [{"done": False, "id": "1111", "title": "one"}])
+    assert [todo["id"] for todo in backend.iter_todos("work")] == [
+        "2222",
+        "1111",
+        "3333",
+    ]
+
+    backend.compact("work")
+    backend.update("work", ["3333"], {"done": False})
+
+    assert [todo["id"] for todo in backend.iter_todos("work")] == [
+        "1111",
+        "2222",
+        "3333",
+    ]
+    assert StatusIndex(tmp_path / "work_todo.status").is_sorted()
+
+
+def test_iter_todos_yields_open_todos_first(backend):
+    backend.add(
+        "work",
+        [
+            {"done": True, "id": "aaaa", "title": "one"},
+            {"done": False, "id": "bbbb", "title": "two"},
+            {"done": False, "id": "cccc", "title": "three"},
+        ],
+    )
+
+    assert [todo["id"] for todo in backend.iter_todos("work")] == [
+        "bbbb",
+        "cccc",
+        "aaaa",
+    ]
+    assert [todo["id"] for todo in backend.iter_todos("work", done=True)] == ["aaaa"]
+
+
+def test_id_prefix_lengths(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "abcdef01", "title": "one"},
+            {"done": False, "id": "abcdef02", "title": "two"},
+            {"done": False, "id": "99999999", "title": "three"},
+        ],
+    )
+
+    assert backend.id_prefix_lengths("work") == {
+        "99999999": 4,
+        "abcdef01": 8,
+        "abcdef02": 8,
+    }
+
+
+def test_short_id(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "abcdef01", "title": "one"},
+            {"done": False, "id": "abcdef02", "title": "two"},
+            {"done": False, "id": "99999999", "title": "three"},
+        ],
+    )
+
+    assert backend.short_id("work", "abcdef01") == "abcdef01"
+    assert backend.short_id("work", "99999999") == "9999"
+
+
+def test_status_counts(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "Test Task #1"},
+            {"done": True, "id": "2345", "title": "Test Task #2"},
+            {"done": True, "id": "3456", "title": "Test Task #3"},
+        ],
+    )
+
+    assert backend.status_counts("work", ["1234", "2345", "2345", "9999"]) == (1, 1)
+    assert backend.status_counts("work", []) == (0, 0)
+
+
+def test_json_backend_space_size_counts_the_snapshot_and_the_log(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    snapshot_size = (tmp_path / "work_todo.json").stat().st_size
+
+    assert backend.space_size("work") == snapshot_size
+
+    backend.add("work", [{"done": False, "id": "1234", "title": "Test Task #1"}])
+
+    assert backend.space_size("work") == (
+        snapshot_size + (tmp_path / "work_todo.log").stat().st_size
+    )
+
+
+def test_load_many_returns_every_space_in_order(backend):
+    for space in ("home", "misc"):
+        backend.create_space(space)
+        backend.add(space, [{"done": False, "id": f"{space}0001", "title": space}])
+
+    documents = backend.load_many(["misc", "work", "home"])
+
+    assert list(documents) == ["misc", "work", "home"]
+    assert documents["work"]["todos"] == []
+    assert documents["home"]["todos"] == [
+        {"done": False, "id": "home0001", "title": "home"}
+    ]
+
+
+def test_buffered_backend_only_writes_on_flush(tmp_path):
+    inner = JsonBackend(tmp_path)
+    inner.create_space("work")
+    backend = BufferedBackend(inner)
+
+    backend.add("work", [{"done": False, "id": "aaaa1111", "title": "one"}])
+    backend.update("work", ["aaaa1111"], {"done": True})
+
+    assert backend.resolve("work", "aaaa") == "aaaa1111"
+    assert inner.load("work")["todos"] == []
+    assert backend.dirty == {"work"}
+
+    backend.flush()
+
+    assert inner.load("work")["todos"] == [
+        {"done": True, "id": "aaaa1111", "title": "one"}
+    ]
+    assert backend.dirty == set()
+
+
+def test_buffered_backend_release_reads_spaces_again(tmp_path):
+    # The sqlite backend cannot tell when a space changed.
+    inner = SqliteBackend(tmp_path)
+    inner.create_space("work")
+    backend = BufferedBackend(inner)
+    backend.load("work")
+
+    inner.add("work", [{"done": False, "id": "aaaa1111", "title": "one"}])
+    assert backend.load("work")["todos"] == []
+
+    backend.release()
+    assert backend.load("work")["todos"] == [
+        {"done": False, "id": "aaaa1111", "title": "one"}
+    ]
+
+
+def test_buffered_backend_reads_spaces_changed_behind_it(tmp_path):
+    inner = JsonBackend(tmp_path)
+    inner.create_space("work")
+    backend = BufferedBackend(inner)
+    backend.load("work")
+
+    inner.add("work", [{"done": False, "id": "aaaa1111", "title": "one"}])
+
+    assert backend.resolve("work", "aaaa") == "aaaa1111"
+
+
+def test_buffered_backend_flushes_on_top_of_changes_behind_it(tmp_path):
+    inner = JsonBackend(tmp_path)
+    inner.save("work", {"todos": [{"done": False, "id": "aaaa1111", "title": "one"}]})
+    backend = BufferedBackend(inner)
+    backend.update("work", ["aaaa1111"], {"done": True})
+
+    inner.add("work", [{"done": False, "id": "bbbb2222", "title": "two"}])
+    inner.update("work", ["aaaa1111"], {"title": "first"})
+    backend.add("work", [{"done": False, "id": "cccc3333", "title": "three"}])
+    with patch.object(inner, "save") as mock_save:
+        backend.flush()
+
+    mock_save.assert_not_called()
+    expected = [
+        {"done": True, "id": "aaaa1111", "title": "first"},
+        {"done": False, "id": "bbbb2222", "title": "two"},
+        {"done": False, "id": "cccc3333", "title": "three"},
+    ]
+    assert inner.load("work")["todos"] == expected
+    assert backend.load("work")["todos"] == expected
+
+
+def test_buffered_backend_flushes_a_save_as_a_whole_document(tmp_path):
+    inner = JsonBackend(tmp_path)
+    inner.create_space("work")
+    backend = BufferedBackend(inner)
+    document = {"todos": [{"done": False, "id": "aaaa1111", "title": "one"}]}
+    backend.save("work", document)
+
+    inner.add("work", [{"done": False, "id": "bbbb2222", "title": "two"}])
+    assert backend.load("work") == document
+
+    backend.flush()
+    assert inner.load("work") == document
+
+
+def test_a_space_out_of_id_order_is_not_sharded(tmp_path):
+    backend = JsonBackend(tmp_path)
+    todos = [
+        {
+            "done": False,
+            "id": "da39a3ee5e6b4b0d3255bfef95601890afd80709",
+            "title": "one",
+        },
+        {
+            "done": False,
+            "id": "2fd4e1c67a2d28fced849ee1bb76e7391b93eb12",
+            "title": "two",
+        },
+    ]
+    backend.save("work", {"todos": todos})
+
+    with pytest.raises(ValueError, match="id order"):
+        backend.convert_space("work", "sharded")
+
+    assert backend.space_format("work") == "json"
+    assert backend.load("work")["todos"] == todos
+
+
+def test_convert_space_between_formats(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    backend.save("work", {"todos": [], "version": 1})
+    backend.add(
+        "work",
+        [
+            {"done": True, "id": "aaaa1111", "title": "one"},
+            {"done": False, "id": "bbbb2222", "title": "two"},
+        ],
+    )
+    document = backend.load("work")
+
+    backend.convert_space("work", "compact")
+
+    assert backend.space_format("work") == "compact"
+    assert sorted(path.name for path in tmp_path.glob("work_todo.*")) == [
+        "work_todo.ids",
+        "work_todo.lock",
+        "work_todo.status",
+        "work_todo.tdf",
+    ]
+    assert backend.list_spaces() == ["work"]
+    assert backend.load("work") == document
+    assert [todo["id"] for todo in backend.iter_todos("work")] == [
+        "bbbb2222",
+        "aaaa1111",
+    ]
+
+    # Mutations are logged on top of the compact snapshot as usual.
+    backend.update("work", ["bbbb2222"], {"done": True})
+    assert [todo["id"] for todo in backend.iter_todos("work", done=False)] == []
+    backend.compact("work")
+    assert backend.space_format("work") == "compact"
+
+    backend.convert_space("work", "json")
+
+    assert backend.space_format("work") == "json"
+    assert not (tmp_path / "work_todo.tdf").exists()
+    assert backend.load("work") == {
+        "todos": [
+            {"done": True, "id": "aaaa1111", "title": "one"},
+            {"done": True, "id": "bbbb2222", "title": "two"},
+        ],
+        "version": 1,
+    }
+
+
+def test_sharded_space_compaction_only_rewrites_touched_shards(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.save(
+        "work",
+        {
+            "todos": [
+                {"done": False, "id": f"{i:06d}", "title": "x"} for i in range(3000)
+            ],
+            "version": 1,
+        },
+    )
+    backend.convert_space("work", "sharded")
+    before = backend._sharded("work").manifest()["shards"]
+
+    assert backend.space_format("work") == "sharded"
+    assert backend.list_spaces() == ["work"]
+    assert not (tmp_path / "work_todo.json").exists()
+    assert len(before) == 3
+
+    backend.update("work", ["002999"], {"done": True})
+    backend.add("work", [{"done": False, "id": "003000", "title": "New"}])
+    backend.compact("work")
+
+    after = backend._sharded("work").manifest()["shards"]
+    assert not (tmp_path / "work_todo.log").exists()
+    assert after[:2] == before[:2]
+    assert after[2]["todos"] == before[2]["todos"] + 1
+    assert backend.resolve("work", "003000") == "003000"
+    assert IdIndex(tmp_path / "work_todo.ids").is_fresh(
+        tmp_path / "work_todo.manifest", tmp_path / "work_todo.log"
+    )
+    document = backend.load("work")
+    assert document["version"] == 1
+    assert document["todos"][-2:] == [
+        {"done": True, "id": "002999", "title": "x"},
+        {"done": False, "id": "003000", "title": "New"},
+    ]
+
+    backend.rename_space("work", "job")
+    assert backend.list_spaces() == ["job"]
+    assert backend.load("job") == document
+
+    backend.convert_space("job", "json")
+    assert backend.load("job") == document
+    assert list(tmp_path.glob("job_todo.*.shard")) == []
+    assert not (tmp_path / "job_todo.manifest").exists()
+
+
+def test_convert_space_rejects_unknown_formats(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+
+    with pytest.raises(ValueError, match="Unknown space format 'xml'"):
+        backend.convert_space("work", "xml")
+
+    sqlite_backend = SqliteBackend(tmp_path)
+    with pytest.raises(ValueError, match="sqlite backend does not support"):
+        sqlite_backend.convert_space("work", "compact")
+    sqlite_backend.close()
+
+
+def test_stream_todos_yields_todos_in_insertion_order(backend):
+    backend.add(
+        "work",
+        [
+            {"done": True, "id": "1234", "title": "Test Task #1"},
+            {"done": False, "id": "2345", "title": "Test Task #2"},
+            {"done": False, "id": "3456", "title": "Test Task #3"},
+        ],
+    )
+    backend.update("work", ["2345"], {"title": "Updated Task"})
+    backend.remove("work", ["3456"])
+
+    assert list(backend.stream_todos("work")) == [
+        {"done": True, "id": "1234", "title": "Test Task #1"},
+        {"done": False, "id": "2345", "title": "Updated Task"},
+    ]
+    assert list(backend.stream_todos("work")) == backend.load("work")["todos"]
+
+
+def test_existing_ids(backend):
+    backend.add(
+        "work",
+        [
+            {"done": False, "id": "1234", "title": "Test Task #1"},
+            {"done": False, "id": "2345", "title": "Test Task #2"},
+        ],
+    )
+
+    assert backend.existing_ids("work", ["1234", "12", "9999", "2345"]) == {
+        "1234",
+        "2345",
+    }
+
+
+def test_bulk_adds_keep_every_todo(backend):
+    with backend.bulk("work"):
+        for i in range(3):
+            backend.add(
+                "work",
+                [
+                    {"done": False, "id": f"{i}{j:03d}", "title": f"Task {i}.{j}"}
+                    for j in range(100)
+                ],
+            )
+            assert backend.existing_ids("work", [f"{i}000", "9999"]) == {f"{i}000"}
+
+    todos = backend.load("work")["todos"]
+    assert len(todos) == 300
+    assert todos[0]["id"] == "0000"
+    assert backend.resolve("work", "2099") == "2099"
+
+
+def test_json_backend_folds_the_log_once_when_bulk_adds_end(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.save(
+        "work", {"todos": [{"done": False, "id": "0", "title": "Old"}], "v": 1}
+    )
+    todos = [
+        {"done": False, "id": f"{i:06d}", "title": "x" * 100} for i in range(1, 3001)
+    ]
+
+    with patch.object(backend, "compact") as mock_compact:
+        with backend.bulk("work"):
+            for i in range(0, 3000, 500):
+                backend.add("work", todos[i : i + 500])
+
+            # Way past the compaction threshold, but only appended so far.
+            assert backend._oplog("work").size() > oplog.COMPACT_THRESHOLD
+
+    mock_compact.assert_not_called()
+    assert not (tmp_path / "work_todo.log").exists()
+    assert todo_config.get(tmp_path / "work_todo.json") == {
+        "todos": [{"done": False, "id": "0", "title": "Old"}, *todos],
+        "v": 1,
+    }
+    assert backend.resolve("work", "003000") == "003000"
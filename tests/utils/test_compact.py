@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from todoforge.utils import compact
+from todoforge.utils.compact import CompactFile
+
+DOCUMENT = {
+    "todos": [
+        {"done": True, "id": "aaaa", "title": "one"},
+        {"done": False, "id": "bbbb", "title": "twö", "tag": "x"},
+        {"done": False, "id": "cccc", "title": "three"},
+    ],
+    "version": 1,
+}
+
+
+@pytest.fixture
+def compact_file(tmp_path):
+    filepath = tmp_path / "work_todo.tdf"
+    compact.write(filepath, DOCUMENT)
+    return CompactFile(filepath)
+
+
+def test_load_returns_the_written_document(compact_file):
+    assert compact_file.load() == DOCUMENT
+
+
+def test_iter_todos_yields_open_todos_first(compact_file):
+    assert [todo["id"] for todo in compact_file.iter_todos()] == [
+        "bbbb",
+        "cccc",
+        "aaaa",
+    ]
+    assert list(compact_file.iter_todos(done=True)) == [DOCUMENT["todos"][0]]
+    assert next(compact_file.iter_todos(done=False)) == DOCUMENT["todos"][1]
+
+
+def test_empty_document(tmp_path):
+    filepath = tmp_path / "work_todo.tdf"
+    compact.write(filepath, {"todos": []})
+
+    assert CompactFile(filepath).load() == {"todos": []}
+    assert list(CompactFile(filepath).iter_todos()) == []
+
+
+def test_smaller_than_the_json_snapshot(compact_file, tmp_path):
+    document = {
+        "todos": [
+            {"done": False, "id": f"{i:040x}", "title": f"Task {i}"}
+            for i in range(1000)
+        ]
+    }
+    compact.write(compact_file.filepath, document)
+
+    json_size = len(json.dumps(document, sort_keys=True, indent=4))
+    assert compact_file.filepath.stat().st_size < json_size * 0.8
+
+
+def test_rejects_files_in_another_format(tmp_path):
+    filepath = tmp_path / "work_todo.tdf"
+    filepath.write_text('{"todos": []}')
+
+    with pytest.raises(ValueError, match="is not a compact todoforge file"):
+        CompactFile(filepath).load()
+
+    filepath.write_bytes(b"")
+    with pytest.raises(ValueError, match="is not a compact todoforge file"):
+        list(CompactFile(filepath).iter_todos())
+
+
+def test_write_items_streams_the_same_file_as_write(compact_file, tmp_path):
+    filepath = tmp_path / "streamed_todo.tdf"
+    meta: dict = {}
+
+    def todos():
+        yield from DOCUMENT["todos"]
+        meta["version"] = 1
+
+    assert compact.write_items(filepath, todos(), meta) == 3
+    assert filepath.read_bytes() == compact_file.filepath.read_bytes()
+    # The temporary files are gone.
+    assert sorted(tmp_path.iterdir()) == sorted([compact_file.filepath, filepath])
+
+
+def test_records_and_meta(compact_file):
+    assert list(compact_file.records()) == DOCUMENT["todos"]
+    assert compact_file.meta() == {"version": 1}
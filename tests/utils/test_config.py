@@ -1,7 +1,7 @@
 import json
 import tempfile
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -110,12 +110,38 @@ def test_read_from_file_with_invalid_json_contents(todo_config):
     assert "Failed to parse JSON from" in str(excinfo.value)
 
 
-def test_write_to_file(todo_config):
-    mock_filepath = Path("data.json")
+def test_write_to_file(todo_config, tmp_path):
+    filepath = tmp_path / "data.json"
     content = {"todos": []}
-    with patch("builtins.open", MagicMock()) as mock_open:
-        todo_config._write_to_file(mock_filepath, content)
-        mock_open.assert_called_once_with(mock_filepath, "w")
+    with patch("os.fsync") as mock_fsync:
+        todo_config._write_to_file(filepath, content)
+        # The file, then the folder holding the rename.
+        assert mock_fsync.call_count == 2
+
+    assert json.loads(filepath.read_text()) == content
+    assert list(tmp_path.iterdir()) == [filepath]
+
+
+def test_write_to_file_keeps_old_content_when_write_fails(todo_config, tmp_path):
+    filepath = tmp_path / "data.json"
+    filepath.write_text('{"todos": []}')
+
+    with patch("json.dump", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            todo_config._write_to_file(filepath, {"todos": [{"id": "1234"}]})
+
+    assert json.loads(filepath.read_text()) == {"todos": []}
+    assert list(tmp_path.iterdir()) == [filepath]
+
+
+def test_write_to_file_raises_the_error_that_kept_the_file_from_being_created(
+    todo_config, tmp_path
+):
+    with pytest.raises(PermissionError):
+        with patch("builtins.open", side_effect=PermissionError):
+            todo_config._write_to_file(tmp_path / "data.json", {"todos": []})
+
+    assert list(tmp_path.iterdir()) == []
 
 
 def test_get_value_from_config_with_non_empty_configuration(todo_config):
@@ -162,3 +188,134 @@ def test_get_value_from_config_with_return_value_as_a_list_but_expected_type_as_
             match="Field 'spaces' is expected to be of type str, but got list",
         ):
             todo_config._get_value_from_config("spaces", str)
+
+
+def test_load_config_serves_cached_content_until_the_file_changes(
+    todo_config, tmp_path
+):
+    filepath = tmp_path / "work_todo.json"
+    filepath.write_text('{"todos": []}')
+
+    assert todo_config.get(filepath) == {"todos": []}
+    assert todo_config.get(filepath) == {"todos": []}
+    assert todo_config.cache_info()[:2] == (1, 1)
+
+    # Another process replaces the file behind our back.
+    other = TodoConfig()
+    other.save(filepath, {"todos": [{"id": "1234"}]})
+
+    assert todo_config.get(filepath) == {"todos": [{"id": "1234"}]}
+    assert todo_config.cache_info()[:2] == (1, 2)
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    todo_config = TodoConfig(max_entries=2)
+    filepaths = [tmp_path / f"{space}_todo.json" for space in ("a", "b", "c")]
+    for filepath in filepaths:
+        filepath.write_text('{"todos": []}')
+
+    todo_config.get(filepaths[0])
+    todo_config.get(filepaths[1])
+    todo_config.get(filepaths[0])
+    todo_config.get(filepaths[2])
+
+    info = todo_config.cache_info()
+    assert (info.entries, info.evictions) == (2, 1)
+
+    todo_config.get(filepaths[0])
+    assert todo_config.cache_info().hits == 2
+    todo_config.get(filepaths[1])
+    assert todo_config.cache_info().misses == 4
+
+
+def test_cache_stays_under_its_byte_budget(tmp_path):
+    todo_config = TodoConfig(max_bytes=100)
+    small = tmp_path / "small.json"
+    small.write_text(json.dumps({"todos": ["x" * 40]}))
+    large = tmp_path / "large.json"
+    large.write_text(json.dumps({"todos": ["x" * 200]}))
+
+    todo_config.get(small)
+    todo_config.get(large)
+    todo_config.save(tmp_path / "other.json", {"todos": ["y" * 40]})
+
+    info = todo_config.cache_info()
+    assert info.entries == 1
+    assert info.bytes <= 100
+    assert info.evictions == 1
+
+
+def test_invalidate_and_clear_cache(todo_config, tmp_path):
+    filepath = tmp_path / "work_todo.json"
+    todo_config.save(filepath, {"todos": []})
+
+    todo_config.invalidate(filepath)
+    assert todo_config.cache_info().entries == 0
+
+    todo_config.get(filepath)
+    todo_config.clear_cache()
+    assert todo_config.cache_info()[3:5] == (0, 0)
+
+
+def test_iter_items_streams_a_list_in_small_chunks(todo_config, tmp_path):
+    filepath = tmp_path / "work_todo.json"
+    todos = [
+        {"id": str(i), "title": "}] " * (i % 5), "done": i % 2 == 0} for i in range(50)
+    ]
+    todo_config.save(filepath, {"a": [1, {"b": "]"}], "todos": todos, "version": 10})
+
+    rest: dict = {}
+    with patch("todoforge.utils.config.READ_CHUNK_SIZE", 7):
+        assert list(todo_config.iter_items(filepath, "todos", rest)) == todos
+
+    assert rest == {"a": [1, {"b": "]"}], "version": 10}
+
+
+def test_iter_items_with_an_empty_or_missing_list(todo_config, tmp_path):
+    filepath = tmp_path / "work_todo.json"
+    for content in ({"todos": []}, {}):
+        todo_config.save(filepath, content)
+
+        assert list(todo_config.iter_items(filepath, "todos")) == []
+
+
+def test_iter_items_with_a_truncated_file(todo_config, tmp_path):
+    filepath = tmp_path / "work_todo.json"
+    filepath.write_text('{"todos": [{"id": "1234"}, {"id": "23')
+
+    with pytest.raises(ValueError, match="Failed to parse JSON"):
+        list(todo_config.iter_items(filepath, "todos"))
+
+    with pytest.raises(FileNotFoundError):
+        list(todo_config.iter_items(tmp_path / "other.json", "todos"))
+
+
+def test_save_items_writes_what_save_writes(todo_config, tmp_path):
+    todos = [{"id": "1234", "title": "Test Task #1", "tags": ["a", "b"]}, {"id": "2"}]
+    todo_config.save(tmp_path / "saved.json", {"todos": todos})
+
+    count = todo_config.save_items(tmp_path / "streamed.json", "todos", iter(todos))
+
+    assert count == 2
+    assert (tmp_path / "streamed.json").read_text() == (
+        tmp_path / "saved.json"
+    ).read_text()
+
+
+def test_save_items_reads_the_other_keys_after_the_items(todo_config, tmp_path):
+    filepath = tmp_path / "work_todo.json"
+    content: dict = {}
+
+    def todos():
+        yield {"id": "1234"}
+        content.update({"version": {"major": 1}, "name": "work"})
+
+    todo_config.save_items(filepath, "todos", todos(), content)
+
+    assert todo_config.get(filepath) == {
+        "name": "work",
+        "todos": [{"id": "1234"}],
+        "version": {"major": 1},
+    }
+    todo_config.save_items(filepath, "todos", [])
+    assert todo_config.get(filepath) == {"todos": []}
@@ -1,10 +1,30 @@
+import json
 from unittest.mock import patch
 
 import pytest
 
+from todoforge.utils.backends import JsonBackend
 from todoforge.utils.config import todo_config
-from todoforge.utils.constants import DEFAULT_TODO_FOLDER
-from todoforge.utils.db import get_todos, save_todos
+from todoforge.utils.db import (
+    add_todos,
+    get_todos,
+    remove_todos,
+    save_todos,
+    search_todos,
+    update_todos,
+)
+from todoforge.utils.registry import get_registry
+from todoforge.utils.search import parse_query
+
+
+@pytest.fixture(autouse=True)
+def mock_default_todo_folder(tmp_path):
+    with patch(
+        "todoforge.utils.db.get_backend", return_value=JsonBackend(tmp_path)
+    ), patch(
+        "todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=tmp_path / "config.json"
+    ):
+        yield tmp_path
 
 
 @pytest.fixture
@@ -50,7 +70,7 @@ def test_get_todos_when_the_todo_list_is_not_empty(mock_todo_config):
     mock_get.assert_called_once()
 
 
-def test_save_todos_for_given_todos_dict(mock_todo_config):
+def test_save_todos_for_given_todos_dict(mock_todo_config, mock_default_todo_folder):
     mock_get_current_space, _, mock_save = mock_todo_config
     mock_get_current_space.return_value = "work"
     mock_save.return_value = None
@@ -65,5 +85,141 @@ def test_save_todos_for_given_todos_dict(mock_todo_config):
 
     mock_get_current_space.assert_called_once()
     mock_save.assert_called_once_with(
-        filepath=DEFAULT_TODO_FOLDER / "work_todo.json", content=todos_dict
+        filepath=mock_default_todo_folder / "work_todo.json", content=todos_dict
     )
+
+
+def test_mutations_are_appended_to_the_log_and_replayed_by_get_todos(
+    mock_todo_config, mock_default_todo_folder
+):
+    mock_get_current_space, mock_get, mock_save = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get.return_value = {
+        "todos": [{"done": False, "id": "1234", "title": "Test Task #1"}]
+    }
+
+    add_todos(todos=[{"done": False, "id": "2345", "title": "Test Task #2"}])
+    update_todos(todo_ids=["1234"], updates={"done": True})
+    remove_todos(todo_ids=["2345"])
+
+    todos = get_todos()
+
+    assert todos["todos"] == [{"done": True, "id": "1234", "title": "Test Task #1"}]
+    assert (mock_default_todo_folder / "work_todo.log").exists()
+    mock_save.assert_not_called()
+
+
+def test_save_todos_clears_the_operation_log(
+    mock_todo_config, mock_default_todo_folder
+):
+    mock_get_current_space, _, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+
+    add_todos(todos=[{"done": False, "id": "2345", "title": "Test Task #2"}])
+    save_todos(todos={"todos": []})
+
+    assert not (mock_default_todo_folder / "work_todo.log").exists()
+
+
+def test_log_is_compacted_once_it_crosses_the_threshold(
+    mock_todo_config, mock_default_todo_folder
+):
+    mock_get_current_space, mock_get, mock_save = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get.return_value = {"todos": []}
+
+    with patch("todoforge.utils.oplog.COMPACT_THRESHOLD", new=0):
+        add_todos(todos=[{"done": False, "id": "2345", "title": "Test Task #2"}])
+
+    mock_save.assert_called_once_with(
+        filepath=mock_default_todo_folder / "work_todo.json",
+        content={"todos": [{"done": False, "id": "2345", "title": "Test Task #2"}]},
+    )
+    assert not (mock_default_todo_folder / "work_todo.log").exists()
+
+
+def test_search_index_is_built_on_first_search_and_kept_up_to_date(
+    mock_todo_config, mock_default_todo_folder
+):
+    mock_get_current_space, mock_get, _ = mock_todo_config
+    mock_get_current_space.return_value = "work"
+    mock_get.return_value = {
+        "todos": [{"done": False, "id": "1234", "title": "Write report"}]
+    }
+
+    assert search_todos(parse_query("report"), "work") == [
+        {"id": "1234", "title": "Write report"}
+    ]
+    assert (mock_default_todo_folder / "work_search.idx").exists()
+
+    add_todos(todos=[{"done": False, "id": "2345", "title": "Review report"}])
+    update_todos(todo_ids=["1234"], updates={"title": "Write summary"})
+    update_todos(todo_ids=["2345"], updates={"done": True})
+
+    assert search_todos(parse_query("report"), "work") == [
+        {"id": "2345", "title": "Review report"}
+    ]
+
+    remove_todos(todo_ids=["2345"])
+
+    assert search_todos(parse_query("report"), "work") == []
+    assert search_todos(parse_query("sum*"), "work") == [
+        {"id": "1234", "title": "Write summary"}
+    ]
+
+
+def test_search_index_is_rebuilt_once_the_space_changed_behind_it(
+    mock_default_todo_folder,
+):
+    backend = JsonBackend(mock_default_todo_folder)
+    backend.save(
+        "work", {"todos": [{"done": False, "id": "1234", "title": "Write report"}]}
+    )
+    search_todos(parse_query("report"), "work")
+    search_log = mock_default_todo_folder / "work_search.log"
+
+    add_todos([{"done": False, "id": "2345", "title": "Review report"}], "work")
+    update_todos(["1234"], {"done": True}, "work")
+
+    assert len(search_todos(parse_query("report"), "work")) == 2
+    # Changes made through db keep the index fresh, so it was not rebuilt.
+    assert search_log.stat().st_size > 0
+
+    # As a crash between the change to the space and the one to its index would.
+    backend.add("work", [{"done": False, "id": "3456", "title": "File report"}])
+
+    assert [todo["id"] for todo in search_todos(parse_query("report"), "work")] == [
+        "1234",
+        "2345",
+        "3456",
+    ]
+    assert not search_log.exists() or search_log.stat().st_size == 0
+
+
+def test_mutations_keep_the_spaces_registry_up_to_date(mock_default_todo_folder):
+    (mock_default_todo_folder / "config.json").write_text(
+        json.dumps({"current_space": "work", "spaces": ["work"]})
+    )
+    todo_config.invalidate(mock_default_todo_folder / "config.json")
+    backend = JsonBackend(mock_default_todo_folder)
+    backend.save("work", {"todos": [{"done": True, "id": "1234", "title": "One"}]})
+
+    with patch.object(todo_config, "get_current_space", return_value="work"):
+        add_todos(
+            todos=[
+                {"done": False, "id": "2345", "title": "Two"},
+                {"done": False, "id": "3456", "title": "Three"},
+            ]
+        )
+        update_todos(todo_ids=["2345", "1234"], updates={"done": True})
+        remove_todos(todo_ids=["3456"])
+        registry = get_registry()
+
+        assert registry["work"]["todos"] == 2
+        assert registry["work"]["open"] == 0
+        assert registry["work"]["size"] == backend.space_size("work")
+
+        save_todos({"todos": [{"done": False, "id": "1234", "title": "One"}]})
+
+    assert get_registry()["work"]["todos"] == 1
+    assert get_registry()["work"]["open"] == 1
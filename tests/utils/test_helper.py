@@ -1,16 +1,41 @@
-from pathlib import Path
-from unittest.mock import patch
+import json
+from contextlib import nullcontext
+from unittest.mock import Mock, call, patch
 
 import pytest
 
-from todoforge.utils.constants import DEFAULT_TODO_FOLDER
+from todoforge.utils import archive, db
+from todoforge.utils.backends import BufferedBackend, JsonBackend
 from todoforge.utils.helper import (
     _update_todo,
+    add_todos_from_lines,
+    archive_todos,
+    auto_archive,
     edit_task_title_from_todo,
     handle_toggle_space_key,
+    import_todos,
     remove_task_from_todo,
+    remove_tasks_from_todo,
     update_todo_status,
+    update_todos_status,
 )
+from todoforge.utils.idindex import resolve_prefix
+from todoforge.utils.selectors import build_selector
+
+
+@pytest.fixture(autouse=True)
+def mock_auto_archive():
+    # Never apply an archive policy found in the real config.json.
+    with patch("todoforge.utils.helper.auto_archive", return_value=0) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_space_lock():
+    with patch(
+        "todoforge.utils.helper.space_lock", side_effect=nullcontext
+    ) as mock_space_lock:
+        yield mock_space_lock
 
 
 @pytest.fixture
@@ -24,10 +49,19 @@ def mock_todo_data():
 
 
 @pytest.fixture
-def mock_get_todos(mock_todo_data):
-    with patch("todoforge.utils.helper.get_todos") as mock_get_todos:
-        mock_get_todos.return_value = mock_todo_data
-        yield mock_get_todos
+def mock_resolve_todo_id(mock_todo_data):
+    def resolve_todo_id(todo_id):
+        matches = [
+            todo["id"]
+            for todo in mock_todo_data["todos"]
+            if todo["id"].startswith(todo_id)
+        ]
+        return resolve_prefix(todo_id, matches)
+
+    with patch(
+        "todoforge.utils.helper.resolve_todo_id", side_effect=resolve_todo_id
+    ) as mock:
+        yield mock
 
 
 @pytest.fixture
@@ -40,80 +74,371 @@ def mock_get_current_space():
 
 
 @pytest.fixture
-def mock_save():
-    with patch("todoforge.utils.config.todo_config.save") as mock_save:
-        mock_save.return_value = None
-        yield mock_save
+def mock_update_todos():
+    with patch("todoforge.utils.helper.update_todos") as mock_update_todos:
+        mock_update_todos.return_value = None
+        yield mock_update_todos
+
+
+@pytest.fixture
+def mock_remove_todos():
+    with patch("todoforge.utils.helper.remove_todos") as mock_remove_todos:
+        mock_remove_todos.return_value = None
+        yield mock_remove_todos
+
+
+# Test add_todos_from_lines
+def test_add_todos_from_lines_commits_once_in_batches(mock_get_current_space):
+    lines = (f"Task #{i}\n" if i % 10 else "   \n" for i in range(1, 101))
+
+    with patch("todoforge.utils.helper.add_todos") as mock_add_todos, patch(
+        "todoforge.utils.models.validate_todos", side_effect=lambda todos: todos
+    ) as mock_validate_todos:
+        count = add_todos_from_lines(lines=lines, batch_size=25)
+
+    assert count == 90
+    assert mock_validate_todos.call_count == 4
+    mock_add_todos.assert_called_once()
+    todos = mock_add_todos.call_args.kwargs["todos"]
+    assert len({todo["id"] for todo in todos}) == 90
+    assert todos[0]["title"] == "Task #1"
+    assert todos[0]["done"] is False
+    assert todos[0]["created_at"] == todos[-1]["created_at"]
+
+
+def test_add_todos_from_lines_with_identical_titles(mock_get_current_space):
+    with patch("todoforge.utils.helper.add_todos") as mock_add_todos:
+        count = add_todos_from_lines(lines=["Same task"] * 3)
+
+    assert count == 3
+    todos = mock_add_todos.call_args.kwargs["todos"]
+    assert len({todo["id"] for todo in todos}) == 3
+
+
+def test_add_todos_from_lines_without_titles(mock_get_current_space):
+    with patch("todoforge.utils.helper.add_todos") as mock_add_todos:
+        count = add_todos_from_lines(lines=["", "\n"])
+
+    assert count == 0
+    mock_add_todos.assert_not_called()
 
 
 # Test update_todo_status
+def test_import_todos_validates_dedupes_and_commits_in_batches(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.save("work", {"todos": [{"done": False, "id": "0000", "title": "Old"}]})
+    records = [
+        {"id": f"{i:04d}", "title": f"Task #{i}", "done": "true"} for i in range(5)
+    ] + [{"id": "0003", "title": "Duplicate"}, {"title": "Without id"}]
+
+    with patch("todoforge.utils.helper.get_backend", return_value=backend), patch(
+        "todoforge.utils.helper.add_todos", side_effect=backend.add
+    ) as mock_add_todos:
+        imported, skipped = import_todos(iter(records), space="work", batch_size=3)
+
+    assert (imported, skipped) == (5, 2)
+    assert mock_add_todos.call_count == 3
+    todos = backend.load("work")["todos"]
+    assert [todo["title"] for todo in todos] == [
+        "Old",
+        *(f"Task #{i}" for i in range(1, 5)),
+        "Without id",
+    ]
+    assert all(todo["done"] for todo in todos[1:5])
+    assert todos[-1]["id"] not in {"0000", "0003"}
+
+
+def test_import_todos_reports_the_invalid_record(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.create_space("work")
+    records = [{"title": "Task #1"}, {"title": "Task #2"}, {"title": "Task #3"}, {}]
+
+    with patch("todoforge.utils.helper.get_backend", return_value=backend), patch(
+        "todoforge.utils.helper.add_todos", side_effect=backend.add
+    ):
+        with pytest.raises(ValueError, match="Record 4 is not a valid todo: title"):
+            import_todos(records, space="work", batch_size=2)
+
+    # The batch before the invalid record was committed.
+    assert len(backend.load("work")["todos"]) == 2
+
+
+@pytest.fixture
+def archive_home(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"current_space": "work", "spaces": ["work"]}))
+    backend = JsonBackend(tmp_path)
+    backend.save(
+        "work",
+        {
+            "todos": [
+                {"done": i % 2 == 0, "id": f"{i:04d}", "title": f"Task #{i}"}
+                for i in range(10)
+            ]
+        },
+    )
+    with patch("todoforge.utils.helper.get_backend", return_value=backend), patch(
+        "todoforge.utils.db.get_backend", return_value=backend
+    ), patch("todoforge.utils.helper.DEFAULT_TODO_CONFIG", new=config_path), patch(
+        "todoforge.utils.config.DEFAULT_TODO_CONFIG", new=config_path
+    ), patch(
+        "todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=config_path
+    ):
+        yield backend
+
+
+def set_policy(backend, policy):
+    config_path = backend.root / "config.json"
+    config = json.loads(config_path.read_text())
+    config_path.write_text(json.dumps({**config, archive.POLICY_KEY: policy}))
+
+
+def test_archive_todos_moves_completed_todos_to_the_archive(archive_home):
+    assert archive_todos("work", keep=2) == 3
+
+    todos = archive_home.load("work")["todos"]
+    assert [todo["id"] for todo in todos] == [
+        "0001",
+        "0003",
+        "0005",
+        "0006",
+        "0007",
+        "0008",
+        "0009",
+    ]
+    archived = archive.Archive(archive_home.root, "work")
+    assert [todo["id"] for todo in archived.iter_todos()] == ["0000", "0002", "0004"]
+
+    assert archive_todos("work") == 2
+    assert archive_todos("work") == 0
+    assert len(list(archived.iter_todos())) == 5
+
+
+def test_archive_todos_finishes_a_run_cut_short_by_a_crash(archive_home):
+    archived = archive.Archive(archive_home.root, "work")
+    # A crash after the append, before the todos were removed from the space.
+    archived.append(archive_home.load("work")["todos"][:2])
+
+    assert [todo["id"] for todo in db.iter_archived_todos("work")] == []
+
+    assert archive_todos("work", keep=5) == 0
+
+    assert not archived.pending_filepath.exists()
+    assert [todo["id"] for todo in archived.iter_todos()] == ["0000", "0001"]
+    assert [todo["id"] for todo in archive_home.load("work")["todos"]][:2] == [
+        "0002",
+        "0003",
+    ]
+
+
+def test_archive_todos_through_the_daemon_removes_before_committing(archive_home):
+    backend = BufferedBackend(archive_home)
+    with patch("todoforge.utils.helper.get_backend", return_value=backend), patch(
+        "todoforge.utils.db.get_backend", return_value=backend
+    ), patch.object(archive_home, "lock", wraps=archive_home.lock) as mock_lock:
+        assert archive_todos("work", keep=2) == 3
+
+    mock_lock.assert_called_with("work")
+    archived = archive.Archive(archive_home.root, "work")
+    assert not archived.pending_filepath.exists()
+    # The removal reached the disk without waiting for the daemon to flush.
+    assert [todo["id"] for todo in archive_home.load("work")["todos"]][:3] == [
+        "0001",
+        "0003",
+        "0005",
+    ]
+    assert backend.dirty == set()
+
+
+def test_auto_archive_applies_the_policy_once_it_is_due(archive_home, monkeypatch):
+    monkeypatch.setattr("todoforge.utils.helper.AUTO_ARCHIVE_SLACK", 3)
+
+    assert auto_archive("work") == 0
+
+    set_policy(archive_home, {"keep": 2})
+    # 5 completed todos are within the slack of the 2 kept.
+    assert auto_archive("work") == 0
+    archive_home.update("work", ["0001"], {"done": True})
+    with patch("todoforge.utils.helper.registry.get_stats") as mock_get_stats:
+        mock_get_stats.return_value = {"work": {"todos": 10, "open": 4}}
+        assert auto_archive("work") == 4
+
+    set_policy(archive_home, {"older_than": "1d"})
+    # Checked just now, so not due again for a day.
+    assert auto_archive("work") == 0
+
+
+def test_update_todos_status_applies_the_archive_policy_when_marking_done(
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_current_space,
+    mock_update_todos,
+    mock_auto_archive,
+):
+    update_todos_status(["1234"], status=False)
+    mock_auto_archive.assert_not_called()
+
+    update_todos_status(["1234"], status=True)
+    mock_auto_archive.assert_called_once_with()
+
+
 def test_update_todo_status_to_true(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_update_todos
 ):
     update_todo_status("1234", True)
 
-    assert mock_todo_data["todos"][0]["done"]
-    mock_save.assert_called_once_with(
-        filepath=Path(DEFAULT_TODO_FOLDER / "work_todo.json"),
-        content=mock_todo_data,
-    )
+    mock_update_todos.assert_called_once_with(todo_ids=["1234"], updates={"done": True})
 
 
 # Test update_todo_status
 def test_update_todo_status_to_false(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_update_todos
 ):
     update_todo_status("1234", True)
     update_todo_status("1234", False)
 
-    assert not mock_todo_data["todos"][0]["done"]
-    assert mock_save.call_count == 2
-    mock_save.assert_called_with(
-        filepath=Path(DEFAULT_TODO_FOLDER / "work_todo.json"),
-        content=mock_todo_data,
-    )
+    assert mock_update_todos.call_count == 2
+    mock_update_todos.assert_called_with(todo_ids=["1234"], updates={"done": False})
 
 
 # Test edit_task_title_from_todo
 def test_edit_task_title_from_todo(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_update_todos
 ):
-    original_todo_title = mock_todo_data["todos"][0]["title"]
-
     edit_task_title_from_todo("1234", "Updated Task")
 
-    assert original_todo_title == "Sample Task"
-    assert mock_todo_data["todos"][0]["title"] == "Updated Task"
-    assert mock_save.call_count == 1
-    mock_save.assert_called_once_with(
-        filepath=Path(DEFAULT_TODO_FOLDER / "work_todo.json"),
-        content=mock_todo_data,
+    assert mock_update_todos.call_count == 1
+    mock_update_todos.assert_called_once_with(
+        todo_ids=["1234"], updates={"title": "Updated Task"}
     )
 
 
 # Test remove_task_from_todo
 def test_remove_task_from_todo(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_remove_todos
 ):
     remove_task_from_todo("1234")
 
-    assert len(mock_todo_data["todos"]) == 1
-    assert mock_todo_data["todos"][0]["id"] == "5678"
-    assert mock_save.call_count == 1
-    mock_save.assert_called_once_with(
-        filepath=Path(DEFAULT_TODO_FOLDER / "work_todo.json"),
-        content=mock_todo_data,
-    )
+    assert mock_remove_todos.call_count == 1
+    mock_remove_todos.assert_called_once_with(todo_ids=["1234"])
 
 
 def test_remove_task_from_todo_not_found(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save, capsys
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_current_space,
+    mock_remove_todos,
+    capsys,
 ):
     remove_task_from_todo("9999")
 
     captured = capsys.readouterr()
     assert "Id '9999' not found." in captured.out
-    mock_save.assert_not_called()
+    mock_remove_todos.assert_not_called()
+
+
+def test_remove_task_from_todo_does_not_match_ids_by_substring(
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_remove_todos
+):
+    remove_task_from_todo("34")
+
+    mock_remove_todos.assert_not_called()
+
+
+def test_remove_task_from_todo_with_ambiguous_id(
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_current_space,
+    mock_remove_todos,
+    capsys,
+):
+    mock_todo_data["todos"].append({"id": "1299", "title": "Third", "done": False})
+
+    remove_task_from_todo("12")
+
+    captured = capsys.readouterr()
+    assert "Id '12' is ambiguous, it matches 1234, 1299." in captured.out
+    mock_remove_todos.assert_not_called()
+
+
+# Test update_todos_status / remove_tasks_from_todo
+@pytest.fixture
+def mock_get_todos(mock_todo_data):
+    with patch("todoforge.utils.helper.get_todos") as mock_get_todos:
+        mock_get_todos.return_value = mock_todo_data
+        yield mock_get_todos
+
+
+def test_update_todos_status_with_many_ids(
+    mock_resolve_todo_id, mock_get_current_space, mock_update_todos, capsys
+):
+    update_todos_status(["12", "56"], True)
+
+    mock_update_todos.assert_called_once_with(
+        todo_ids=["1234", "5678"], updates={"done": True}
+    )
+    assert "2 todos updated successfully." in capsys.readouterr().out
+
+
+def test_update_todos_status_with_missing_id_changes_nothing(
+    mock_resolve_todo_id, mock_get_current_space, mock_update_todos, capsys
+):
+    update_todos_status(["12", "99", "98"], True)
+
+    assert "Cannot find todos '99, 98' in todos list." in capsys.readouterr().out
+    mock_update_todos.assert_not_called()
+
+
+def test_update_todos_status_with_selector(
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_todos,
+    mock_get_current_space,
+    mock_update_todos,
+):
+    selector = build_selector(title_matches="^Another")
+
+    update_todos_status(["1234"], False, selector=selector)
+
+    mock_get_todos.assert_called_once()
+    mock_update_todos.assert_called_once_with(
+        todo_ids=["1234", "5678"], updates={"done": False}
+    )
+
+
+def test_remove_tasks_from_todo_with_selectors(
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_todos,
+    mock_get_current_space,
+    mock_remove_todos,
+    capsys,
+):
+    mock_todo_data["todos"] = [
+        {"id": "1", "title": "Old", "done": True, "created_at": "2020-01-01T00:00:00Z"},
+        {"id": "2", "title": "Old open", "done": False, "created_at": "2020-01-01"},
+        {"id": "3", "title": "Legacy", "done": True},
+        {"id": "4", "title": "New", "done": True, "created_at": "2999-01-01T00:00Z"},
+    ]
+
+    selector = build_selector(all_done=True, older_than="30d")
+    remove_tasks_from_todo([], selector=selector)
+
+    mock_remove_todos.assert_called_once_with(todo_ids=["1"])
+    assert "1 todos have been removed." in capsys.readouterr().out
+
+
+def test_remove_tasks_from_todo_when_nothing_matches(
+    mock_resolve_todo_id,
+    mock_get_todos,
+    mock_get_current_space,
+    mock_remove_todos,
+    capsys,
+):
+    remove_tasks_from_todo([], selector=build_selector(all_done=True))
+
+    assert "No todos matched the given filters." in capsys.readouterr().out
+    mock_remove_todos.assert_not_called()
 
 
 # Test handle_toggle_space_key
@@ -129,23 +454,34 @@ def test_handle_toggle_space_key():
     assert not updated_todos[1]["done"]
 
 
+def test_handle_toggle_space_key_appends_to_the_journal():
+    todos = [{"id": "1", "title": "Sample Task 1", "done": False}]
+    journal = Mock()
+
+    handle_toggle_space_key(todos, 0, toggle_journal=journal)
+    handle_toggle_space_key(todos, 0, toggle_journal=journal)
+
+    assert journal.append.call_args_list == [call("1", True), call("1", False)]
+
+
 # Test _update_todo
 def test_update_todo_found(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save
+    mock_todo_data, mock_resolve_todo_id, mock_get_current_space, mock_update_todos
 ):
 
     _update_todo("1234", {"title": "Updated Title", "done": True})
 
-    assert mock_todo_data["todos"][0]["title"] == "Updated Title"
-    assert mock_todo_data["todos"][0]["done"] is True
-    mock_save.assert_called_once_with(
-        filepath=Path(DEFAULT_TODO_FOLDER / "work_todo.json"),
-        content=mock_todo_data,
+    mock_update_todos.assert_called_once_with(
+        todo_ids=["1234"], updates={"title": "Updated Title", "done": True}
     )
 
 
 def test_update_todo_not_found(
-    mock_todo_data, mock_get_todos, mock_get_current_space, mock_save, capsys
+    mock_todo_data,
+    mock_resolve_todo_id,
+    mock_get_current_space,
+    mock_update_todos,
+    capsys,
 ):
     _update_todo("9999", {"title": "Non-Existent Task", "done": True})
 
@@ -154,4 +490,4 @@ def test_update_todo_not_found(
         "Cannot find todo in todos list. Please check your todo id once."
         in captured.out
     )
-    mock_save.assert_not_called()
+    mock_update_todos.assert_not_called()
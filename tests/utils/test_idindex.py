@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from todoforge.utils.idindex import AmbiguousIdError, IdIndex, unique_prefix_lengths
+
+
+@pytest.fixture
+def id_index(tmp_path):
+    index = IdIndex(tmp_path / "work_todo.ids")
+    index.build(["5678", "1234", "1299", "abcdef"])
+    return index
+
+
+def test_build_stores_ids_sorted(id_index):
+    assert id_index.ids() == ["1234", "1299", "5678", "abcdef"]
+
+
+def test_matches_returns_every_id_with_prefix(id_index):
+    assert id_index.matches("12") == ["1234", "1299"]
+    assert id_index.matches("12", limit=1) == ["1234"]
+    assert id_index.matches("9") == []
+
+
+def test_resolve_partial_and_full_ids(id_index):
+    assert id_index.resolve("56") == "5678"
+    assert id_index.resolve("abcdef") == "abcdef"
+    assert id_index.resolve("0") is None
+
+
+def test_resolve_ambiguous_prefix(id_index):
+    with pytest.raises(AmbiguousIdError, match="Id '12' is ambiguous"):
+        id_index.resolve("12")
+
+
+def test_add_and_remove_keep_the_index_sorted(id_index):
+    id_index.add(["0000", "fffffffff"])
+    id_index.remove(["1299"])
+
+    assert id_index.ids() == ["0000", "1234", "5678", "abcdef", "fffffffff"]
+    assert id_index.resolve("12") == "1234"
+
+
+def test_add_appends_ids_that_sort_last_in_place(id_index):
+    size = id_index.filepath.stat().st_size
+
+    id_index.add(["b0", "b1"])
+
+    assert id_index.ids() == ["1234", "1299", "5678", "abcdef", "b0", "b1"]
+    assert id_index.filepath.stat().st_size == size + 2 * 6
+    assert id_index.resolve("b1") == "b1"
+
+    id_index.add(["0000"])
+    assert id_index.ids()[0] == "0000"
+
+
+def test_find_returns_the_ids_in_the_index(id_index):
+    assert id_index.find(["1234", "12", "abcdef", "zzzz", "1234"]) == {
+        "1234",
+        "abcdef",
+    }
+
+
+def test_empty_index(tmp_path):
+    index = IdIndex(tmp_path / "work_todo.ids")
+    index.build([])
+
+    assert index.ids() == []
+    assert index.resolve("1") is None
+    assert index.find(["1"]) == set()
+
+
+def test_is_fresh_compares_against_source_files(tmp_path, id_index):
+    source = tmp_path / "work_todo.log"
+    source.write_text("")
+    os.utime(id_index.filepath, ns=(0, 0))
+
+    assert not id_index.is_fresh(source)
+
+    id_index.touch()
+
+    assert id_index.is_fresh(source, tmp_path / "missing.json")
+
+
+def test_unique_prefix_lengths():
+    assert unique_prefix_lengths(["1234", "5678"]) == {"1234": 4, "5678": 4}
+    assert unique_prefix_lengths(["123456", "123499", "9"], min_length=1) == {
+        "123456": 5,
+        "123499": 5,
+        "9": 1,
+    }
+    assert unique_prefix_lengths([]) == {}
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import ids
+from todoforge.utils.idindex import unique_prefix_lengths
+from todoforge.utils.ids import ALPHABET, id_timestamp, new_id
+
+
+@pytest.fixture(autouse=True)
+def fresh_generator():
+    # Ids are monotonic per process, so start every test from a clean state.
+    with patch.object(ids, "_last_timestamp", -1), patch.object(ids, "_last_random", 0):
+        yield
+
+
+def test_new_id_layout():
+    todo_id = new_id()
+
+    assert len(todo_id) == 26
+    assert set(todo_id) <= set(ALPHABET)
+
+
+def test_new_ids_sort_in_creation_order():
+    todo_ids = [new_id() for _ in range(1000)]
+
+    assert sorted(todo_ids) == todo_ids
+    assert len(set(todo_ids)) == 1000
+
+
+def test_ids_in_the_same_millisecond_count_up():
+    first = new_id(4_102_444_800_000)
+    second = new_id(4_102_444_800_000)
+    # A clock going back does not break the order either.
+    third = new_id(4_102_444_799_000)
+
+    assert first < second < third
+    assert first[:10] == second[:10] == third[:10]
+
+
+def test_ids_in_the_same_millisecond_keep_short_prefixes():
+    todo_ids = [new_id(4_102_444_800_000) for _ in range(100)]
+
+    assert sorted(todo_ids) == todo_ids
+    assert max(unique_prefix_lengths(todo_ids).values()) < 20
+
+
+def test_random_part_overflow_moves_to_the_next_millisecond():
+    with patch.object(ids, "_last_random", ids.MAX_RANDOM), patch.object(
+        ids, "_last_timestamp", 4_102_444_900_000
+    ):
+        todo_id = new_id(4_102_444_900_000)
+
+    assert id_timestamp(todo_id) == datetime.fromtimestamp(
+        4_102_444_900.001, tz=timezone.utc
+    )
+
+
+def test_id_timestamp():
+    created = datetime(2024, 5, 17, 12, 30, tzinfo=timezone.utc)
+
+    assert id_timestamp(new_id(int(created.timestamp() * 1000))) == created
+    # Legacy sha1 ids have no timestamp.
+    assert id_timestamp("3f786850e387550fdab836ed7e6dc881de23001b") is None
+    assert id_timestamp("not-a-valid-id-of-26-chars") is None
+    assert id_timestamp("zzzzzzzzzz0000000000000000") is None
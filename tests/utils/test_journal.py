@@ -0,0 +1,138 @@
+import itertools
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import journal, registry
+from todoforge.utils.archive import Archive
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.search import SearchIndex
+
+
+class Crash(BaseException):
+    """Stands for the process dying: nothing after it runs."""
+
+
+@contextmanager
+def crash_at(n: int):
+    """Raises Crash instead of making the `n`th file system change, from 0."""
+    calls = itertools.count()
+    crashed = False
+
+    def wrap(original):
+        def wrapper(*args, **kwargs):
+            nonlocal crashed
+            if not crashed and next(calls) == n:
+                crashed = True
+                raise Crash
+            return original(*args, **kwargs)
+
+        return wrapper
+
+    with patch.object(Path, "rename", wrap(Path.rename)), patch.object(
+        Path, "unlink", wrap(Path.unlink)
+    ), patch("os.replace", wrap(os.replace)):
+        yield lambda: next(calls)
+
+
+@contextmanager
+def home(root: Path):
+    """A todoforge home in `root` with a `work` and a `home` space."""
+    root.mkdir()
+    config_path = root / "config.json"
+    config_path.write_text(
+        json.dumps({"current_space": "home", "spaces": ["work", "home"]})
+    )
+    with patch("todoforge.utils.config.DEFAULT_TODO_CONFIG", new=config_path), patch(
+        "todoforge.utils.journal.DEFAULT_TODO_CONFIG", new=config_path
+    ), patch("todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=config_path):
+        backend = JsonBackend(root)
+        for space in ("work", "home"):
+            backend.save(
+                space, {"todos": [{"done": False, "id": "1234", "title": space}]}
+            )
+            registry.record_document(backend, space, backend.load(space))
+        backend.add("home", [{"done": True, "id": "2345", "title": "Buy milk"}])
+        SearchIndex(root, "home").build(backend.load("home")["todos"])
+        Archive(root, "home").append([{"done": True, "id": "3456", "title": "Old"}])
+        yield backend
+
+
+def state(backend: JsonBackend) -> dict:
+    config = json.loads((backend.root / "config.json").read_text())
+    return {
+        "current_space": config["current_space"],
+        "spaces": config["spaces"],
+        "registry": sorted(config["registry"]),
+        "files": sorted(
+            p.name
+            for p in backend.root.iterdir()
+            if not p.name.startswith(".")
+            and p.suffix != ".lock"
+            and p.name != "config.json"
+        ),
+        "todos": {space: backend.load(space) for space in config["spaces"]},
+    }
+
+
+OPERATIONS = {
+    journal.RENAME: {"op": journal.RENAME, "old_name": "home", "new_name": "house"},
+    journal.REMOVE: {"op": journal.REMOVE, "space": "home"},
+}
+
+
+@pytest.mark.parametrize("op", OPERATIONS)
+def test_operation_is_all_or_nothing_whatever_step_it_crashes_at(tmp_path, op):
+    operation = OPERATIONS[op]
+    with home(tmp_path / "expected") as backend:
+        before = state(backend)
+        with crash_at(-1) as count:
+            journal.run(backend, operation)
+            changes = count()
+        after = state(backend)
+
+    assert before != after
+    assert changes > len(journal.STEPS[op])
+    for n in range(changes):
+        with home(tmp_path / str(n)) as backend:
+            with crash_at(n), pytest.raises(Crash):
+                journal.run(backend, operation)
+
+            recovered = journal.recover(backend.root, backend)
+
+            assert recovered in (None, operation)
+            assert state(backend) == (before if recovered is None else after), n
+            assert not (backend.root / journal.JOURNAL_FILENAME).exists()
+
+
+def test_recover_without_a_journal_does_nothing(tmp_path):
+    with patch("todoforge.utils.journal._apply") as mock_apply:
+        assert journal.recover(tmp_path) is None
+
+    mock_apply.assert_not_called()
+
+
+def test_steps_can_run_again(tmp_path):
+    with home(tmp_path / "home") as backend:
+        operation = OPERATIONS[journal.RENAME]
+        journal.run(backend, operation)
+        after = state(backend)
+
+        for step in journal.STEPS[journal.RENAME]:
+            step(backend, operation)
+
+        assert state(backend) == after
+
+
+@pytest.mark.parametrize("op", OPERATIONS)
+def test_config_is_changed_as_read_under_its_lock(tmp_path, op):
+    with home(tmp_path / "home") as backend, patch.object(
+        journal.todo_config, "get_spaces_list", return_value=["home"]
+    ), patch.object(journal.todo_config, "get_current_space", return_value="home"):
+        journal.run(backend, OPERATIONS[op])
+
+        assert "work" in state(backend)["spaces"]
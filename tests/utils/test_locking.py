@@ -0,0 +1,59 @@
+import multiprocessing
+import threading
+
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.locking import file_lock
+
+
+def _add_todos(root, worker, count):
+    backend = JsonBackend(root)
+    for i in range(count):
+        todo_id = f"{worker:02d}{i:04d}"
+        backend.add("work", [{"done": False, "id": todo_id, "title": todo_id}])
+
+
+def test_file_lock_is_reentrant(tmp_path):
+    lockfile = tmp_path / "work_todo.lock"
+
+    with file_lock(lockfile):
+        with file_lock(lockfile):
+            pass
+
+    assert lockfile.exists()
+
+
+def test_file_lock_serializes_threads(tmp_path):
+    lockfile = tmp_path / "work_todo.lock"
+    events = []
+
+    def worker(name):
+        with file_lock(lockfile):
+            events.append(f"{name}:enter")
+            events.append(f"{name}:exit")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(0, len(events), 2):
+        assert events[i].split(":")[0] == events[i + 1].split(":")[0]
+
+
+def test_parallel_processes_do_not_lose_updates(tmp_path):
+    JsonBackend(tmp_path).create_space("work")
+
+    processes = [
+        multiprocessing.Process(target=_add_todos, args=(tmp_path, worker, 25))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    backend = JsonBackend(tmp_path)
+    ids = {todo["id"] for todo in backend.load("work")["todos"]}
+    assert len(ids) == 100
+    assert backend.resolve("work", "030024") == "030024"
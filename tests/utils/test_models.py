@@ -1,6 +1,14 @@
+from datetime import datetime, timezone
+
 import pytest
 
-from todoforge.utils.models import SpaceModel, TodoModel
+from todoforge.utils.models import (
+    SpaceModel,
+    TodoModel,
+    TodoRecord,
+    load_records,
+    validate_todos,
+)
 
 
 def test_space_model_should_throw_value_error_for_invalid_name():
@@ -15,11 +23,53 @@ def test_space_model_should_throw_value_error_for_invalid_name():
 def test_todo_model_generated_id_should_have_a_fixed_length_of_():
     title = "Task"
     todo = TodoModel(
-        id=TodoModel.generate_id(title=title),
+        id=TodoModel.generate_id(),
         title=title,
         done=False,
     )
 
-    assert len(todo.id) == 40
+    assert len(todo.id) == 26
     assert todo.title == "Task"
     assert isinstance(todo, TodoModel)
+
+
+def test_validate_todos_validates_the_whole_batch():
+    todos = validate_todos(
+        [{"id": "1234", "title": "Task #1"}, {"id": "2345", "title": "Task #2"}]
+    )
+
+    assert todos == [
+        {"id": "1234", "title": "Task #1", "done": False},
+        {"id": "2345", "title": "Task #2", "done": False},
+    ]
+
+    with pytest.raises(ValueError, match="1.title"):
+        validate_todos([{"id": "1234", "title": "Task #1"}, {"id": "2345"}])
+
+
+def test_load_records_validates_the_whole_space():
+    records = load_records(
+        [
+            {"id": "1234", "title": "Task #1", "tag": "a"},
+            {
+                "id": "2345",
+                "title": "Task #2",
+                "done": True,
+                "created_at": "2024-01-01T00:00:00+00:00",
+            },
+        ]
+    )
+
+    assert records == [
+        TodoRecord(id="1234", title="Task #1"),
+        TodoRecord(
+            id="2345",
+            title="Task #2",
+            done=True,
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        ),
+    ]
+    assert not hasattr(records[0], "__dict__")
+
+    with pytest.raises(ValueError, match="1.title"):
+        load_records([{"id": "1234", "title": "Task #1"}, {"id": "2345"}])
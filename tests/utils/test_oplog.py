@@ -0,0 +1,108 @@
+import pytest
+
+from todoforge.utils.oplog import OpLog
+
+
+@pytest.fixture
+def oplog(tmp_path):
+    return OpLog(tmp_path / "work_todo.log")
+
+
+def test_replay_without_a_log_returns_the_snapshot(oplog):
+    todos = [{"id": "1234", "title": "Test Task #1", "done": False}]
+
+    assert oplog.replay(todos) is todos
+
+
+def test_replay_applies_records_in_order(oplog):
+    todos = [{"id": "1234", "title": "Test Task #1", "done": False}]
+
+    oplog.append(
+        {
+            "op": "add",
+            "todos": [{"id": "2345", "title": "Test Task #2", "done": False}],
+        },
+        {"op": "update", "ids": ["1234", "2345"], "fields": {"done": True}},
+        {"op": "remove", "ids": ["1234"]},
+    )
+
+    assert oplog.replay(todos) == [
+        {"id": "2345", "title": "Test Task #2", "done": True}
+    ]
+    # The snapshot itself is never mutated.
+    assert todos[0]["done"] is False
+
+
+def test_read_ignores_a_torn_trailing_record(oplog):
+    oplog.append({"op": "remove", "ids": ["1234"]})
+    with open(oplog.filepath, "a") as f:
+        f.write('{"op": "remo')
+
+    assert oplog.read() == [{"op": "remove", "ids": ["1234"]}]
+
+
+def test_append_after_a_torn_record_keeps_the_records_that_follow(oplog):
+    todos = [{"id": "1234", "title": "Test Task", "done": False}]
+    oplog.append({"op": "update", "ids": ["1234"], "fields": {"done": True}})
+    with open(oplog.filepath, "a") as f:
+        f.write('{"op": "remo')
+
+    oplog.append({"op": "add", "todos": [{"id": "2345", "title": "Two"}]})
+    oplog.append({"op": "update", "ids": ["2345"], "fields": {"done": True}})
+
+    expected = [
+        {"id": "1234", "title": "Test Task", "done": True},
+        {"id": "2345", "title": "Two", "done": True},
+    ]
+    assert len(oplog.read()) == 3
+    assert oplog.replay(todos) == expected
+    assert list(oplog.replay_iter(todos)) == expected
+
+
+def test_records_skip_a_line_that_is_not_a_record(oplog):
+    oplog.filepath.write_text(
+        '{"op": "remove", "ids": ["1234"]}\n{"op": "remo\n'
+        '{"op": "remove", "ids": ["2345"]}\n'
+    )
+
+    assert [record["ids"] for record in oplog.records()] == [["1234"], ["2345"]]
+
+
+def test_append_returns_the_log_size_and_clear_removes_the_log(oplog):
+    size = oplog.append({"op": "remove", "ids": ["1234"]})
+
+    assert size == oplog.size() > 0
+
+    oplog.clear()
+
+    assert oplog.size() == 0
+    assert not oplog.filepath.exists()
+
+
+def test_replay_iter_yields_what_replay_returns(oplog):
+    todos = [
+        {"id": "1234", "title": "Test Task #1", "done": False},
+        {"id": "2345", "title": "Test Task #2", "done": False},
+        {"id": "3456", "title": "Test Task #3", "done": False},
+    ]
+
+    oplog.append(
+        {"op": "add", "todos": [{"id": "4567", "title": "Test Task #4"}]},
+        {"op": "update", "ids": ["1234", "4567", "9999"], "fields": {"done": True}},
+        {"op": "remove", "ids": ["2345", "1234"]},
+        {"op": "add", "todos": [{"id": "1234", "title": "Again", "done": False}]},
+        {"op": "add", "todos": [{"id": "3456", "title": "Replaced", "done": False}]},
+        {"op": "update", "ids": ["2345"], "fields": {"done": True}},
+    )
+
+    replayed = list(oplog.replay_iter(iter(todos)))
+
+    assert replayed == oplog.replay(todos)
+    assert [todo["id"] for todo in replayed] == ["3456", "4567", "1234"]
+    assert replayed[0]["title"] == "Replaced"
+
+
+def test_replay_iter_without_a_log_yields_the_snapshot(oplog):
+    todos = [{"id": "1234", "title": "Test Task #1", "done": False}]
+
+    assert list(oplog.replay_iter(todos)) == todos
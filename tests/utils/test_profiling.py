@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+
+from todoforge.utils import profiling
+from todoforge.utils.config import TodoConfig
+
+
+@pytest.fixture
+def profiler():
+    todo_config = TodoConfig()
+    profiler = profiling.start(cache_info=todo_config.cache_info)
+    yield profiler, todo_config
+    profiling.stop()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("0", None),
+        ("off", None),
+        ("1", "table"),
+        ("table", "table"),
+        ("JSON", "json"),
+    ],
+)
+def test_trace_format(value, expected):
+    assert profiling.trace_format(value) == expected
+
+
+def test_phases_are_disabled_by_default():
+    with profiling.phase("read json"):
+        profiling.count_read(10)
+
+    assert profiling._profiler is None
+
+
+def test_profiler_records_nested_phases_and_bytes(profiler, tmp_path):
+    profiler, todo_config = profiler
+    filepath = tmp_path / "work_todo.json"
+
+    with profiling.phase("save"):
+        todo_config.save(filepath, {"todos": []})
+    todo_config.clear_cache()
+    todo_config.get(filepath)
+    todo_config.get(filepath)
+
+    phases = {phase["phase"]: phase for phase in profiler.finish()}
+    size = filepath.stat().st_size
+    assert list(phases) == ["startup", "command", "save", "write json", "read json"]
+    assert phases["save"]["depth"] == 1
+    assert phases["write json"]["depth"] == 2
+    assert phases["save"]["bytes_written"] == size
+    assert phases["read json"]["bytes_read"] == size
+    assert phases["command"]["bytes_read"] == size
+    assert profiler.cache_stats()["cache_hits"] == 1
+    assert profiler.cache_stats()["cache_misses"] == 1
+
+
+def test_report_as_json_lines(profiler):
+    profiler, _ = profiler
+    with profiling.phase("render"):
+        pass
+    output = io.StringIO()
+
+    profiler.report("json", output)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line.get("phase") for line in lines] == [
+        "startup",
+        "command",
+        "render",
+        None,
+    ]
+    assert lines[-1]["summary"]["cache_hits"] == 0
+
+
+def test_report_as_table_to_trace_file(profiler, tmp_path, monkeypatch):
+    profiler, _ = profiler
+    trace_file = tmp_path / "trace.txt"
+    monkeypatch.setenv("TDF_TRACE_FILE", str(trace_file))
+
+    profiler.report("table")
+
+    lines = trace_file.read_text().splitlines()
+    assert lines[0].split() == ["phase", "calls", "wall", "ms", "cpu", "ms"] + [
+        "read",
+        "written",
+    ]
+    assert lines[1].startswith("startup")
+    assert lines[-1].startswith("total ")
+
+
+def test_cprofile_dump(tmp_path):
+    dump = profiling.start_cprofile(tmp_path)
+    sum(range(1000))
+
+    filepath = dump()
+
+    assert filepath.parent == tmp_path
+    assert filepath.suffix == ".prof"
+    assert filepath.stat().st_size > 0
@@ -0,0 +1,97 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import registry
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.config import todo_config
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"current_space": "work", "spaces": ["work"]}))
+    with patch("todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=config_path):
+        yield config_path
+    todo_config.invalidate(config_path)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = JsonBackend(tmp_path)
+    backend.save(
+        "work",
+        {
+            "todos": [
+                {"done": False, "id": "1234", "title": "Write report"},
+                {"done": True, "id": "2345", "title": "Buy milk"},
+            ]
+        },
+    )
+    return backend
+
+
+def test_record_change_applies_deltas(config_path, backend):
+    registry.record_document(backend, "work", backend.load("work"))
+
+    registry.record_change(backend, "work", todos=3, open_todos=1)
+
+    entry = registry.get_registry()["work"]
+    assert (entry["todos"], entry["open"]) == (5, 2)
+    assert entry["size"] == backend.space_size("work")
+    assert "modified" in entry
+    # The rest of the config is kept.
+    assert json.loads(config_path.read_text())["spaces"] == ["work"]
+
+
+def test_record_change_computes_a_missing_entry(config_path, backend):
+    registry.record_change(backend, "work", todos=1, open_todos=1)
+
+    entry = registry.get_registry()["work"]
+    assert (entry["todos"], entry["open"]) == (2, 1)
+
+
+def test_get_stats_only_loads_missing_spaces(config_path, backend):
+    registry.record_document(backend, "work", {"todos": []})
+    backend.save("home", {"todos": [{"done": False, "id": "1", "title": "Cook"}]})
+
+    with patch.object(backend, "load_many", wraps=backend.load_many) as load_many:
+        stats = registry.get_stats(backend, ["work", "home"])
+        registry.get_stats(backend, ["work", "home"])
+
+    load_many.assert_called_once_with(["home"])
+    assert stats["work"]["todos"] == 0
+    assert stats["home"]["todos"] == 1
+
+
+def test_rename_and_remove_space(config_path, backend):
+    registry.record_document(backend, "work", backend.load("work"))
+
+    registry.rename_space("work", "job")
+    assert list(registry.get_registry()) == ["job"]
+
+    registry.remove_space("job")
+    assert registry.get_registry() == {}
+
+
+def test_reindex_recomputes_counts_and_keeps_modified(config_path, backend):
+    registry.record_change(backend, "work")
+    modified = registry.get_registry()["work"]["modified"]
+    registry.record_change(backend, "work", todos=10, open_todos=10)
+
+    reindexed = registry.reindex(backend, ["work"])
+
+    assert reindexed == registry.get_registry()
+    assert (reindexed["work"]["todos"], reindexed["work"]["open"]) == (2, 1)
+    assert reindexed["work"]["modified"] == modified
+
+
+def test_registry_is_not_written_without_a_config(tmp_path, backend):
+    with patch(
+        "todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=tmp_path / "missing.json"
+    ):
+        registry.record_change(backend, "work", todos=1)
+
+        assert registry.get_registry() == {}
+    assert not (tmp_path / "missing.json").exists()
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils.search import SearchIndex, Term, parse_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path, "work")
+    index.build(
+        [
+            {"id": "aaaa", "title": "Write the quarterly report"},
+            {"id": "bbbb", "title": "Review report draft"},
+            {"id": "cccc", "title": "Fix the repo README"},
+            {"id": "dddd", "title": "Buy milk"},
+        ]
+    )
+    return index
+
+
+def ids(results):
+    return [todo["id"] for todo in results]
+
+
+def test_parse_query():
+    assert parse_query("Fix rep* ") == [Term("fix"), Term("rep", prefix=True)]
+    assert parse_query("README.md") == [Term("readme"), Term("md")]
+    assert parse_query("  ") == []
+
+
+def test_search_exact_prefix_and_multiple_terms(index):
+    assert ids(index.search(parse_query("report"))) == ["aaaa", "bbbb"]
+    assert ids(index.search(parse_query("rep"))) == []
+    assert ids(index.search(parse_query("rep*"))) == ["aaaa", "bbbb", "cccc"]
+    assert ids(index.search(parse_query("REPORT draft"))) == ["bbbb"]
+    assert ids(index.search(parse_query("milk report"))) == []
+    assert index.search(parse_query("milk")) == [{"id": "dddd", "title": "Buy milk"}]
+
+
+def test_changes_are_logged_and_searchable(index):
+    index.add([{"done": False, "id": "eeee", "title": "Report expenses"}])
+    index.update_title(["dddd"], "Buy oat milk")
+    index.remove(["aaaa"])
+
+    assert index.log.filepath.exists()
+    assert ids(index.search(parse_query("report"))) == ["bbbb", "eeee"]
+    assert index.search(parse_query("oat")) == [{"id": "dddd", "title": "Buy oat milk"}]
+
+
+def test_log_is_merged_into_the_segment_once_it_crosses_the_threshold(index):
+    with patch("todoforge.utils.search.MERGE_THRESHOLD", new=0):
+        index.add([{"done": False, "id": "eeee", "title": "Report expenses"}])
+        index.remove(["aaaa"])
+
+    assert not index.log.filepath.exists()
+    assert ids(index.search(parse_query("report"))) == ["bbbb", "eeee"]
+
+
+def test_changes_are_not_logged_without_a_segment(tmp_path):
+    index = SearchIndex(tmp_path, "work")
+
+    index.add([{"done": False, "id": "eeee", "title": "Report expenses"}])
+
+    assert not index.exists()
+    assert not index.log.filepath.exists()
+
+
+def test_is_fresh_checks_the_stamp_of_the_last_change(index, tmp_path):
+    # Without a stamp from the backend, the existing index is trusted.
+    assert index.is_fresh(None)
+    assert not index.is_fresh(1)
+    assert not SearchIndex(tmp_path, "home").is_fresh(None)
+
+    index.add([{"done": False, "id": "eeee", "title": "Report expenses"}], stamp=1)
+    assert index.is_fresh(1)
+    index.touch(2)
+    assert index.is_fresh(2)
+    assert not index.is_fresh(1)
+
+    index.remove(["eeee"], stamp=None)
+    assert not index.is_fresh(2)
+
+
+def test_rename_and_clear(index, tmp_path):
+    index.add([{"done": False, "id": "eeee", "title": "Report expenses"}])
+
+    index.rename("home")
+    renamed = SearchIndex(tmp_path, "home")
+    assert not index.exists()
+    assert ids(renamed.search(parse_query("report"))) == ["aaaa", "bbbb", "eeee"]
+
+    renamed.clear()
+    assert not renamed.exists()
+    assert not renamed.log.filepath.exists()
+    assert list(tmp_path.glob("*_search*")) == []
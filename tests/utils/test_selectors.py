@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import ids
+from todoforge.utils.ids import new_id
+from todoforge.utils.selectors import build_selector, parse_duration
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("45m", timedelta(minutes=45)),
+        ("12h", timedelta(hours=12)),
+        ("30d", timedelta(days=30)),
+        (" 2W ", timedelta(weeks=2)),
+    ],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+def test_parse_duration_with_invalid_value():
+    with pytest.raises(ValueError, match="Invalid duration '3 days'"):
+        parse_duration("3 days")
+
+
+def test_build_selector_with_invalid_regex():
+    with pytest.raises(ValueError, match="Invalid regex"):
+        build_selector(title_matches="(")
+
+
+def test_empty_selector_matches_everything():
+    selector = build_selector()
+
+    assert selector.is_empty()
+    assert selector.matches({"id": "1234", "title": "Task", "done": False})
+
+
+def test_selector_filters_are_combined():
+    now = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    selector = build_selector(all_done=True, title_matches="report", older_than="7d")
+
+    def todo(**fields):
+        return {
+            "id": "1234",
+            "title": "Weekly report",
+            "done": True,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            **fields,
+        }
+
+    assert selector.matches(todo(), now=now)
+    assert not selector.matches(todo(done=False), now=now)
+    assert not selector.matches(todo(title="Groceries"), now=now)
+    assert not selector.matches(todo(created_at="2024-01-30T00:00:00+00:00"), now=now)
+    assert not selector.matches(todo(created_at=None), now=now)
+
+
+def test_older_than_falls_back_to_the_id_timestamp():
+    now = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    selector = build_selector(older_than="7d")
+    created = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+    with patch.object(ids, "_last_timestamp", -1):
+        old_id = new_id(created)
+
+    assert selector.matches({"id": old_id, "title": "Task"}, now=now)
+    assert not selector.matches({"id": new_id(), "title": "Task"}, now=now)
+    assert not selector.matches({"id": "a" * 40, "title": "Task"}, now=now)
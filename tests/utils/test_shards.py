@@ -0,0 +1,189 @@
+import pytest
+
+from todoforge.utils import oplog, shards
+from todoforge.utils.shards import ShardedSpace
+
+
+def make_todos(count, start=0):
+    return [
+        {"done": i % 3 == 0, "id": f"{i:06d}", "title": f"Task {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def small_shards():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(shards, "SHARD_TODOS", 4)
+        mp.setattr(shards, "MAX_SHARD_TODOS", 8)
+        yield
+
+
+@pytest.fixture
+def space(tmp_path):
+    return ShardedSpace(tmp_path, "work")
+
+
+def fold(space, records):
+    space.fold(lambda: iter(records))
+
+
+def shard_names(space):
+    return sorted(path.name for path in space.root.glob("*.shard"))
+
+
+def test_write_splits_the_todos_into_shards_by_id(space):
+    todos = make_todos(10)
+    space.write({"todos": todos, "version": 1})
+
+    assert space.exists()
+    assert space.load() == {"todos": todos, "version": 1}
+    manifest = space.manifest()
+    assert manifest["meta"] == {"version": 1}
+    assert [shard["first"] for shard in manifest["shards"]] == ["", "000004", "000008"]
+    assert [shard["todos"] for shard in manifest["shards"]] == [4, 4, 2]
+    assert [shard["open"] for shard in manifest["shards"]] == [2, 3, 1]
+    assert len(shard_names(space)) == 3
+
+
+def test_write_refuses_todos_out_of_id_order(space):
+    sha1_ids = ["da39a3ee5e6b4b0d3255bfef95601890afd80709", "2fd4e1c6"]
+
+    with pytest.raises(ValueError, match="id order"):
+        space.write({"todos": [{"id": todo_id, "title": ""} for todo_id in sha1_ids]})
+
+    assert not space.exists()
+    assert shard_names(space) == []
+
+
+def test_empty_space_has_one_empty_shard(space):
+    space.write({"todos": []})
+
+    assert space.load() == {"todos": []}
+    assert [shard["todos"] for shard in space.manifest()["shards"]] == [0]
+
+
+def test_iter_todos_only_reads_shards_with_matching_todos(space):
+    todos = make_todos(8)
+    for todo in todos[:4]:
+        todo["done"] = True
+    space.write({"todos": todos})
+
+    read = []
+    real_read = space._read
+
+    def tracking_read(n):
+        read.append(n)
+        return real_read(n)
+
+    space._read = tracking_read
+
+    assert [todo["id"] for todo in space.iter_todos(done=False)] == [
+        "000004",
+        "000005",
+        "000007",
+    ]
+    assert read == [space.manifest()["shards"][1]["n"]]
+    assert [todo["id"] for todo in space.iter_todos()][:3] == [
+        "000004",
+        "000005",
+        "000007",
+    ]
+
+
+def test_fold_only_rewrites_the_shards_it_touches(space):
+    space.write({"todos": make_todos(12)})
+    before = space.manifest()["shards"]
+
+    fold(
+        space,
+        [
+            {"op": oplog.UPDATE, "ids": ["000010"], "fields": {"done": True}},
+            {"op": oplog.UPDATE, "ids": ["missing"], "fields": {"done": True}},
+        ],
+    )
+
+    after = space.manifest()["shards"]
+    assert after[:2] == before[:2]
+    assert after[2]["n"] != before[2]["n"]
+    assert after[2]["open"] == before[2]["open"] - 1
+    assert space.load()["todos"][10]["done"] is True
+
+
+def test_fold_splits_grown_shards_and_drops_empty_ones(space):
+    space.write({"todos": make_todos(8)})
+
+    fold(
+        space,
+        [
+            {"op": oplog.ADD, "todos": make_todos(10, start=8)},
+            {"op": oplog.REMOVE, "ids": [f"{i:06d}" for i in range(4)]},
+        ],
+    )
+
+    manifest = space.manifest()
+    assert [shard["todos"] for shard in manifest["shards"]] == [4, 4, 4, 2]
+    assert manifest["shards"][0]["first"] == ""
+    assert space.load()["todos"] == make_todos(14, start=4)
+
+
+def test_fold_writes_loaded_shards_out_early(space, monkeypatch):
+    monkeypatch.setattr(shards, "MAX_LOADED_TODOS", 6)
+    space.write({"todos": make_todos(8)})
+
+    fold(
+        space,
+        [
+            {"op": oplog.ADD, "todos": make_todos(20, start=8)},
+            {"op": oplog.UPDATE, "ids": ["000001"], "fields": {"title": "New"}},
+        ],
+    )
+
+    todos = make_todos(28)
+    todos[1]["title"] = "New"
+    assert space.load()["todos"] == todos
+    assert all(shard["todos"] <= 8 for shard in space.manifest()["shards"])
+
+
+def test_old_shards_are_kept_until_the_next_commit(space):
+    space.write({"todos": make_todos(4)})
+    first = shard_names(space)
+
+    fold(space, [{"op": oplog.REMOVE, "ids": ["000000"]}])
+    second = shard_names(space)
+    assert set(first) < set(second)
+
+    fold(space, [{"op": oplog.REMOVE, "ids": ["000001"]}])
+    assert first[0] not in shard_names(space)
+    assert len(shard_names(space)) == 2
+
+
+def test_fold_reads_the_log_once_per_group_of_shards(space, monkeypatch):
+    monkeypatch.setattr(shards, "MAX_LOADED_SHARDS", 2)
+    space.write({"todos": make_todos(20)})
+    records = [
+        {"op": oplog.UPDATE, "ids": [f"{i:06d}"], "fields": {"title": "New"}}
+        for i in (17, 1, 9, 5, 13, 2)
+    ]
+    calls = []
+
+    def read_log():
+        calls.append(1)
+        return iter(records)
+
+    space.fold(read_log)
+
+    # Once to find the touched shards, then once per group of two of them.
+    assert len(calls) == 4
+    assert len(shard_names(space)) == 10
+    assert [todo["title"] for todo in space.load()["todos"]].count("New") == 6
+
+
+def test_clear_removes_every_file(space):
+    space.write({"todos": make_todos(10)})
+    assert space.size() > 0
+
+    space.clear()
+
+    assert not space.exists()
+    assert list(space.root.iterdir()) == []
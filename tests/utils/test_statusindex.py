@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from todoforge.utils.statusindex import StatusIndex, entries_of
+
+
+@pytest.fixture
+def status_index(tmp_path):
+    index = StatusIndex(tmp_path / "work_todo.status")
+    index.build([("1234", False), ("1299", True), ("5678", False), ("abcdef", True)])
+    return index
+
+
+def test_select_walks_each_status_in_creation_order(status_index):
+    assert list(status_index.select("abcd")) == ["a", "c", "b", "d"]
+    assert list(status_index.select(range(4), done=False)) == [0, 2]
+    assert list(status_index.select(range(4), done=True)) == [1, 3]
+
+
+def test_set_done_flips_flags_in_place(status_index):
+    size = status_index.filepath.stat().st_size
+
+    status_index.set_done(["1234", "1299", "missing"], True)
+
+    assert list(status_index.select(range(4), done=False)) == [2]
+    assert status_index.counts(["1234", "5678", "missing"]) == (1, 1)
+    assert status_index.filepath.stat().st_size == size
+
+
+def test_add_appends_new_todos_and_updates_known_ones(status_index):
+    status_index.add([("b0", False), ("5678", True)])
+
+    assert status_index.entries() == [
+        ("1234", False),
+        ("1299", True),
+        ("5678", True),
+        ("abcdef", True),
+        ("b0", False),
+    ]
+    assert status_index.is_sorted()
+
+    status_index.add([("0000", False)])
+
+    assert status_index.entries()[-1] == ("0000", False)
+    assert not status_index.is_sorted()
+    assert status_index.counts(["0000", "1299"]) == (1, 1)
+
+
+def test_add_rebuilds_for_longer_ids(status_index):
+    status_index.add([("fffffffff", False)])
+
+    assert len(status_index) == 5
+    assert list(status_index.select(range(5), done=False)) == [0, 2, 4]
+
+
+def test_remove_keeps_the_order(status_index):
+    status_index.remove(["1234", "abcdef"])
+
+    assert status_index.entries() == [("1299", True), ("5678", False)]
+
+
+def test_empty_index(tmp_path):
+    index = StatusIndex(tmp_path / "empty_todo.status")
+    index.build(entries_of([]))
+
+    assert list(index.select([])) == []
+    assert index.counts(["1234"]) == (0, 0)
+
+    index.add(entries_of([{"id": "1234", "title": "one"}]))
+
+    assert index.entries() == [("1234", False)]
+
+
+def test_is_fresh_checks_the_stamp_of_the_sources(tmp_path):
+    source = tmp_path / "work_todo.log"
+    source.write_bytes(b"0")
+    index = StatusIndex(tmp_path / "work_todo.status", sources=[source])
+    assert not index.is_fresh()
+
+    index.build([("1234", False)])
+    assert index.is_fresh()
+
+    # A write within the same mtime tick still changes the stamp.
+    mtime_ns = source.stat().st_mtime_ns
+    source.write_bytes(b"01")
+    os.utime(source, ns=(mtime_ns, mtime_ns))
+    assert not index.is_fresh()
+    with pytest.raises(ValueError):
+        index.select(["todo"])
+
+    index.touch()
+    assert index.is_fresh()
+    assert list(index.select(["todo"])) == ["todo"]
+
+
+def test_select_checks_the_todos_were_read_with_the_index_stamp(status_index):
+    with pytest.raises(ValueError):
+        status_index.select(range(4), stamp=status_index.stamp() + 1)
+    with pytest.raises(ValueError):
+        status_index.select(range(3))
+
+
+def test_other_files_are_not_read_as_an_index(tmp_path):
+    index = StatusIndex(tmp_path / "work_todo.status")
+    index.filepath.write_bytes(b"TDFS" + bytes(64))
+
+    assert not index.is_fresh()
+    with pytest.raises(ValueError):
+        index.entries()
@@ -0,0 +1,120 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from todoforge.utils import toggles
+from todoforge.utils.backends import JsonBackend
+from todoforge.utils.toggles import ToggleJournal
+
+
+@pytest.fixture
+def backend(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"current_space": "work", "spaces": ["work"]}))
+    backend = JsonBackend(tmp_path)
+    backend.save(
+        "work",
+        {
+            "todos": [
+                {"done": False, "id": f"{i:04d}", "title": f"Task #{i}"}
+                for i in range(4)
+            ],
+            "version": 1,
+        },
+    )
+    with patch("todoforge.utils.toggles.get_backend", return_value=backend), patch(
+        "todoforge.utils.db.get_backend", return_value=backend
+    ), patch("todoforge.utils.config.DEFAULT_TODO_CONFIG", new=config_path), patch(
+        "todoforge.utils.registry.DEFAULT_TODO_CONFIG", new=config_path
+    ):
+        yield backend
+
+
+def statuses(backend):
+    return [todo["done"] for todo in backend.load("work")["todos"]]
+
+
+def test_toggles_are_applied_in_the_background(backend, tmp_path):
+    with ToggleJournal("work", root=tmp_path, interval=0.01) as journal:
+        journal.append("0001", True)
+        journal.append("0002", True)
+        journal.append("0002", False)
+
+        deadline = time.monotonic() + 5
+        while statuses(backend) != [False, True, False, False]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        journal.append("0003", True)
+
+    assert statuses(backend) == [False, True, False, True]
+    assert backend.load("work")["version"] == 1
+    assert list((tmp_path / "toggles").iterdir()) == []
+
+
+def test_flush_leaves_a_partial_line_for_later(backend, tmp_path):
+    journal = ToggleJournal("work", root=tmp_path, interval=60)
+    journal.open()
+    try:
+        journal.append("0000", True)
+        with open(journal.filepath, "a") as f:
+            f.write('{"space": "work", "id": "0001"')
+
+        assert journal.flush() == 1
+        with open(journal.filepath, "a") as f:
+            f.write(', "done": true}\n')
+        assert journal.flush() == 1
+        assert journal.flush() == 0
+    finally:
+        journal.close()
+
+    assert statuses(backend) == [True, True, False, False]
+
+
+def test_recover_applies_the_journals_of_ended_sessions(backend, tmp_path):
+    (tmp_path / "toggles").mkdir()
+    (tmp_path / "toggles" / "ended.journal").write_text(
+        '{"space": "work", "id": "0000", "done": true}\n'
+        '{"space": "gone", "id": "0000", "done": true}\n'
+        '{"space": "work", "id": "0001", "done": true}\n'
+        '{"space": "work", "id": "0002", "do'
+    )
+
+    with ToggleJournal("work", root=tmp_path, interval=60) as journal:
+        journal.append("0003", True)
+
+        assert toggles.recover(tmp_path) == 1
+        assert statuses(backend) == [True, True, False, False]
+        # The journal of the running session is left to it.
+        assert list((tmp_path / "toggles").iterdir()) == [journal.filepath]
+
+    assert statuses(backend) == [True, True, False, True]
+    assert toggles.recover(tmp_path) == 0
+    assert not backend.has_space("gone")
+
+
+def test_recover_without_journals(tmp_path):
+    assert toggles.recover(tmp_path) == 0
+
+
+def test_recover_leaves_journals_that_are_not_named_yet(backend, tmp_path):
+    (tmp_path / "toggles").mkdir()
+    unnamed = tmp_path / "toggles" / ".session.tmp"
+    unnamed.write_text('{"space": "work", "id": "0000", "done": true}\n')
+
+    assert toggles.recover(tmp_path) == 0
+    assert unnamed.exists()
+    assert statuses(backend) == [False, False, False, False]
+
+
+def test_flush_locks_the_space_and_close_copes_with_a_gone_journal(backend, tmp_path):
+    with patch.object(backend, "lock", wraps=backend.lock) as mock_lock:
+        with ToggleJournal("work", root=tmp_path, interval=60) as journal:
+            journal.append("0002", True)
+            journal.flush()
+            journal.filepath.unlink()
+
+    assert statuses(backend) == [False, False, True, False]
+    mock_lock.assert_called_with("work")
@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+from todoforge.utils.transfer import TransferFormat, read_records, write_records
+
+TODOS = [
+    {"done": False, "id": "1234", "title": "Test Task #1"},
+    {
+        "created_at": "2026-10-18T09:12:44Z",
+        "done": True,
+        "id": "2345",
+        "title": 'Say "hi", then\nleave',
+    },
+]
+
+
+def test_ndjson_round_trip():
+    file = io.StringIO()
+
+    assert write_records(iter(TODOS), TransferFormat.ndjson, file) == 2
+
+    assert len(file.getvalue().splitlines()) == 2
+    file.seek(0)
+    assert list(read_records(file, TransferFormat.ndjson)) == TODOS
+
+
+def test_csv_round_trip_drops_empty_cells():
+    file = io.StringIO()
+
+    assert write_records(iter(TODOS), TransferFormat.csv, file) == 2
+
+    assert file.getvalue().startswith(
+        "id,title,done,created_at\n1234,Test Task #1,false,\n"
+    )
+    file.seek(0)
+    assert list(read_records(file, TransferFormat.csv)) == [
+        {"done": "false", "id": "1234", "title": "Test Task #1"},
+        {**TODOS[1], "done": "true"},
+    ]
+
+
+def test_read_ndjson_skips_blank_lines_and_rejects_other_values():
+    file = io.StringIO('{"title": "Test Task #1"}\n\n[1, 2]\n')
+    records = read_records(file, TransferFormat.ndjson)
+
+    assert next(records) == {"title": "Test Task #1"}
+    with pytest.raises(ValueError, match="Line 3 is not a JSON object"):
+        next(records)
+
+    with pytest.raises(ValueError, match="Line 1 is not valid JSON"):
+        list(read_records(io.StringIO("{oops\n"), TransferFormat.ndjson))
@@ -0,0 +1,63 @@
+from todoforge.utils.helper import handle_toggle_space_key
+from todoforge.utils.ui.menu import MenuState
+
+
+def make_items(count):
+    return [
+        {"id": str(i), "title": f"Task #{i}", "done": i % 3 == 0} for i in range(count)
+    ]
+
+
+def shown(state):
+    return [state.items[state.item_index(pos)]["id"] for pos in range(len(state))]
+
+
+def test_menu_state_shows_open_items_first():
+    state = MenuState(make_items(7))
+
+    assert shown(state) == ["1", "2", "4", "5", "0", "3", "6"]
+
+
+def test_menu_state_toggle_keeps_sort_order():
+    items = make_items(7)
+    state = MenuState(items)
+
+    item_index = state.item_index(1)
+    state.toggled(item_index, handle_toggle_space_key(items, item_index))
+    assert shown(state) == ["1", "4", "5", "0", "2", "3", "6"]
+
+    item_index = state.item_index(4)
+    state.toggled(item_index, handle_toggle_space_key(items, item_index))
+    assert shown(state) == ["1", "2", "4", "5", "0", "3", "6"]
+    assert shown(state) == shown(MenuState(items))
+
+
+def test_menu_state_scrolls_viewport_with_cursor():
+    state = MenuState(make_items(1000), height=10)
+
+    assert state.visible() == range(0, 10)
+
+    for _ in range(12):
+        state.move(1)
+    assert state.current_pos == 12
+    assert state.visible() == range(3, 13)
+
+    state.move(state.height, wrap=False)
+    assert state.visible() == range(13, 23)
+
+    state.move_to(999)
+    assert state.visible() == range(990, 1000)
+
+    state.move(1)
+    assert state.current_pos == 0
+    assert state.visible() == range(0, 10)
+
+
+def test_menu_state_resize_keeps_cursor_visible():
+    state = MenuState(make_items(100), height=20)
+    state.move_to(15)
+
+    state.resize(5)
+
+    assert state.current_pos in state.visible()
+    assert len(state.visible()) == 5
@@ -1 +1,7 @@
+import time
+
 __app_name__ = "todoforge"
+
+# When the first todoforge module was imported, the start of `tdf --profile`'s
+# startup phase.
+STARTED_AT = (time.perf_counter(), time.process_time())
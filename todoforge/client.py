@@ -0,0 +1,126 @@
+"""
+Thin ``tdf`` client for the todoforge daemon.
+
+``tdf`` starts here. When ``tdf daemon`` is listening on its Unix socket,
+commands that never prompt or read stdin are sent to it and its output is
+replayed, so this process never imports typer, rich or pydantic. Otherwise the
+command runs directly through ``todoforge.main``, which first asks a running
+daemon to write out and drop what it holds in memory.
+
+Only the standard library is imported here, and ``socket`` only when a daemon
+socket exists, to keep the forwarding path short.
+"""
+
+import json
+import os
+import sys
+
+# Same as DEFAULT_DAEMON_SOCKET in todoforge.utils.constants, spelled out with
+# os.path so the client does not pay for importing pathlib.
+SOCKET_PATH = os.path.join(
+    os.path.expanduser("~"), ".config", "todoforge", "daemon.sock"
+)
+TIMEOUT = 30.0
+
+FORWARDED_COMMANDS = {"add", "done", "ls", "remove", "search", "summary", "undo"}
+FORWARDED_SPACES_COMMANDS = {"ls", "switch"}
+# Same as TRACE_ENV and DISABLED_VALUES in todoforge.utils.profiling.
+DISABLED_TRACE = ("", "0", "false", "no", "off")
+FORWARDED_ENV = ("COLORTERM", "COLUMNS", "FORCE_COLOR", "LINES", "NO_COLOR", "TERM")
+
+
+class DaemonError(Exception):
+    pass
+
+
+def is_forwardable(argv: list[str]) -> bool:
+    """Checks that the daemon can run `argv` without a terminal or stdin."""
+    if not argv:
+        return False
+    command, *args = argv
+    if command == "spaces":
+        return bool(args) and args[0] in FORWARDED_SPACES_COMMANDS
+    if command == "add" and (
+        "-" in args or any(a.startswith("--from-file") for a in args)
+    ):
+        return False
+    return command in FORWARDED_COMMANDS
+
+
+def request(message: dict, socket_path: str = SOCKET_PATH) -> dict | None:
+    """
+    Sends one request to the daemon and returns its reply.
+
+    Returns None when no daemon is listening on `socket_path`.
+
+    Raises:
+        DaemonError: If the daemon took the request but did not answer it.
+    """
+    if not os.path.exists(socket_path):
+        return None
+
+    import socket
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(TIMEOUT)
+        try:
+            conn.connect(socket_path)
+        except OSError:
+            # A socket file left behind by a daemon that is gone.
+            return None
+
+        try:
+            conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            chunks = []
+            while chunk := conn.recv(65536):
+                chunks.append(chunk)
+            return json.loads(b"".join(chunks))
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"The todoforge daemon did not answer: {e}") from e
+    finally:
+        conn.close()
+
+
+def run_command(argv: list[str], socket_path: str = SOCKET_PATH) -> dict | None:
+    """Runs `argv` on the daemon, returning its exit code and output, or None without a daemon."""
+    env = {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ}
+    if sys.stdout.isatty():
+        env.setdefault(
+            "COLUMNS", str(os.get_terminal_size(sys.stdout.fileno()).columns)
+        )
+        env.setdefault("FORCE_COLOR", "1")
+    return request({"op": "run", "argv": argv, "env": env}, socket_path)
+
+
+def release(socket_path: str = SOCKET_PATH) -> None:
+    """Makes a running daemon write out and drop the spaces it holds in memory."""
+    try:
+        request({"op": "release"}, socket_path)
+    except DaemonError:
+        pass
+
+
+def run() -> None:
+    argv = sys.argv[1:]
+    # Traces time this process, so traced commands always run directly.
+    traced = os.environ.get("TDF_TRACE", "").strip().lower() not in DISABLED_TRACE
+    if is_forwardable(argv) and not traced:
+        try:
+            reply = run_command(argv)
+        except DaemonError as e:
+            sys.stderr.write(f"{e}\n")
+            sys.exit(1)
+        if reply is not None:
+            sys.stdout.write(reply["stdout"])
+            sys.stderr.write(reply["stderr"])
+            sys.stdout.flush()
+            sys.exit(reply["code"])
+
+    from todoforge.main import run as run_directly
+
+    run_directly()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,12 +1,14 @@
+from typing import Annotated
+
 import typer
 from rich import print
 
+from todoforge.utils import journal, registry
+from todoforge.utils.backends import get_backend
 from todoforge.utils.config import todo_config
 from todoforge.utils.constants import (
     DEFAULT_TODO_CONFIG,
-    DEFAULT_TODO_FOLDER,
 )
-from todoforge.utils.models import SpaceModel
 
 app = typer.Typer()
 
@@ -28,28 +30,24 @@ def add(space_name: str):
     Example:
         $ todoforge spaces add personal
     """
+    from todoforge.utils.models import SpaceModel
+
     try:
         space_name = SpaceModel(name=space_name).name
 
-        space_todo_filename = f"{space_name}_todo.json"
-        todo_content: dict = {
-            "todos": [],
-        }
+        backend = get_backend()
+        backend.create_space(space_name)
 
-        todo_config.save(
-            filepath=DEFAULT_TODO_FOLDER / space_todo_filename, content=todo_content
-        )
+        def add_space(config: dict) -> dict:
+            spaces = config.get("spaces", [])
+            return {
+                **config,
+                "current_space": config.get("current_space") or space_name,
+                "spaces": spaces if space_name in spaces else [*spaces, space_name],
+            }
 
-        total_spaces = [
-            str(ts.stem).split("_")[0] for ts in DEFAULT_TODO_FOLDER.glob("*_todo.json")
-        ]
-        spaces_dict = {
-            "current_space": (
-                todo_config.get_current_space() if len(total_spaces) > 1 else space_name
-            ),
-            "spaces": total_spaces,
-        }
-        todo_config.save(filepath=DEFAULT_TODO_CONFIG, content=spaces_dict)
+        todo_config.update(DEFAULT_TODO_CONFIG, add_space)
+        registry.record_document(backend, space_name, {"todos": []})
 
     except (ValueError, OSError) as e:
         print(f"[red]{e}[/red]")
@@ -63,21 +61,32 @@ def ls():
     """
     Lists all available spaces.
 
-    This command displays the names of all the spaces created by the user.
+    This command displays the names of all the spaces created by the user, with
+    their open and total todo counts read from the spaces registry.
 
     Returns:
         None: Confirms the list of available spaces with asterisk (*) that let's the user know about the current working space.
 
     Example:
         $ todoforge ls
-            * personal
-              work
+            * personal   3 open / 10 todos
+              work       0 open /  4 todos
     """
     spaces = todo_config.get_spaces_list()
     current_space = todo_config.get_current_space()
+    stats = registry.get_stats(get_backend(), spaces)
+    name_width = max((len(s) for s in spaces), default=0)
+    count_width = len(str(max((e["todos"] for e in stats.values()), default=0)))
     for s in spaces:
         prefix = "[green]*[/green]" if s == current_space else " "
-        print(f"{prefix} {s}")
+        entry = stats.get(s)
+        if entry is None:
+            print(f"{prefix} {s}")
+            continue
+        print(
+            f"{prefix} {s:<{name_width}}  [grey50]{entry['open']:>{count_width}} open /"
+            f" {entry['todos']:>{count_width}} todos[/grey50]"
+        )
 
 
 @app.command()
@@ -105,12 +114,8 @@ def switch(space_name: str):
         )
         raise typer.Exit(code=1)
 
-    todo_config.save(
-        filepath=DEFAULT_TODO_CONFIG,
-        content={
-            "current_space": space_name,
-            "spaces": spaces,
-        },
+    todo_config.update(
+        DEFAULT_TODO_CONFIG, lambda config: {**config, "current_space": space_name}
     )
     print(f"Switched to '[green]{space_name}[/green]' space")
 
@@ -133,20 +138,27 @@ def rename(old_name: str, new_name: str):
         $ todoforge rename personal home
             Space 'personal' has been renamed to 'home'
     """
-    spaces = todo_config.get_spaces_list()
-    current_space = todo_config.get_current_space()
-
-    current_space = new_name if old_name == current_space else current_space
-    idx = spaces.index(old_name)
-    spaces[idx] = new_name
+    from todoforge.utils.models import SpaceModel
 
-    todo_config.save(
-        filepath=DEFAULT_TODO_CONFIG,
-        content={"current_space": current_space, "spaces": spaces},
-    )
+    spaces = todo_config.get_spaces_list()
+    if old_name not in spaces:
+        print(f"Space '[green]{old_name}[/green]' does not exist.")
+        raise typer.Exit(code=1)
+    if new_name in spaces:
+        print(f"Space '[green]{new_name}[/green]' already exists.")
+        raise typer.Exit(code=1)
 
-    old_todo_filename = DEFAULT_TODO_FOLDER / f"{old_name}_todo.json"
-    old_todo_filename.rename(DEFAULT_TODO_FOLDER / f"{new_name}_todo.json")
+    try:
+        new_name = SpaceModel(name=new_name).name
+        # The config, the space files, its search index and the registry all
+        # change, so the rename is journaled and finished after a crash.
+        journal.run(
+            get_backend(),
+            {"op": journal.RENAME, "old_name": old_name, "new_name": new_name},
+        )
+    except (ValueError, OSError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
 
     print(
         f"Space [green]{old_name}[/green] has been renamed to [green]{new_name}[/green]"
@@ -178,22 +190,107 @@ def remove(space_name: str):
         abort=True,
     )
 
-    todo_filename = DEFAULT_TODO_FOLDER / f"{space_name}_todo.json"
-    if not todo_filename.exists():
-        print(f"Space '[green]{space_name}_todo.json[/green]' does not exist.")
+    backend = get_backend()
+    if not backend.has_space(space_name):
+        print(f"Space '[green]{space_name}[/green]' does not exist.")
         raise typer.Exit(code=1)
 
-    todo_filename.unlink()
+    journal.run(backend, {"op": journal.REMOVE, "space": space_name})
     print(f"Space '[green]{space_name}[/green]' has been removed.")
-    spaces = todo_config.get_spaces_list()
-    spaces.remove(space_name)
-
-    if space_name == current_space:
-        current_space = spaces[0] if len(spaces) > 0 else ""
-    todo_config.save(
-        filepath=DEFAULT_TODO_CONFIG,
-        content={
-            "current_space": current_space,
-            "spaces": spaces,
-        },
-    )
+
+
+@app.command()
+def convert(
+    space_name: str,
+    to: Annotated[
+        str,
+        typer.Option(
+            "--to", help="Format to store the space in: json, compact or sharded"
+        ),
+    ],
+):
+    """
+    Converts a space to another on-disk format.
+
+    The compact format is a binary file read in place, which keeps large spaces
+    small on disk and lets `tdf ls --limit` read only the todos it shows.
+
+    The sharded format splits a space into files of about a thousand todos, so
+    marking a recent todo done or editing it only ever rewrites its own shard.
+
+    Args:
+        space_name (str): The name of the space to convert, or "." for the current space.
+        to (str): The format to store the space in.
+
+    Returns:
+        None: Confirms the new format of the specified space.
+
+    Example:
+        $ todoforge spaces convert work --to compact
+            Space 'work' is now stored as compact.
+    """
+    space_name = todo_config.get_current_space() if space_name == "." else space_name
+
+    backend = get_backend()
+    if not backend.has_space(space_name):
+        print(f"Space '[green]{space_name}[/green]' does not exist.")
+        raise typer.Exit(code=1)
+
+    if backend.space_format(space_name) == to:
+        print(f"Space '[green]{space_name}[/green]' is already stored as {to}.")
+        return
+
+    try:
+        backend.convert_space(space_name, to)
+    except (ValueError, OSError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+    registry.refresh_size(backend, space_name)
+
+    print(f"Space '[green]{space_name}[/green]' is now stored as {to}.")
+
+
+@app.command()
+def reindex():
+    """
+    Rebuilds the spaces list and the spaces registry from storage.
+
+    Every space found in the storage backend is listed again, its todo
+    counts and size are recomputed and its search index is dropped, to be
+    rebuilt by the next search. Use it after changing space files by hand
+    or if `tdf spaces ls` shows counts that look wrong.
+
+    Returns:
+        None: Confirms how many spaces were reindexed.
+
+    Example:
+        $ todoforge spaces reindex
+            Reindexed 3 spaces.
+    """
+    from todoforge.utils.search import SearchIndex
+
+    backend = get_backend()
+    found = backend.list_spaces()
+    spaces: list[str] = []
+
+    def relist(config: dict) -> dict:
+        # Keep the order spaces were created in, then add the ones not listed.
+        spaces.extend(s for s in config.get("spaces", []) if s in found)
+        spaces.extend(s for s in found if s not in spaces)
+
+        current_space = config.get("current_space", "")
+        if current_space not in spaces:
+            current_space = spaces[0] if spaces else ""
+        return {**config, "current_space": current_space, "spaces": spaces}
+
+    todo_config.update(DEFAULT_TODO_CONFIG, relist)
+
+    try:
+        registry.reindex(backend, spaces)
+        for space in spaces:
+            SearchIndex(backend.root, space).clear()
+    except (ValueError, OSError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    print(f"Reindexed {len(spaces)} spaces.")
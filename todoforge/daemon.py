@@ -0,0 +1,147 @@
+"""
+Resident todoforge daemon.
+
+``tdf daemon`` listens on a Unix socket and keeps every space it has used in
+memory. Requests from ``todoforge.client`` are newline-terminated JSON and are
+served one at a time on an asyncio loop, so mutations are serialized. Commands
+run through the regular Typer app in-process, with their output captured,
+against a ``BufferedBackend``: the reply goes out as soon as memory has
+changed, and a background task writes dirty spaces to disk a moment later.
+Everything is written out on ``release`` requests, on ``stop`` and on exit.
+"""
+
+import asyncio
+import io
+import json
+import os
+import signal
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Callable, Iterator
+
+from todoforge.utils.backends import (
+    BufferedBackend,
+    StorageBackend,
+    get_backend,
+    use_backend,
+)
+from todoforge.utils.constants import DEFAULT_DAEMON_SOCKET
+
+FLUSH_INTERVAL = 0.2
+
+
+class Daemon:
+    def __init__(
+        self,
+        socket_path: Path = DEFAULT_DAEMON_SOCKET,
+        flush_interval: float = FLUSH_INTERVAL,
+        backend: StorageBackend | None = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self.flush_interval = flush_interval
+        self.backend = BufferedBackend(backend or get_backend())
+        self._stopped: asyncio.Event | None = None
+
+    async def serve(self, ready: Callable[[], None] | None = None) -> None:
+        """Serves requests until a ``stop`` request or SIGINT/SIGTERM."""
+        self._stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._stopped.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Not on the main thread, or not supported by the platform.
+                pass
+
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        flusher = asyncio.create_task(self._flush_periodically())
+        use_backend(self.backend)
+        try:
+            if ready is not None:
+                ready()
+            async with server:
+                await self._stopped.wait()
+        finally:
+            flusher.cancel()
+            use_backend(None)
+            self.backend.flush()
+            Path(self.socket_path).unlink(missing_ok=True)
+
+    def dispatch(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "run":
+            return self.run_command(message["argv"], message.get("env", {}))
+        if op == "release":
+            self.backend.release()
+            return {"ok": True}
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "stop":
+            if self._stopped is not None:
+                self._stopped.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown request '{op}'"}
+
+    def run_command(self, argv: list[str], env: dict[str, str]) -> dict:
+        """Runs ``tdf <argv>`` in this process and returns its exit code and output."""
+        import rich
+
+        from todoforge.main import app
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = 0
+        with _environ(env), redirect_stdout(stdout), redirect_stderr(stderr):
+            # rich.print keeps a global console whose colors and width are
+            # fixed when it is created, so give every request a fresh one.
+            rich._console = None
+            try:
+                app(args=argv, prog_name="tdf")
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                rich._console = None
+        return {"code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            message = json.loads(await reader.readline())
+            reply = self.dispatch(message)
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _flush_periodically(self) -> None:
+        # Flushing runs on the loop, between requests, so a write never races
+        # a mutation and spaces always reach the disk in order.
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.backend.dirty:
+                try:
+                    self.backend.flush()
+                except OSError:
+                    # Spaces stay dirty and are written again next time.
+                    traceback.print_exc()
+
+
+@contextmanager
+def _environ(env: dict[str, str]) -> Iterator[None]:
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
@@ -1,39 +1,175 @@
 # type: ignore
-from textwrap import shorten
+# Heavy imports (rich tables and prompts, pydantic models, curses) are done inside
+# the commands that need them, so short commands like `tdf done` start fast.
+import os
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Optional
 
 import typer
-from rich import box, print
-from rich.console import Console
-from rich.prompt import Prompt
-from rich.table import Table
+from rich import print
 from typing_extensions import Annotated
 
 from todoforge.commands import spaces
+from todoforge.utils import profiling
+from todoforge.utils.backends.base import iter_by_status
 from todoforge.utils.config import todo_config
 from todoforge.utils.db import (
+    add_todos,
     get_todos,
-    save_todos,
+    id_prefix_lengths,
+    iter_archived_todos,
+    iter_todos,
+    load_spaces,
+    search_todos,
+    short_todo_id,
+    stream_todos,
 )
 from todoforge.utils.helper import (
+    add_todos_from_lines,
+    archive_todos,
     edit_task_title_from_todo,
     handle_toggle_space_key,
+    import_todos,
     init_folders,
-    remove_task_from_todo,
-    update_todo_status,
+    migrate_spaces,
+    remove_tasks_from_todo,
+    update_todos_status,
 )
-from todoforge.utils.models import TodoModel
-from todoforge.utils.ui.menu import show_options
+from todoforge.utils.idindex import unique_prefix_lengths
+from todoforge.utils.output import OutputFormat, TodoStatus, write_todos
+from todoforge.utils.selectors import TodoSelector, build_selector
+from todoforge.utils.transfer import TransferFormat, read_records, write_records
+
+TodoIdsArgument = Annotated[
+    Optional[list[str]],
+    typer.Argument(
+        metavar="todo-id...",
+        show_default=False,
+        help="Todo ids. Supports both partial and full ids",
+    ),
+]
+AllDoneOption = Annotated[
+    bool, typer.Option("--all-done", help="Select every completed todo")
+]
+TitleMatchesOption = Annotated[
+    Optional[str],
+    typer.Option(
+        "--title-matches",
+        metavar="REGEX",
+        show_default=False,
+        help="Select todos whose title matches REGEX",
+    ),
+]
+OlderThanOption = Annotated[
+    Optional[str],
+    typer.Option(
+        "--older-than",
+        metavar="DURATION",
+        show_default=False,
+        help="Select todos created more than DURATION ago, e.g. 12h, 30d or 2w",
+    ),
+]
+
+DEFAULT_PAGE_SIZE = 50
 
 app = typer.Typer(no_args_is_help=True)
 app.add_typer(spaces.app, name="spaces", help="Manage spaces", add_help_option=True)
 
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            "--profile",
+            help=f"Print per-phase timings to stderr when the command ends. Set {profiling.TRACE_ENV}=json for JSON lines",
+        ),
+    ] = False,
+    cprofile: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--cprofile",
+            envvar=profiling.CPROFILE_ENV,
+            metavar="PATH",
+            show_default=False,
+            help="Write cProfile stats of the command to PATH, or to a new file in the PATH folder",
+        ),
+    ] = None,
+):
+    output_format = profiling.trace_format(os.environ.get(profiling.TRACE_ENV))
+    if profile and output_format is None:
+        output_format = profiling.TABLE_FORMAT
+    if output_format is not None:
+        profiler = profiling.start(cache_info=todo_config.cache_info)
+
+        def report() -> None:
+            profiling.stop()
+            profiler.report(output_format)
+
+        ctx.call_on_close(report)
+
+    if cprofile is not None:
+        dump = profiling.start_cprofile(cprofile)
+        ctx.call_on_close(
+            lambda: print(f"cProfile stats written to {dump()}", file=sys.stderr)
+        )
+
+
 @app.command()
 def ls(
     full_id: Annotated[
         bool,
         typer.Option("--full-id/--not-full-id", "-f", help="Show full id for the todo"),
-    ] = False
+    ] = False,
+    limit: Annotated[
+        Optional[int],
+        typer.Option(
+            "--limit", "-n", min=1, show_default=False, help="Show at most N todos"
+        ),
+    ] = None,
+    offset: Annotated[
+        int, typer.Option("--offset", min=0, help="Skip the first N todos")
+    ] = 0,
+    page: Annotated[
+        Optional[int],
+        typer.Option(
+            "--page",
+            min=1,
+            show_default=False,
+            help=f"Show page N, --limit todos per page (default {DEFAULT_PAGE_SIZE})",
+        ),
+    ] = None,
+    status: Annotated[
+        Optional[TodoStatus],
+        typer.Option(
+            "--status", show_default=False, help="Only show open or done todos"
+        ),
+    ] = None,
+    output_format: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--format",
+            help="Output format. plain, ndjson and tsv stream rows as they are read",
+        ),
+    ] = OutputFormat.table,
+    all_spaces: Annotated[
+        bool,
+        typer.Option(
+            "--all-spaces", help="Show the todos of every space, grouped by space"
+        ),
+    ] = False,
+    archived: Annotated[
+        bool,
+        typer.Option(
+            "--archived", help="Show archived todos, read from the archive on demand"
+        ),
+    ] = False,
 ):
     """Show todos in current space."""
 
@@ -43,30 +179,226 @@ def ls(
             "Oops... Looks like there is no space available. Please create a new space using [italic][green]tdf spaces add <name>[/green][/italic] and then try again."
         )
         raise typer.Exit(code=1)
-    todos = get_todos()
-    if len(todos["todos"]) == 0:
+
+    if page is not None:
+        limit = limit or DEFAULT_PAGE_SIZE
+        offset += (page - 1) * limit
+    done = None if status is None else status is TodoStatus.done
+    if archived:
+        todos = (
+            {**todo, "space": space} if all_spaces else todo
+            for space in (
+                todo_config.get_spaces_list() if all_spaces else [current_space]
+            )
+            for todo in iter_archived_todos(space)
+            if done is None or bool(todo.get("done")) == done
+        )
+    elif all_spaces:
+        documents = load_spaces()
+        todos = (
+            {**todo, "space": space}
+            for space, document in documents.items()
+            for todo in iter_by_status(document["todos"], done)
+        )
+    else:
+        todos = iter_todos(done=done)
+    todos = islice(todos, offset, None if limit is None else offset + limit)
+
+    if output_format is not OutputFormat.table:
+        try:
+            with profiling.phase("write output"):
+                count = write_todos(todos, output_format, sys.stdout, all_spaces)
+                sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away early, e.g. `tdf ls --format ndjson | head`.
+            # Point stdout at devnull so the interpreter's final flush stays quiet.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            raise typer.Exit(code=0)
+        if count == 0 and output_format is OutputFormat.plain:
+            raise typer.Exit(code=1)
+        return
+
+    with profiling.phase("query"):
+        rows = list(todos)
+    if len(rows) == 0:
+        if archived:
+            print(
+                "No archived todos yet. Move completed ones there using [italic][green]tdf archive[/green][/italic]"
+            )
+            raise typer.Exit(code=1)
         print(
             "mmm... looks like you have no tasks at the moment. Create some new ones using [italic][green]tdf add <task>[/green][/italic]"
         )
         raise typer.Exit(code=1)
 
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
     console = Console()
-    table = Table(title=f"{current_space.capitalize()}'s Todo List", box=box.MARKDOWN)
+    title = (
+        "Todo List of All Spaces"
+        if all_spaces
+        else f"{current_space.capitalize()}'s Todo List"
+    )
+    if archived:
+        title = title.replace("Todo List", "Archived Todos")
+    table = Table(title=title, box=box.MARKDOWN)
 
+    if all_spaces:
+        table.add_column("Space", justify="left", style="cyan", no_wrap=True)
     table.add_column("Id", justify="left", style="grey50", no_wrap=True)
     table.add_column("Title", justify="left", style="light_sea_green")
     table.add_column("Done", justify="center", style="red")
 
-    sorted_todos = sorted(todos["todos"], key=lambda todo: todo["done"])
-    for todo in sorted_todos:
-        id_ = (
-            todo["id"] if full_id else shorten(text=todo["id"], width=7, placeholder="")
+    if full_id:
+        id_widths = {}
+    elif archived:
+        id_widths = {
+            space: unique_prefix_lengths(
+                todo["id"] for todo in rows if todo.get("space", current_space) == space
+            )
+            for space in {todo.get("space", current_space) for todo in rows}
+        }
+    elif all_spaces:
+        id_widths = {
+            space: unique_prefix_lengths(todo["id"] for todo in document["todos"])
+            for space, document in documents.items()
+        }
+    else:
+        id_widths = {current_space: id_prefix_lengths()}
+
+    for i, todo in enumerate(rows):
+        space = todo.get("space", current_space)
+        id_ = todo["id"][: id_widths.get(space, {}).get(todo["id"])]
+        row = (id_, todo["title"].strip(), "[green]✔[/green]" if todo["done"] else "✘")
+        is_last_of_space = i + 1 < len(rows) and rows[i + 1].get("space") != space
+
+        table.add_row(
+            *((space, *row) if all_spaces else row),
+            end_section=all_spaces and is_last_of_space,
         )
 
+    with profiling.phase("render"):
+        console.print(table)
+
+
+@app.command()
+def search(
+    query: Annotated[
+        list[str],
+        typer.Argument(
+            metavar="QUERY...",
+            show_default=False,
+            help="Words every title must contain. End a word with * to match prefixes, e.g. rep*",
+        ),
+    ],
+    all_spaces: Annotated[
+        bool,
+        typer.Option(
+            "--all-spaces", help="Search every space, not just the current one"
+        ),
+    ] = False,
+    full_id: Annotated[
+        bool,
+        typer.Option("--full-id/--not-full-id", "-f", help="Show full id for the todo"),
+    ] = False,
+):
+    """Search todo titles."""
+    from todoforge.utils.search import parse_query
+
+    terms = parse_query(" ".join(query))
+    if not terms:
+        print("Oops... please pass at least one word to search for.")
+        raise typer.Exit(code=1)
+
+    if all_spaces:
+        spaces_to_search = todo_config.get_spaces_list()
+    else:
+        current_space = todo_config.get_current_space()
+        if current_space == "":
+            print(
+                "Oops... Looks like there is no space available. Please create a new space using [italic][green]tdf spaces add <name>[/green][/italic] and then try again."
+            )
+            raise typer.Exit(code=1)
+        spaces_to_search = [current_space]
+
+    results = [
+        (space, todo)
+        for space in spaces_to_search
+        for todo in search_todos(terms, space)
+    ]
+    if not results:
+        print(f"No todos match '[green]{' '.join(query)}[/green]'.")
+        raise typer.Exit(code=1)
+
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title=f"Todos matching '{' '.join(query)}'", box=box.MARKDOWN)
+
+    if all_spaces:
+        table.add_column("Space", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Id", justify="left", style="grey50", no_wrap=True)
+    table.add_column("Title", justify="left", style="light_sea_green")
+
+    for space, todo in results:
+        id_ = todo["id"] if full_id else short_todo_id(todo["id"], space)
+        row = (id_, todo["title"].strip())
+        table.add_row(*((space, *row) if all_spaces else row))
+
+    console.print(table)
+
+
+@app.command()
+def summary():
+    """Show open and done todo counts for every space."""
+    spaces_list = todo_config.get_spaces_list()
+    if not spaces_list:
+        print(
+            "Oops... Looks like there is no space available. Please create a new space using [italic][green]tdf spaces add <name>[/green][/italic] and then try again."
+        )
+        raise typer.Exit(code=1)
+
+    documents = load_spaces(spaces_list)
+
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    from todoforge.utils.models import load_records
+
+    current_space = todo_config.get_current_space()
+    counts = []
+    for space, document in documents.items():
+        try:
+            records = load_records(document["todos"])
+        except ValueError as e:
+            print(
+                f"Oops... space '[green]{space}[/green]' holds an invalid todo.\n[red]{e}[/red]"
+            )
+            raise typer.Exit(code=1)
+        done_count = sum(1 for record in records if record.done)
+        counts.append((space, len(records) - done_count, done_count))
+
+    total_open = sum(open_count for _, open_count, _ in counts)
+    total_done = sum(done_count for _, _, done_count in counts)
+
+    console = Console()
+    table = Table(title="Summary of All Spaces", box=box.MARKDOWN, show_footer=True)
+    table.add_column("Space", "Total", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Open", str(total_open), justify="right", style="red")
+    table.add_column("Done", str(total_done), justify="right", style="green")
+    table.add_column("Progress", _progress(total_open, total_done), justify="right")
+
+    for space, open_count, done_count in counts:
         table.add_row(
-            id_,
-            todo["title"].strip(),
-            "[green]✔[/green]" if todo["done"] else "✘",
+            f"* {space}" if space == current_space else f"  {space}",
+            str(open_count),
+            str(done_count),
+            _progress(open_count, done_count),
         )
 
     console.print(table)
@@ -74,22 +406,61 @@ def ls(
 
 @app.command()
 def add(
-    title: str,
+    title: Annotated[
+        Optional[str],
+        typer.Argument(
+            show_default=False,
+            help="Todo title. Pass '-' to read titles from stdin, one per line",
+        ),
+    ] = None,
     done: Annotated[
         bool, typer.Option("--done/--not-done", help="Is the todo completed?")
     ] = False,
+    from_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--from-file",
+            exists=True,
+            dir_okay=False,
+            show_default=False,
+            help="Read titles from a file, one per line",
+        ),
+    ] = None,
 ):
     """Add task to todos list."""
+    from todoforge.utils.models import TodoModel
+
+    if from_file is not None or title == "-":
+        start = time.perf_counter()
+        try:
+            with (
+                open(from_file, encoding="utf-8")
+                if from_file is not None
+                else nullcontext(sys.stdin)
+            ) as lines:
+                count = add_todos_from_lines(lines=lines, done=done)
+        except (ValueError, OSError) as e:
+            print(f"Oops... something went wrong!\n[red]{e}[/red]")
+            raise typer.Exit(code=1)
+
+        elapsed = time.perf_counter() - start
+        print(f"Added {count} tasks in {elapsed:.2f}s ({count / elapsed:,.0f} tasks/s)")
+        return
+
+    if title is None:
+        print(
+            "Oops... missing task title. Use [italic][green]tdf add <task>[/green][/italic] or [italic][green]tdf add --from-file <path>[/green][/italic]"
+        )
+        raise typer.Exit(code=1)
 
     try:
         todo = TodoModel(
-            id=TodoModel.generate_id(title=title),
+            id=TodoModel.generate_id(),
             title=title,
             done=done,
+            created_at=datetime.now(timezone.utc),
         )
-        todo_store = get_todos()
-        todo_store["todos"].append(todo.model_dump())
-        save_todos(todos=todo_store)
+        add_todos(todos=[todo.model_dump(mode="json", exclude_none=True)])
 
         print("Task added successfully")
     except Exception as e:
@@ -100,45 +471,45 @@ def add(
 @app.command()
 def toggle():
     """Toggle Task in an interactive window."""
+    from functools import partial
+
+    from todoforge.utils.toggles import ToggleJournal
+    from todoforge.utils.ui.menu import show_options
+
     todos = get_todos()
     current_space = todo_config.get_current_space()
-    updated_todos = show_options(
-        title=f"{current_space.capitalize()}'s Todo List",
-        items=todos["todos"],
-        callback=handle_toggle_space_key,
-    )
-
-    save_todos({"todos": updated_todos})
+    # Toggles are saved as they are made, so closing the terminal mid-session
+    # loses none of them.
+    with ToggleJournal(current_space) as journal:
+        show_options(
+            title=f"{current_space.capitalize()}'s Todo List",
+            items=todos["todos"],
+            callback=partial(handle_toggle_space_key, toggle_journal=journal),
+        )
 
 
 @app.command()
 def done(
-    todo_id: Annotated[
-        str,
-        typer.Argument(
-            metavar="todo-id",
-            show_default=False,
-            help="Todo id. Supports both partial and full id",
-        ),
-    ]
+    todo_ids: TodoIdsArgument = None,
+    all_done: AllDoneOption = False,
+    title_matches: TitleMatchesOption = None,
+    older_than: OlderThanOption = None,
 ):
-    """Mark todo as done."""
-    update_todo_status(todo_id=todo_id, status=True)
+    """Mark todos as done."""
+    selector = _build_selector(todo_ids, all_done, title_matches, older_than)
+    update_todos_status(todo_ids=todo_ids or [], status=True, selector=selector)
 
 
 @app.command()
 def undo(
-    todo_id: Annotated[
-        str,
-        typer.Argument(
-            metavar="todo-id",
-            show_default=False,
-            help="Todo id. Supports both partial and full id",
-        ),
-    ]
+    todo_ids: TodoIdsArgument = None,
+    all_done: AllDoneOption = False,
+    title_matches: TitleMatchesOption = None,
+    older_than: OlderThanOption = None,
 ):
-    """Mark todo as undone."""
-    update_todo_status(todo_id=todo_id, status=False)
+    """Mark todos as undone."""
+    selector = _build_selector(todo_ids, all_done, title_matches, older_than)
+    update_todos_status(todo_ids=todo_ids or [], status=False, selector=selector)
 
 
 @app.command()
@@ -153,6 +524,7 @@ def edit(
     ]
 ):
     """Edit todo title."""
+    from rich.prompt import Prompt
 
     title = Prompt.ask("Edit todo title to")
 
@@ -161,21 +533,310 @@ def edit(
 
 @app.command()
 def remove(
-    todo_id: Annotated[
-        str,
+    todo_ids: TodoIdsArgument = None,
+    all_done: AllDoneOption = False,
+    title_matches: TitleMatchesOption = None,
+    older_than: OlderThanOption = None,
+):
+    """Remove tasks from the todo list."""
+    selector = _build_selector(todo_ids, all_done, title_matches, older_than)
+    remove_tasks_from_todo(todo_ids=todo_ids or [], selector=selector)
+
+
+@app.command()
+def archive(
+    older_than: Annotated[
+        Optional[str],
+        typer.Option(
+            "--older-than",
+            metavar="DURATION",
+            show_default=False,
+            help="Archive completed todos created more than DURATION ago, e.g. 30d",
+        ),
+    ] = None,
+    keep: Annotated[
+        Optional[int],
+        typer.Option(
+            "--keep",
+            min=0,
+            show_default=False,
+            help="Archive all but the N most recently created completed todos",
+        ),
+    ] = None,
+    space: Annotated[
+        Optional[str],
+        typer.Option(
+            "--space",
+            show_default=False,
+            help="Space to archive. Defaults to the current space",
+        ),
+    ] = None,
+    auto: Annotated[
+        Optional[bool],
+        typer.Option(
+            "--auto/--no-auto",
+            show_default=False,
+            help="Save --older-than and --keep as the policy `tdf done` applies to every space, or drop the policy",
+        ),
+    ] = None,
+):
+    """
+    Move completed todos into the compressed archive of a space.
+
+    Without --older-than or --keep every completed todo is archived. A todo
+    matching either rule is. Archived todos are only read by `tdf ls --archived`.
+    """
+    from todoforge.utils.archive import POLICY_KEY
+    from todoforge.utils.constants import DEFAULT_TODO_CONFIG
+    from todoforge.utils.selectors import parse_duration
+
+    space = _existing_space(space)
+    try:
+        age = parse_duration(older_than) if older_than else None
+    except ValueError as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    if auto:
+        if older_than is None and keep is None:
+            print("[red]Pass --older-than or --keep to set an archive policy.[/red]")
+            raise typer.Exit(code=1)
+        policy = {"older_than": older_than, "keep": keep}
+        todo_config.update(
+            DEFAULT_TODO_CONFIG,
+            lambda config: {
+                **config,
+                POLICY_KEY: {k: v for k, v in policy.items() if v is not None},
+            },
+        )
+    elif auto is False:
+        todo_config.update(
+            DEFAULT_TODO_CONFIG,
+            lambda config: {k: v for k, v in config.items() if k != POLICY_KEY},
+        )
+        print("Todos are no longer archived automatically.")
+        return
+
+    try:
+        count = archive_todos(space, older_than=age, keep=keep)
+    except (ValueError, OSError) as e:
+        print(f"Oops... something went wrong!\n[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    print(f"Archived {count} completed todos of '[green]{space}[/green]'.")
+    if auto:
+        print(
+            "They will be archived after every [italic][green]tdf done[/green][/italic] from now on."
+        )
+
+
+@app.command()
+def export(
+    output_format: Annotated[
+        TransferFormat, typer.Option("--format", help="Format to write todos in")
+    ] = TransferFormat.ndjson,
+    space: Annotated[
+        Optional[str],
+        typer.Option(
+            "--space",
+            show_default=False,
+            help="Space to export. Defaults to the current space",
+        ),
+    ] = None,
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output",
+            "-o",
+            dir_okay=False,
+            show_default=False,
+            help="Write to a file instead of stdout",
+        ),
+    ] = None,
+):
+    """Export the todos of a space as NDJSON or CSV, one todo at a time."""
+    space = _existing_space(space)
+
+    try:
+        if output is None:
+            count = write_records(stream_todos(space), output_format, sys.stdout)
+            sys.stdout.flush()
+        else:
+            with open(output, "w", encoding="utf-8", newline="") as f:
+                count = write_records(stream_todos(space), output_format, f)
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise typer.Exit(code=0)
+    except (ValueError, OSError) as e:
+        print(f"Oops... something went wrong!\n[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    if output is not None:
+        print(f"Exported {count} todos of '[green]{space}[/green]' to {output}")
+
+
+@app.command(name="import")
+def import_(
+    file: Annotated[
+        Path,
         typer.Argument(
-            metavar="todo-id",
+            metavar="FILE",
+            exists=True,
+            dir_okay=False,
+            allow_dash=True,
             show_default=False,
-            help="Todo id. Supports both partial and full id",
+            help="NDJSON or CSV file to import. Pass '-' to read stdin",
         ),
-    ]
+    ],
+    input_format: Annotated[
+        Optional[TransferFormat],
+        typer.Option(
+            "--format",
+            show_default=False,
+            help="Format of the file. Defaults to csv for .csv files, ndjson otherwise",
+        ),
+    ] = None,
+    space: Annotated[
+        Optional[str],
+        typer.Option(
+            "--space",
+            show_default=False,
+            help="Space to import into. Defaults to the current space",
+        ),
+    ] = None,
+):
+    """Import todos from an NDJSON or CSV file, skipping ids the space already has."""
+    space = _existing_space(space)
+    if input_format is None:
+        is_csv = file.suffix.lower() == ".csv"
+        input_format = TransferFormat.csv if is_csv else TransferFormat.ndjson
+
+    start = time.perf_counter()
+    try:
+        with (
+            open(file, encoding="utf-8", newline="")
+            if str(file) != "-"
+            else nullcontext(sys.stdin)
+        ) as f:
+            imported, skipped = import_todos(read_records(f, input_format), space)
+    except (ValueError, OSError) as e:
+        print(f"Oops... something went wrong!\n[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Imported {imported} todos into '[green]{space}[/green]' in {elapsed:.2f}s"
+        + (f", skipped {skipped} already there" if skipped else "")
+    )
+
+
+@app.command()
+def migrate(
+    to: Annotated[
+        str,
+        typer.Option("--to", help="Storage backend to move every space into"),
+    ] = "sqlite",
+):
+    """Move every space into another storage backend."""
+
+    try:
+        migrate_spaces(backend_name=to)
+    except (ValueError, OSError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def daemon(
+    stop: Annotated[
+        bool, typer.Option("--stop", help="Stop the running daemon")
+    ] = False,
+    flush_interval: Annotated[
+        float,
+        typer.Option(
+            "--flush-interval",
+            min=0.01,
+            help="Seconds between writes of changed spaces to disk",
+        ),
+    ] = 0.2,
 ):
-    """Remove a task from the todo list."""
+    """Keep spaces in memory and serve tdf commands over a Unix socket."""
+    import asyncio
+
+    from todoforge.client import request
+    from todoforge.daemon import Daemon
+    from todoforge.utils.constants import DEFAULT_DAEMON_SOCKET
+
+    socket_path = str(DEFAULT_DAEMON_SOCKET)
+    running = request({"op": "ping"}, socket_path)
+
+    if stop:
+        if running is None:
+            print("No todoforge daemon is running.")
+            raise typer.Exit(code=1)
+        request({"op": "stop"}, socket_path)
+        print("Todoforge daemon has been stopped.")
+        return
+
+    if running is not None:
+        print(
+            f"A todoforge daemon is already running with pid [green]{running['pid']}[/green]."
+        )
+        raise typer.Exit(code=1)
+
+    # Only a socket file left behind by a daemon that is gone can be here.
+    DEFAULT_DAEMON_SOCKET.unlink(missing_ok=True)
+    print(f"Todoforge daemon listening on [green]{socket_path}[/green]")
+    asyncio.run(Daemon(socket_path, flush_interval=flush_interval).serve())
+
+
+def _progress(open_count: int, done_count: int) -> str:
+    total = open_count + done_count
+    return f"{done_count / total:.0%}" if total else "-"
 
-    remove_task_from_todo(todo_id=todo_id)
+
+def _existing_space(space: Optional[str]) -> str:
+    if space is None:
+        space = todo_config.get_current_space()
+        if space == "":
+            print(
+                "Oops... Looks like there is no space available. Please create a new space using [italic][green]tdf spaces add <name>[/green][/italic] and then try again."
+            )
+            raise typer.Exit(code=1)
+    if space not in todo_config.get_spaces_list():
+        print(f"Space '[green]{space}[/green]' does not exist.")
+        raise typer.Exit(code=1)
+    return space
+
+
+def _build_selector(
+    todo_ids: Optional[list[str]],
+    all_done: bool,
+    title_matches: Optional[str],
+    older_than: Optional[str],
+) -> TodoSelector:
+    try:
+        selector = build_selector(
+            all_done=all_done, title_matches=title_matches, older_than=older_than
+        )
+    except ValueError as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    if not todo_ids and selector.is_empty():
+        print(
+            "Oops... please pass at least one todo id or a filter like [italic][green]--all-done[/green][/italic]."
+        )
+        raise typer.Exit(code=1)
+    return selector
 
 
 def run():
+    from todoforge.client import release
+
+    # A running daemon may hold changes that are not on disk yet, and would
+    # overwrite whatever this process writes. Have it flush and let go first.
+    release()
     init_folders()
     app()
 
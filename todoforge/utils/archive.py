@@ -0,0 +1,220 @@
+"""
+Compressed archive of the completed todos of a space.
+
+``tdf archive`` moves completed todos out of a space into
+``<space>_todo.archive.gz``, so every other command only reads the todos still
+in the space. Each run appends one gzip member holding the todos it archived
+as NDJSON lines, which keeps the archive from ever being rewritten, and
+``tdf ls --archived`` streams the members back a line at a time.
+
+Todos are appended to the archive before they are removed from the space. The
+archive size is written to ``<space>_todo.archive.pending`` before an append,
+and the marker is only deleted by ``commit`` once the todos left the space.
+Until then the last member is the pending one: readers only yield its todos
+that are no longer in the space, and the next ``tdf archive`` either cuts it
+off, if the append was torn, or finishes removing its todos from the space.
+An archived todo is therefore never in the archive twice, and only the ids of
+the pending member are ever checked against the space.
+
+An archive policy in config.json, e.g. ``{"older_than": "30d", "keep": 500}``,
+is applied to a space after ``tdf done`` (see ``helper.auto_archive``).
+
+This module is imported by every ``tdf`` command, so ``gzip`` is only imported
+when an archive is read or written.
+"""
+
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+from todoforge.utils import profiling
+from todoforge.utils.selectors import todo_created_at
+
+POLICY_KEY = "archive_policy"
+COMPRESS_LEVEL = 6
+
+
+class Archive:
+    def __init__(self, root: Path, space: str) -> None:
+        self.root = root
+        self.space = space
+        self.filepath = root / f"{space}_todo.archive.gz"
+        self.pending_filepath = root / f"{space}_todo.archive.pending"
+
+    def exists(self) -> bool:
+        return self.filepath.exists()
+
+    def append(self, todos: list[dict]) -> None:
+        """
+        Appends `todos` to the archive as one gzip member.
+
+        The member stays pending until ``commit`` is called, once `todos` were
+        removed from the space. Call ``recover`` first, so no other is.
+        """
+        import gzip
+
+        lines = "".join(json.dumps(todo, sort_keys=True) + "\n" for todo in todos)
+        data = gzip.compress(lines.encode("utf-8"), compresslevel=COMPRESS_LEVEL)
+        with profiling.phase("write archive"):
+            self.pending_filepath.write_text(str(self.size()))
+            with open(self.filepath, "ab") as f:
+                f.write(data)
+                f.flush()
+                profiling.count_written(len(data))
+                os.fsync(f.fileno())
+
+    def commit(self) -> None:
+        """Marks the pending member as archived for good."""
+        self.pending_filepath.unlink(missing_ok=True)
+
+    def recover(self) -> list[str]:
+        """
+        Returns the ids of the pending member a crash left behind.
+
+        They may still be in the space, and have to be removed from it before
+        ``commit``. A torn member is cut off instead, and nothing is returned.
+        """
+        try:
+            size = int(self.pending_filepath.read_text())
+        except FileNotFoundError:
+            return []
+        todos = self._pending_todos(size)
+        if todos is None:
+            if self.filepath.exists():
+                os.truncate(self.filepath, size)
+            self.commit()
+            return []
+        return [todo["id"] for todo in todos]
+
+    def iter_todos(
+        self, live: Callable[[list[str]], set[str]] | None = None
+    ) -> Iterator[dict]:
+        """
+        Yields the archived todos in the order they were archived.
+
+        `live` returns which of the ids it is passed are still in the space.
+        The todos of the pending member are only yielded once they are not.
+        """
+        if not self.exists():
+            return
+
+        import gzip
+
+        try:
+            committed = int(self.pending_filepath.read_text())
+        except FileNotFoundError:
+            committed = None
+
+        with open(self.filepath, "rb") as f:
+            prefix = (
+                f if committed is None else io.BufferedReader(_Prefix(f, committed))
+            )
+            lines = io.TextIOWrapper(gzip.GzipFile(fileobj=prefix), encoding="utf-8")
+            try:
+                for line in lines:
+                    yield json.loads(line)
+            except (EOFError, gzip.BadGzipFile, zlib.error, json.JSONDecodeError):
+                # Only the pending member can ever be torn.
+                return
+
+        if committed is not None:
+            todos = self._pending_todos(committed) or []
+            hidden = live([todo["id"] for todo in todos]) if live and todos else set()
+            yield from (todo for todo in todos if todo["id"] not in hidden)
+
+    def checked_at(self) -> datetime | None:
+        """Returns when the archive was last written or touched."""
+        try:
+            mtime = self.filepath.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        return datetime.fromtimestamp(mtime, timezone.utc)
+
+    def touch(self) -> None:
+        """Records that the space was checked for todos to archive."""
+        self.filepath.touch()
+
+    def size(self) -> int:
+        try:
+            return self.filepath.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def rename(self, new_space: str) -> None:
+        renamed = Archive(self.root, new_space)
+        for old, new in (
+            (self.pending_filepath, renamed.pending_filepath),
+            (self.filepath, renamed.filepath),
+        ):
+            if old.exists():
+                old.rename(new)
+
+    def clear(self) -> None:
+        self.filepath.unlink(missing_ok=True)
+        self.pending_filepath.unlink(missing_ok=True)
+
+    def _pending_todos(self, committed: int) -> list[dict] | None:
+        """Returns the todos of the member at `committed`, or None if it is torn."""
+        import gzip
+
+        try:
+            with open(self.filepath, "rb") as f:
+                f.seek(committed)
+                data = gzip.decompress(f.read())
+        except FileNotFoundError:
+            return []
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            return None
+        try:
+            return [json.loads(line) for line in data.splitlines()]
+        except json.JSONDecodeError:
+            return None
+
+
+class _Prefix(io.RawIOBase):
+    """Reads the first `size` bytes of `f`."""
+
+    def __init__(self, f: BinaryIO, size: int) -> None:
+        self._f = f
+        self._left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._f.readinto(memoryview(buffer)[: self._left])
+        self._left -= n
+        return n
+
+
+def select_todos(
+    todos: list[dict],
+    older_than: timedelta | None = None,
+    keep: int | None = None,
+    now: datetime | None = None,
+) -> list[dict]:
+    """
+    Returns the completed `todos` to archive.
+
+    A todo is archived if it was created more than `older_than` ago, or if it
+    is not among the `keep` most recently created completed todos. Without
+    either rule, every completed todo is archived.
+    """
+    done = [todo for todo in todos if todo.get("done")]
+    if older_than is None and keep is None:
+        return done
+
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    created = {todo["id"]: todo_created_at(todo) or oldest for todo in done}
+    selected = set()
+    if older_than is not None:
+        cutoff = (now or datetime.now(timezone.utc)) - older_than
+        selected.update(i for i, created_at in created.items() if created_at < cutoff)
+    if keep is not None:
+        by_age = sorted(created, key=created.__getitem__)
+        selected.update(by_age[: max(len(by_age) - keep, 0)])
+    return [todo for todo in done if todo["id"] in selected]
@@ -0,0 +1,46 @@
+from todoforge.utils.backends.base import StorageBackend as StorageBackend
+from todoforge.utils.backends.buffered import BufferedBackend as BufferedBackend
+from todoforge.utils.backends.jsonfile import JsonBackend as JsonBackend
+from todoforge.utils.backends.sqlite import SqliteBackend as SqliteBackend
+from todoforge.utils.config import todo_config
+
+BACKENDS: dict[str, type[StorageBackend]] = {
+    JsonBackend.name: JsonBackend,
+    SqliteBackend.name: SqliteBackend,
+}
+DEFAULT_BACKEND = JsonBackend.name
+
+_backends: dict[str, StorageBackend] = {}
+_active_backend: StorageBackend | None = None
+
+
+def get_backend(name: str | None = None) -> StorageBackend:
+    """
+    Returns the backend called `name`, or the one configured in config.json.
+
+    A backend set with ``use_backend`` takes the place of the configured one.
+    """
+    if name is None:
+        if _active_backend is not None:
+            return _active_backend
+        name = todo_config.get_space_config().get("backend", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown storage backend '{name}'. Available backends: {', '.join(BACKENDS)}"
+        )
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+
+def use_backend(backend: StorageBackend | None) -> None:
+    """Serves every ``get_backend()`` call from `backend`, or the config again if None."""
+    global _active_backend
+    _active_backend = backend
+
+
+def copy_space(source: StorageBackend, target: StorageBackend, space: str) -> int:
+    """Copies every todo of `space` from `source` into `target`."""
+    document = source.load(space)
+    target.save(space, document)
+    return len(document.get("todos", []))
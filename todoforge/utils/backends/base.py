@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Iterator
+
+from todoforge.utils.idindex import (
+    MIN_PREFIX_LENGTH,
+    AmbiguousIdError,
+    resolve_prefix,
+    unique_prefix_lengths,
+)
+
+MAX_LOAD_WORKERS = 16
+
+
+def iter_by_status(todos: list[dict], done: bool | None = None) -> Iterator[dict]:
+    """
+    Yields `todos` open ones first, each group in list order.
+
+    Pass `done` to only yield open (False) or completed (True) todos.
+    """
+    for status in (False, True) if done is None else (done,):
+        for todo in todos:
+            if bool(todo.get("done")) == status:
+                yield todo
+
+
+class StorageBackend(ABC):
+    """
+    Storage for the todos of every space.
+
+    A space's document is a dict with a ``todos`` list, the same shape as the
+    ``<space>_todo.json`` files. Backends are free to store it however they like
+    as long as mutations only touch the todos they are given.
+    """
+
+    name: str
+    root: Path
+
+    @abstractmethod
+    def load(self, space: str) -> dict:
+        """Returns the whole document of `space`."""
+
+    @abstractmethod
+    def save(self, space: str, document: dict) -> None:
+        """Replaces the whole document of `space`."""
+
+    @abstractmethod
+    def add(self, space: str, todos: list[dict]) -> None:
+        """Adds new todos to `space`."""
+
+    @abstractmethod
+    def update(self, space: str, todo_ids: list[str], updates: dict) -> None:
+        """Applies the same field updates to every todo in `todo_ids`."""
+
+    @abstractmethod
+    def remove(self, space: str, todo_ids: list[str]) -> None:
+        """Removes every todo in `todo_ids` from `space`."""
+
+    @abstractmethod
+    def create_space(self, space: str) -> None:
+        """Creates an empty space."""
+
+    @abstractmethod
+    def rename_space(self, old_name: str, new_name: str) -> None:
+        """Renames a space, keeping all of its todos."""
+
+    @abstractmethod
+    def remove_space(self, space: str) -> None:
+        """Deletes a space and all of its todos."""
+
+    @abstractmethod
+    def has_space(self, space: str) -> bool:
+        """Checks whether `space` exists in this backend."""
+
+    @abstractmethod
+    def list_spaces(self) -> list[str]:
+        """Lists the names of every space stored in this backend."""
+
+    def load_many(self, spaces: list[str]) -> dict[str, dict]:
+        """
+        Returns the documents of `spaces`, keyed by space in the given order.
+
+        Spaces are loaded on a thread pool, so reading one space's file
+        overlaps with parsing another's.
+        """
+        if len(spaces) <= 1:
+            return {space: self.load(space) for space in spaces}
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(spaces))) as pool:
+            return dict(zip(spaces, pool.map(self.load, spaces)))
+
+    def iter_todos(self, space: str, done: bool | None = None) -> Iterator[dict]:
+        """
+        Yields the todos of `space`, open ones first, each group in insertion order.
+
+        Pass `done` to only yield open (False) or completed (True) todos.
+        """
+        return iter_by_status(self.load(space)["todos"], done)
+
+    def stream_todos(self, space: str) -> Iterator[dict]:
+        """
+        Yields the todos of `space` in insertion order.
+
+        Backends that can read a space a todo at a time do, so going through a
+        whole space does not need to hold it in memory.
+        """
+        return iter(self.load(space)["todos"])
+
+    def existing_ids(self, space: str, todo_ids: list[str]) -> set[str]:
+        """Returns the ids of `todo_ids` that are already in `space`."""
+        wanted = set(todo_ids)
+        return {
+            todo["id"] for todo in self.load(space)["todos"] if todo["id"] in wanted
+        }
+
+    def bulk(self, space: str) -> AbstractContextManager:
+        """
+        Returns a context manager to wrap many ``add`` calls to `space` in.
+
+        Backends may defer their own upkeep, like compacting a log, until the
+        block exits, so adding a large number of todos in batches stays linear.
+        """
+        return nullcontext()
+
+    def id_prefix_lengths(self, space: str) -> dict[str, int]:
+        """Returns the length of the shortest unique prefix of each id in `space`."""
+        return unique_prefix_lengths(todo["id"] for todo in self.load(space)["todos"])
+
+    def short_id(self, space: str, todo_id: str) -> str:
+        """Returns the shortest prefix of `todo_id` that still resolves to it."""
+        for length in range(MIN_PREFIX_LENGTH, len(todo_id)):
+            try:
+                if self.resolve(space, todo_id[:length]) == todo_id:
+                    return todo_id[:length]
+            except AmbiguousIdError:
+                continue
+        return todo_id
+
+    def status_counts(self, space: str, todo_ids: list[str]) -> tuple[int, int]:
+        """Returns how many of `todo_ids` are open and how many are done in `space`."""
+        wanted = set(todo_ids)
+        done = [
+            bool(todo.get("done"))
+            for todo in self.load(space)["todos"]
+            if todo["id"] in wanted
+        ]
+        return done.count(False), done.count(True)
+
+    def space_size(self, space: str) -> int | None:
+        """Returns the bytes `space` takes on disk, or None if it shares its files."""
+        return None
+
+    def space_stamp(self, space: str) -> int | None:
+        """
+        Returns a stamp of `space` that changes with every write to it.
+
+        Indexes kept next to a space store it to tell whether the space changed
+        since. None means the backend cannot tell.
+        """
+        return None
+
+    def space_format(self, space: str) -> str:
+        """Returns the on-disk format `space` is stored in."""
+        return self.name
+
+    def convert_space(self, space: str, space_format: str) -> None:
+        """Rewrites `space` in another on-disk format."""
+        raise ValueError(f"The {self.name} backend does not support space formats.")
+
+    def lock(self, space: str) -> AbstractContextManager:
+        """
+        Returns a context manager that keeps other processes from changing `space`.
+
+        Hold it around a read-modify-write cycle so concurrent ``tdf`` invocations
+        cannot lose each other's updates.
+        """
+        return nullcontext()
+
+    def sync(self, space: str) -> None:
+        """
+        Writes the mutations of `space` made so far to disk.
+
+        Backends that write every mutation through already have nothing to do.
+        Call it where a later step relies on a mutation being durable.
+        """
+
+    def resolve(self, space: str, todo_id: str) -> str | None:
+        """
+        Returns the full id of the todo whose id starts with `todo_id`.
+
+        Raises:
+            AmbiguousIdError: If more than one todo id starts with `todo_id`.
+        """
+        matches = [
+            todo["id"]
+            for todo in self.load(space)["todos"]
+            if todo["id"].startswith(todo_id)
+        ]
+        return resolve_prefix(todo_id, sorted(matches))
@@ -0,0 +1,223 @@
+from bisect import bisect_left
+from contextlib import AbstractContextManager
+from typing import Iterator
+
+from todoforge.utils.backends.base import StorageBackend
+from todoforge.utils.idindex import resolve_prefix, unique_prefix_lengths
+
+
+class _Space:
+    def __init__(self, document: dict, stamp: int | None) -> None:
+        self.meta = {key: value for key, value in document.items() if key != "todos"}
+        self.todos = {todo["id"]: dict(todo) for todo in document.get("todos", [])}
+        self.stamp = stamp
+        # Mutations not flushed yet, as the name and arguments of the backend
+        # method that writes them, unless the whole document was replaced.
+        self.ops: list[tuple[str, tuple]] = []
+        self.replaced = False
+        self._sorted_ids: list[str] | None = None
+
+    def document(self) -> dict:
+        return {**self.meta, "todos": list(self.todos.values())}
+
+    def sorted_ids(self) -> list[str]:
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self.todos)
+        return self._sorted_ids
+
+    def apply(self, name: str, args: tuple) -> None:
+        """Applies the mutation `name` to memory and buffers it for the flush."""
+        getattr(self, name)(*args)
+        self.ops.append((name, args))
+
+    def add(self, todos: list[dict]) -> None:
+        for todo in todos:
+            self.todos[todo["id"]] = dict(todo)
+        self._sorted_ids = None
+
+    def update(self, todo_ids: list[str], updates: dict) -> None:
+        for todo_id in todo_ids:
+            if todo_id in self.todos:
+                self.todos[todo_id].update(updates)
+
+    def remove(self, todo_ids: list[str]) -> None:
+        for todo_id in todo_ids:
+            self.todos.pop(todo_id, None)
+        self._sorted_ids = None
+
+
+class BufferedBackend(StorageBackend):
+    """
+    Keeps the spaces of another backend in memory.
+
+    A space is read from the wrapped backend the first time it is used, along
+    with its ``space_stamp``. After that, reads are served from memory and
+    mutations only change memory and mark the space dirty, until ``flush``
+    writes them back with the wrapped backend's ``add``, ``update`` and
+    ``remove``. Only a ``save`` is flushed as a whole document. This is what the
+    daemon runs on, and it serializes every request itself.
+
+    ``tdf`` commands run without the daemon write to the same files, so a
+    space is checked against its stamp, under its lock, every time it is used.
+    One that changed is read again, with the mutations still buffered applied
+    on top, and the flush writes them on top of what is on disk. ``lock`` is
+    the wrapped backend's, and ``sync`` flushes a single space right away.
+    """
+
+    name = "buffered"
+
+    def __init__(self, backend: StorageBackend) -> None:
+        self.backend = backend
+        self.root = backend.root
+        self.dirty: set[str] = set()
+        self._spaces: dict[str, _Space] = {}
+
+    def load(self, space: str) -> dict:
+        return self._space(space).document()
+
+    def save(self, space: str, document: dict) -> None:
+        loaded = _Space(document, None)
+        loaded.replaced = True
+        self._spaces[space] = loaded
+        self.dirty.add(space)
+
+    def add(self, space: str, todos: list[dict]) -> None:
+        self._space(space).apply("add", ([dict(todo) for todo in todos],))
+        self.dirty.add(space)
+
+    def update(self, space: str, todo_ids: list[str], updates: dict) -> None:
+        self._space(space).apply("update", (list(todo_ids), dict(updates)))
+        self.dirty.add(space)
+
+    def remove(self, space: str, todo_ids: list[str]) -> None:
+        self._space(space).apply("remove", (list(todo_ids),))
+        self.dirty.add(space)
+
+    def resolve(self, space: str, todo_id: str) -> str | None:
+        loaded = self._space(space)
+        if todo_id in loaded.todos:
+            return todo_id
+
+        sorted_ids = loaded.sorted_ids()
+        i = bisect_left(sorted_ids, todo_id)
+        matches = [
+            match for match in sorted_ids[i : i + 2] if match.startswith(todo_id)
+        ]
+        return resolve_prefix(todo_id, matches)
+
+    def id_prefix_lengths(self, space: str) -> dict[str, int]:
+        return unique_prefix_lengths(self._space(space).sorted_ids())
+
+    def lock(self, space: str) -> AbstractContextManager:
+        # Commands run without the daemon may write to the space meanwhile.
+        return self.backend.lock(space)
+
+    def stream_todos(self, space: str) -> Iterator[dict]:
+        return (dict(todo) for todo in self._space(space).todos.values())
+
+    def existing_ids(self, space: str, todo_ids: list[str]) -> set[str]:
+        return self._space(space).todos.keys() & set(todo_ids)
+
+    def status_counts(self, space: str, todo_ids: list[str]) -> tuple[int, int]:
+        todos = self._space(space).todos
+        done = [bool(todos[i].get("done")) for i in set(todo_ids) if i in todos]
+        return done.count(False), done.count(True)
+
+    def space_size(self, space: str) -> int | None:
+        return self.backend.space_size(space)
+
+    def space_stamp(self, space: str) -> int | None:
+        # Until a dirty space is flushed, what is on disk is not what was read.
+        if space in self.dirty:
+            return None
+        return self.backend.space_stamp(space)
+
+    def space_format(self, space: str) -> str:
+        return self.backend.space_format(space)
+
+    def convert_space(self, space: str, space_format: str) -> None:
+        self.flush()
+        self.backend.convert_space(space, space_format)
+        self._forget(space)
+
+    def create_space(self, space: str) -> None:
+        self.backend.create_space(space)
+        self._forget(space)
+
+    def rename_space(self, old_name: str, new_name: str) -> None:
+        self.flush()
+        self.backend.rename_space(old_name, new_name)
+        self._forget(old_name)
+
+    def remove_space(self, space: str) -> None:
+        self._forget(space)
+        self.backend.remove_space(space)
+
+    def has_space(self, space: str) -> bool:
+        return space in self._spaces or self.backend.has_space(space)
+
+    def list_spaces(self) -> list[str]:
+        return self.backend.list_spaces()
+
+    def sync(self, space: str) -> None:
+        if space in self.dirty:
+            self._flush(space)
+
+    def flush(self) -> None:
+        """Writes the buffered mutations of every dirty space to the wrapped backend."""
+        for space in sorted(self.dirty):
+            self._flush(space)
+
+    def release(self) -> None:
+        """Flushes, then drops every space so the next use reads it again."""
+        self.flush()
+        self._spaces.clear()
+
+    def _flush(self, space: str) -> None:
+        loaded = self._spaces[space]
+        with self.backend.lock(space):
+            if loaded.replaced:
+                self.backend.save(space, loaded.document())
+                changed = False
+            else:
+                changed = self.backend.space_stamp(space) != loaded.stamp
+                self._write_ops(space, loaded)
+            stamp = self.backend.space_stamp(space)
+        if changed:
+            # Memory misses what was written behind it, so read it again.
+            del self._spaces[space]
+        else:
+            loaded.stamp = stamp
+            loaded.replaced = False
+        self.dirty.discard(space)
+
+    def _space(self, space: str) -> _Space:
+        loaded = self._spaces.get(space)
+        if loaded is not None and loaded.replaced:
+            # The flush overwrites whatever is on disk.
+            return loaded
+
+        with self.backend.lock(space):
+            stamp = self.backend.space_stamp(space)
+            if loaded is not None and stamp == loaded.stamp:
+                return loaded
+            fresh = _Space(self.backend.load(space), stamp)
+        if loaded is not None:
+            for name, args in loaded.ops:
+                fresh.apply(name, args)
+        self._spaces[space] = fresh
+        return fresh
+
+    def _write_ops(self, space: str, loaded: _Space) -> None:
+        written = 0
+        try:
+            for name, args in loaded.ops:
+                getattr(self.backend, name)(space, *args)
+                written += 1
+        finally:
+            # A flush that failed midway only writes the rest next time.
+            del loaded.ops[:written]
+
+    def _forget(self, space: str) -> None:
+        self._spaces.pop(space, None)
+        self.dirty.discard(space)
@@ -0,0 +1,425 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from todoforge.utils import compact, oplog, profiling
+from todoforge.utils.backends.base import StorageBackend, iter_by_status
+from todoforge.utils.config import todo_config
+from todoforge.utils.constants import DEFAULT_TODO_FOLDER
+from todoforge.utils.idindex import IdIndex, unique_prefix_lengths
+from todoforge.utils.locking import file_lock
+from todoforge.utils.oplog import OpLog
+from todoforge.utils.shards import ShardedSpace
+from todoforge.utils.statusindex import StatusIndex, entries_of, stamp_of
+
+JSON_FORMAT = "json"
+COMPACT_FORMAT = "compact"
+SHARDED_FORMAT = "sharded"
+SPACE_FORMATS = (JSON_FORMAT, COMPACT_FORMAT, SHARDED_FORMAT)
+
+
+class JsonBackend(StorageBackend):
+    """
+    One ``<space>_todo.json`` snapshot per space, plus an append-only operation
+    log that holds every mutation made since the snapshot was last written.
+
+    A sorted ``<space>_todo.ids`` index is kept next to them so partial ids can
+    be resolved without replaying the space, and a ``<space>_todo.status`` index
+    (see ``todoforge.utils.statusindex``) lists the open and the done todos in
+    creation order, so listing either group is a walk over its todos. Both are
+    updated with every mutation, and rebuilt whenever they are older than the
+    snapshot or the log, e.g. after a crash between the two writes.
+
+    Every mutation holds an exclusive ``<space>_todo.lock`` file lock, so
+    parallel ``tdf`` invocations never lose each other's updates.
+
+    A space converted to the compact format keeps its snapshot in a binary
+    ``<space>_todo.tdf`` file instead (see ``todoforge.utils.compact``), and one
+    converted to the sharded format splits it into shards of todos listed by a
+    ``<space>_todo.manifest`` (see ``todoforge.utils.shards``). The log and the
+    indexes work the same for every format.
+    """
+
+    name = "json"
+
+    def __init__(self, root: Path = DEFAULT_TODO_FOLDER) -> None:
+        self.root = root
+        # Ids and statuses of the todos added to each space inside ``bulk``,
+        # which the indexes lack.
+        self._bulk: dict[str, dict[str, bool]] = {}
+
+    def load(self, space: str) -> dict:
+        space_format = self.space_format(space)
+        if space_format == COMPACT_FORMAT:
+            document = compact.CompactFile(self._compact_filepath(space)).load()
+        elif space_format == SHARDED_FORMAT:
+            document = self._sharded(space).load()
+        else:
+            document = todo_config.get(filepath=self._filepath(space))
+
+        with profiling.phase("replay log"):
+            replayed = self._oplog(space).replay(document.get("todos", []))
+        if replayed is document.get("todos"):
+            return document
+        return {**document, "todos": replayed}
+
+    def save(self, space: str, document: dict) -> None:
+        with self.lock(space):
+            self._write_snapshot(space, document, self.space_format(space))
+            self._oplog(space).clear()
+            self._build_indexes(space, document.get("todos", []))
+
+    def add(self, space: str, todos: list[dict]) -> None:
+        with self.lock(space):
+            if space in self._bulk:
+                self._oplog(space).append({"op": oplog.ADD, "todos": todos})
+                self._bulk[space].update(entries_of(todos))
+                return
+            index, status = self._id_index(space), self._status_index(space)
+            self._append(space, {"op": oplog.ADD, "todos": todos})
+            index.add(todo["id"] for todo in todos)
+            status.add(entries_of(todos))
+            self._check_order(space, status)
+
+    def update(self, space: str, todo_ids: list[str], updates: dict) -> None:
+        with self.lock(space):
+            index, status = self._id_index(space), self._status_index(space)
+            self._append(
+                space, {"op": oplog.UPDATE, "ids": todo_ids, "fields": updates}
+            )
+            index.touch()
+            if "done" in updates:
+                status.set_done(todo_ids, bool(updates["done"]))
+            else:
+                status.touch()
+
+    def remove(self, space: str, todo_ids: list[str]) -> None:
+        with self.lock(space):
+            index, status = self._id_index(space), self._status_index(space)
+            self._append(space, {"op": oplog.REMOVE, "ids": todo_ids})
+            index.remove(todo_ids)
+            status.remove(todo_ids)
+
+    def iter_todos(self, space: str, done: bool | None = None) -> Iterator[dict]:
+        space_format = self.space_format(space)
+        if space_format != JSON_FORMAT and not self._oplog(space).size():
+            # Nothing to replay, so todos are read straight off the snapshot.
+            if space_format == SHARDED_FORMAT:
+                return self._sharded(space).iter_todos(done)
+            return compact.CompactFile(self._compact_filepath(space)).iter_todos(done)
+
+        status = self._status_index(space)
+        stamp = status.stamp()
+        todos = self.load(space)["todos"]
+        try:
+            return status.select(todos, done, stamp)
+        except ValueError:
+            # The space changed while it was read.
+            return iter_by_status(todos, done)
+
+    def stream_todos(self, space: str) -> Iterator[dict]:
+        return self._stream(space, {})
+
+    def existing_ids(self, space: str, todo_ids: list[str]) -> set[str]:
+        if space in self._bulk:
+            # The index is left as it was when the bulk block started.
+            index = IdIndex(self._id_index_filepath(space))
+            return index.find(todo_ids) | (self._bulk[space].keys() & set(todo_ids))
+        return self._id_index(space).find(todo_ids)
+
+    @contextmanager
+    def bulk(self, space: str) -> Iterator[None]:
+        """
+        Holds the lock of `space` and only appends to its log until the block exits.
+
+        Neither the log compaction nor the indexes run for each batch. On exit,
+        the log is folded into the snapshot once, a todo at a time.
+        """
+        with self.lock(space):
+            self._id_index(space)
+            self._status_index(space)
+            self._bulk[space] = {}
+            try:
+                yield
+            finally:
+                added = self._bulk.pop(space)
+                if self._oplog(space).size():
+                    self._rewrite(space, added)
+
+    def resolve(self, space: str, todo_id: str) -> str | None:
+        return self._id_index(space).resolve(todo_id)
+
+    def id_prefix_lengths(self, space: str) -> dict[str, int]:
+        return unique_prefix_lengths(self._id_index(space).ids())
+
+    def status_counts(self, space: str, todo_ids: list[str]) -> tuple[int, int]:
+        return self._status_index(space).counts(todo_ids)
+
+    def space_stamp(self, space: str) -> int | None:
+        return stamp_of(self._sources(space))
+
+    @contextmanager
+    def lock(self, space: str) -> Iterator[None]:
+        with file_lock(self._lock_filepath(space)):
+            # Another process may have rewritten the snapshot while we waited.
+            todo_config.invalidate(self._filepath(space))
+            todo_config.invalidate(self._sharded(space).manifest_filepath)
+            yield
+
+    def compact(self, space: str) -> None:
+        """Folds the operation log of `space` back into its snapshot."""
+        with self.lock(space):
+            if self.space_format(space) != SHARDED_FORMAT:
+                self.save(space, self.load(space))
+                return
+
+            # Only the shards the log touches are rewritten, and what it did
+            # is in the indexes already.
+            log = self._oplog(space)
+            sources = self._snapshot_filepath(space), log.filepath
+            index = IdIndex(self._id_index_filepath(space))
+            status = self._status_index(space, rebuild=False)
+            fresh = [index] if index.is_fresh(*sources) else []
+            if status.is_fresh():
+                fresh.append(status)
+            self._sharded(space).fold(log.records)
+            log.clear()
+            self._check_order(space, status)
+            for i in fresh:
+                if i.filepath.exists():
+                    i.touch()
+
+    def space_size(self, space: str) -> int | None:
+        if self.space_format(space) == SHARDED_FORMAT:
+            return self._sharded(space).size() + self._oplog(space).size()
+        size = 0
+        for filepath in (self._snapshot_filepath(space), self._oplog(space).filepath):
+            try:
+                size += filepath.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def space_format(self, space: str) -> str:
+        # A converted space keeps both snapshots for a moment, and the compact
+        # one is only ever written from the complete document.
+        if self._compact_filepath(space).exists():
+            return COMPACT_FORMAT
+        if self._sharded(space).exists():
+            return SHARDED_FORMAT
+        return JSON_FORMAT
+
+    def convert_space(self, space: str, space_format: str) -> None:
+        if space_format not in SPACE_FORMATS:
+            raise ValueError(
+                f"Unknown space format '{space_format}'. Available formats: {', '.join(SPACE_FORMATS)}"
+            )
+        with self.lock(space):
+            document = self.load(space)
+            self._write_snapshot(space, document, space_format)
+            self._oplog(space).clear()
+            self._build_indexes(space, document.get("todos", []))
+
+    def create_space(self, space: str) -> None:
+        self.save(space, {"todos": []})
+
+    def rename_space(self, old_name: str, new_name: str) -> None:
+        # Files are renamed one by one and only if they are still there, so an
+        # interrupted rename finishes when it runs again.
+        for old, new in (
+            (self._filepath(old_name), self._filepath(new_name)),
+            (self._compact_filepath(old_name), self._compact_filepath(new_name)),
+            (self._oplog(old_name).filepath, self._oplog(new_name).filepath),
+            (self._id_index_filepath(old_name), self._id_index_filepath(new_name)),
+            (
+                self._status_index_filepath(old_name),
+                self._status_index_filepath(new_name),
+            ),
+        ):
+            if old.exists():
+                old.rename(new)
+        # The manifest goes last, as it is what makes the new name a space.
+        old_shards, new_shards = self._sharded(old_name), self._sharded(new_name)
+        for old in old_shards.files():
+            if old.exists():
+                old.rename(new_shards.root / old.name.replace(old_name, new_name, 1))
+        todo_config.invalidate(old_shards.manifest_filepath)
+        # A lock file holds nothing, the new name gets its own on first use.
+        self._lock_filepath(old_name).unlink(missing_ok=True)
+
+    def remove_space(self, space: str) -> None:
+        self._filepath(space).unlink(missing_ok=True)
+        self._compact_filepath(space).unlink(missing_ok=True)
+        self._sharded(space).clear()
+        self._oplog(space).clear()
+        self._id_index_filepath(space).unlink(missing_ok=True)
+        self._status_index_filepath(space).unlink(missing_ok=True)
+        self._lock_filepath(space).unlink(missing_ok=True)
+
+    def has_space(self, space: str) -> bool:
+        return (
+            self._filepath(space).exists()
+            or self._compact_filepath(space).exists()
+            or self._sharded(space).exists()
+        )
+
+    def list_spaces(self) -> list[str]:
+        spaces = [
+            str(ts.stem).split("_")[0]
+            for pattern in ("*_todo.json", "*_todo.tdf", "*_todo.manifest")
+            for ts in self.root.glob(pattern)
+        ]
+        return list(dict.fromkeys(spaces))
+
+    def _stream(self, space: str, meta: dict) -> Iterator[dict]:
+        """Yields the todos of `space` and puts its other document keys in `meta`."""
+        space_format = self.space_format(space)
+        if space_format == COMPACT_FORMAT:
+            snapshot = compact.CompactFile(self._compact_filepath(space))
+            meta.update(snapshot.meta())
+            todos = snapshot.records()
+        elif space_format == SHARDED_FORMAT:
+            manifest = self._sharded(space).manifest()
+            meta.update(manifest["meta"])
+            todos = self._sharded(space).records(manifest)
+        else:
+            todos = todo_config.iter_items(self._filepath(space), "todos", meta)
+
+        log = self._oplog(space)
+        if not log.size():
+            return todos
+        return log.replay_iter(todos)
+
+    def _rewrite(self, space: str, added: dict[str, bool]) -> None:
+        """
+        Folds the operation log of `space` into its snapshot a todo at a time.
+
+        `added` holds the ids and statuses of the todos the log added since the
+        indexes were last written.
+
+        Unlike ``compact``, the space is never loaded as a whole, at the cost of
+        decoding it slower than a single ``json.loads`` call does. A sharded
+        space only rewrites the shards the log touches, as ``compact`` does.
+        """
+        if self.space_format(space) == SHARDED_FORMAT:
+            self._sharded(space).fold(self._oplog(space).records)
+            self._oplog(space).clear()
+            IdIndex(self._id_index_filepath(space)).add(added)
+            status = self._status_index(space, rebuild=False)
+            status.add(added.items())
+            self._check_order(space, status)
+            return
+
+        todo_entries = []
+        meta: dict = {}
+
+        def todos() -> Iterator[dict]:
+            for todo in self._stream(space, meta):
+                todo_entries.append((todo["id"], bool(todo.get("done"))))
+                yield todo
+
+        if self.space_format(space) == COMPACT_FORMAT:
+            compact.write_items(self._compact_filepath(space), todos(), meta)
+        else:
+            todo_config.save_items(self._filepath(space), "todos", todos(), meta)
+        self._oplog(space).clear()
+        IdIndex(self._id_index_filepath(space)).build(
+            todo_id for todo_id, _ in todo_entries
+        )
+        self._status_index(space, rebuild=False).build(todo_entries)
+
+    def _build_indexes(self, space: str, todos: list[dict]) -> None:
+        IdIndex(self._id_index_filepath(space)).build(todo["id"] for todo in todos)
+        self._status_index(space, rebuild=False).build(entries_of(todos))
+
+    def _check_order(self, space: str, status: StatusIndex) -> None:
+        """
+        Drops the status index of a sharded space once it is no longer in id order.
+
+        Folding the log puts the todos it added among the others in id order,
+        so the index of a sharded space only keeps listing them in the order
+        they are stored in while its records are sorted by id. It is rebuilt
+        the next time it is used.
+        """
+        if (
+            self.space_format(space) == SHARDED_FORMAT
+            and status.filepath.exists()
+            and not status.is_sorted()
+        ):
+            status.clear()
+
+    def _append(self, space: str, record: dict) -> None:
+        log = self._oplog(space)
+        size = log.append(record)
+        if log.needs_compaction(size):
+            self.compact(space)
+
+    def _write_snapshot(self, space: str, document: dict, space_format: str) -> None:
+        # Write the new snapshot before dropping the other formats' ones, so the
+        # space can be read at every point of a conversion.
+        if space_format == COMPACT_FORMAT:
+            compact.write(self._compact_filepath(space), document)
+            self._filepath(space).unlink(missing_ok=True)
+            todo_config.invalidate(self._filepath(space))
+            self._sharded(space).clear()
+        elif space_format == SHARDED_FORMAT:
+            self._sharded(space).write(document)
+            self._filepath(space).unlink(missing_ok=True)
+            todo_config.invalidate(self._filepath(space))
+            self._compact_filepath(space).unlink(missing_ok=True)
+        else:
+            todo_config.save(filepath=self._filepath(space), content=document)
+            self._compact_filepath(space).unlink(missing_ok=True)
+            self._sharded(space).clear()
+
+    def _filepath(self, space: str) -> Path:
+        return self.root / f"{space}_todo.json"
+
+    def _compact_filepath(self, space: str) -> Path:
+        return self.root / f"{space}_todo.tdf"
+
+    def _snapshot_filepath(self, space: str) -> Path:
+        space_format = self.space_format(space)
+        if space_format == COMPACT_FORMAT:
+            return self._compact_filepath(space)
+        if space_format == SHARDED_FORMAT:
+            return self._sharded(space).manifest_filepath
+        return self._filepath(space)
+
+    def _sources(self, space: str) -> tuple[Path, Path]:
+        """Returns the files `space` is read from, its snapshot and its log."""
+        return self._snapshot_filepath(space), self._oplog(space).filepath
+
+    def _sharded(self, space: str) -> ShardedSpace:
+        return ShardedSpace(self.root, space)
+
+    def _oplog(self, space: str) -> OpLog:
+        return OpLog(self.root / f"{space}_todo.log")
+
+    def _lock_filepath(self, space: str) -> Path:
+        return self.root / f"{space}_todo.lock"
+
+    def _id_index_filepath(self, space: str) -> Path:
+        return self.root / f"{space}_todo.ids"
+
+    def _status_index_filepath(self, space: str) -> Path:
+        return self.root / f"{space}_todo.status"
+
+    def _status_index(self, space: str, rebuild: bool = True) -> StatusIndex:
+        """Returns the status index of `space`, rebuilding it first if it is stale."""
+        status = StatusIndex(
+            self._status_index_filepath(space), sources=self._sources(space)
+        )
+        if rebuild and not status.is_fresh():
+            with self.lock(space):
+                status.build(entries_of(self.load(space)["todos"]))
+        return status
+
+    def _id_index(self, space: str) -> IdIndex:
+        """Returns the id index of `space`, rebuilding it first if it is stale."""
+        index = IdIndex(self._id_index_filepath(space))
+        if not index.is_fresh(
+            self._snapshot_filepath(space), self._oplog(space).filepath
+        ):
+            index.build(todo["id"] for todo in self.load(space)["todos"])
+        return index
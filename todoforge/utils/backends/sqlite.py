@@ -0,0 +1,257 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from todoforge.utils.backends.base import StorageBackend
+from todoforge.utils.constants import DEFAULT_TODO_FOLDER
+from todoforge.utils.idindex import resolve_prefix, unique_prefix_lengths
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DEFAULT_DATABASE_FILENAME = "todoforge.db"
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spaces (
+    name TEXT PRIMARY KEY,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS todos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    space TEXT NOT NULL
+        REFERENCES spaces (name) ON UPDATE CASCADE ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS todos_space_id ON todos (space, id);
+CREATE INDEX IF NOT EXISTS todos_space_done ON todos (space, done);
+"""
+
+CORE_FIELDS = ("id", "title", "done")
+# Stays well below SQLite's limit on the number of parameters of a statement.
+MAX_PARAMS = 500
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Every space in a single SQLite database in WAL mode, one row per todo.
+
+    `id` and `done` are indexed, so looking up a todo or changing its status is a
+    single-row statement instead of a whole-file rewrite. Fields other than
+    `id`, `title` and `done` are kept as a JSON object in the `extra` column.
+
+    Concurrent writers are serialized by SQLite itself, waiting up to
+    `BUSY_TIMEOUT` seconds for the database lock.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, root: Path = DEFAULT_TODO_FOLDER) -> None:
+        self.root = root
+        self.filepath = root / DEFAULT_DATABASE_FILENAME
+        self._conn: "sqlite3.Connection | None" = None
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+
+            # The toggle menu applies its changes from a background thread
+            # while the main one waits for keys.
+            self._conn = sqlite3.connect(
+                self.filepath, timeout=BUSY_TIMEOUT, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def load(self, space: str) -> dict:
+        meta = self.conn.execute(
+            "SELECT meta FROM spaces WHERE name = ?", (space,)
+        ).fetchone()
+        if meta is None:
+            raise FileNotFoundError(f"Space '{space}' does not exists")
+
+        rows = self.conn.execute(
+            "SELECT id, title, done, extra FROM todos WHERE space = ? ORDER BY seq",
+            (space,),
+        )
+        return {**json.loads(meta[0]), "todos": [_to_todo(row) for row in rows]}
+
+    def load_many(self, spaces: list[str]) -> dict[str, dict]:
+        # The connection is shared by every thread, and every space lives in
+        # the same file anyway, so there is no I/O to overlap.
+        return {space: self.load(space) for space in spaces}
+
+    def iter_todos(self, space: str, done: bool | None = None) -> Iterator[dict]:
+        # Rows come straight off the (space, done) index, so nothing is sorted
+        # in memory and the first rows are available immediately.
+        if done is None:
+            rows = self.conn.execute(
+                "SELECT id, title, done, extra FROM todos WHERE space = ? "
+                "ORDER BY done, seq",
+                (space,),
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT id, title, done, extra FROM todos "
+                "WHERE space = ? AND done = ? ORDER BY seq",
+                (space, done),
+            )
+        for row in rows:
+            yield _to_todo(row)
+
+    def stream_todos(self, space: str) -> Iterator[dict]:
+        rows = self.conn.execute(
+            "SELECT id, title, done, extra FROM todos WHERE space = ? ORDER BY seq",
+            (space,),
+        )
+        for row in rows:
+            yield _to_todo(row)
+
+    def existing_ids(self, space: str, todo_ids: list[str]) -> set[str]:
+        todo_ids = list(dict.fromkeys(todo_ids))
+        found = set()
+        for i in range(0, len(todo_ids), MAX_PARAMS):
+            chunk = todo_ids[i : i + MAX_PARAMS]
+            rows = self.conn.execute(
+                "SELECT id FROM todos "
+                f"WHERE space = ? AND id IN ({', '.join('?' * len(chunk))})",
+                (space, *chunk),
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def id_prefix_lengths(self, space: str) -> dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT id FROM todos WHERE space = ? ORDER BY id", (space,)
+        )
+        return unique_prefix_lengths(row[0] for row in rows)
+
+    def status_counts(self, space: str, todo_ids: list[str]) -> tuple[int, int]:
+        todo_ids = list(dict.fromkeys(todo_ids))
+        open_count = done_count = 0
+        for i in range(0, len(todo_ids), MAX_PARAMS):
+            chunk = todo_ids[i : i + MAX_PARAMS]
+            rows = self.conn.execute(
+                "SELECT done, COUNT(*) FROM todos "
+                f"WHERE space = ? AND id IN ({', '.join('?' * len(chunk))}) "
+                "GROUP BY done",
+                (space, *chunk),
+            )
+            for done, count in rows:
+                if done:
+                    done_count += count
+                else:
+                    open_count += count
+        return open_count, done_count
+
+    def save(self, space: str, document: dict) -> None:
+        meta = {key: value for key, value in document.items() if key != "todos"}
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO spaces (name, meta) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET meta = excluded.meta",
+                (space, json.dumps(meta)),
+            )
+            self.conn.execute("DELETE FROM todos WHERE space = ?", (space,))
+            self._insert(space, document.get("todos", []))
+
+    def add(self, space: str, todos: list[dict]) -> None:
+        with self.conn:
+            self._insert(space, todos)
+
+    def update(self, space: str, todo_ids: list[str], updates: dict) -> None:
+        columns = [f"{field} = ?" for field in ("title", "done") if field in updates]
+        params = [updates[field] for field in ("title", "done") if field in updates]
+
+        extra = {k: v for k, v in updates.items() if k not in CORE_FIELDS}
+        if extra:
+            columns.append("extra = json_patch(coalesce(extra, '{}'), ?)")
+            params.append(json.dumps(extra))
+
+        if not columns:
+            return
+        statement = f"UPDATE todos SET {', '.join(columns)} WHERE space = ? AND id = ?"
+        with self.conn:
+            self.conn.executemany(
+                statement, ((*params, space, todo_id) for todo_id in todo_ids)
+            )
+
+    def remove(self, space: str, todo_ids: list[str]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM todos WHERE space = ? AND id = ?",
+                ((space, todo_id) for todo_id in todo_ids),
+            )
+
+    def create_space(self, space: str) -> None:
+        self.save(space, {"todos": []})
+
+    def rename_space(self, old_name: str, new_name: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE spaces SET name = ? WHERE name = ?", (new_name, old_name)
+            )
+
+    def remove_space(self, space: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM spaces WHERE name = ?", (space,))
+
+    def has_space(self, space: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM spaces WHERE name = ?", (space,))
+        return row.fetchone() is not None
+
+    def list_spaces(self) -> list[str]:
+        rows = self.conn.execute("SELECT name FROM spaces ORDER BY rowid")
+        return [row[0] for row in rows]
+
+    def resolve(self, space: str, todo_id: str) -> str | None:
+        rows = self.conn.execute(
+            "SELECT id FROM todos "
+            "WHERE space = ? AND id >= ? AND id < ? ORDER BY id LIMIT 2",
+            (space, todo_id, _prefix_upper_bound(todo_id)),
+        )
+        return resolve_prefix(todo_id, [row[0] for row in rows])
+
+    def _insert(self, space: str, todos: list[dict]) -> None:
+        self.conn.executemany(
+            "INSERT INTO todos (space, id, title, done, extra) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (space, id) DO UPDATE SET "
+            "title = excluded.title, done = excluded.done, extra = excluded.extra",
+            (_to_row(space, todo) for todo in todos),
+        )
+
+
+def _to_row(space: str, todo: dict) -> tuple:
+    extra = {k: v for k, v in todo.items() if k not in CORE_FIELDS}
+    return (
+        space,
+        todo["id"],
+        todo["title"],
+        bool(todo.get("done", False)),
+        json.dumps(extra) if extra else None,
+    )
+
+
+def _to_todo(row: tuple) -> dict:
+    todo_id, title, done, extra = row
+    todo = {"done": bool(done), "id": todo_id, "title": title}
+    if extra:
+        todo.update(json.loads(extra))
+    return todo
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string that sorts after every string starting with `prefix`."""
+    return prefix + "\U0010ffff"
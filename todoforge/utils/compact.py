@@ -0,0 +1,197 @@
+"""
+Compact binary snapshot format for spaces.
+
+A ``<space>_todo.tdf`` file holds the same document as ``<space>_todo.json``
+without the indentation, laid out so it can be read in place through ``mmap``:
+
+    header | offset table | document keys | records
+
+The header gives the number of todos, how many of them are open and where the
+other sections start. The offset table has one fixed-size ``(offset, length,
+flags)`` entry per todo, in document order, with the done bit in `flags`. The
+records section is the JSON array of todos, each record starting at its
+offset, so a whole space is still decoded in a single ``json.loads`` call while
+a single todo can be decoded on its own.
+
+Listing the first open todos only scans the offset table and decodes the
+records it yields, so ``tdf ls --limit`` touches a few pages of a large space.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from todoforge.utils import profiling
+
+HEADER = struct.Struct("<4sIIIQQQQ")
+ENTRY = struct.Struct("<QIB")
+MAGIC = b"TDFC"
+VERSION = 1
+
+DONE_FLAG = 1
+
+
+def write(filepath: Path, document: dict) -> None:
+    """Writes `document` to `filepath`, replacing it atomically."""
+    write_items(
+        filepath,
+        document.get("todos", []),
+        {key: value for key, value in document.items() if key != "todos"},
+    )
+
+
+def write_items(filepath: Path, todos: Iterable[dict], meta: dict) -> int:
+    """
+    Writes the document made of `todos` and the `meta` keys to `filepath`.
+
+    Records are streamed to a temporary file, since the offset table in front
+    of them needs the number of todos, so only the table is kept in memory.
+    `meta` is read once every todo was consumed. Returns the number of todos.
+    """
+    tmp_filepath = filepath.with_name(
+        f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    body_filepath = tmp_filepath.with_suffix(".body")
+    # Offsets are relative to the records section until its start is known.
+    offsets = array("Q")
+    lengths = array("I")
+    flags = bytearray()
+    try:
+        with profiling.phase("write compact"):
+            with open(body_filepath, "w+b") as body:
+                body.write(b"[")
+                for todo in todos:
+                    record = json.dumps(
+                        todo, separators=(",", ":"), sort_keys=True
+                    ).encode("utf-8")
+                    if offsets:
+                        body.write(b",")
+                    offsets.append(body.tell())
+                    lengths.append(len(record))
+                    flags.append(DONE_FLAG if todo.get("done") else 0)
+                    body.write(record)
+                body.write(b"]")
+                body_length = body.tell()
+
+                encoded_meta = json.dumps(
+                    meta, separators=(",", ":"), sort_keys=True
+                ).encode("utf-8")
+                count = len(offsets)
+                meta_offset = HEADER.size + ENTRY.size * count
+                records_offset = meta_offset + len(encoded_meta)
+                header = HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    count,
+                    flags.count(0),
+                    meta_offset,
+                    len(encoded_meta),
+                    records_offset,
+                    body_length,
+                )
+
+                body.seek(0)
+                with open(tmp_filepath, "wb") as f:
+                    f.write(header)
+                    f.write(
+                        b"".join(
+                            ENTRY.pack(records_offset + offset, length, flag)
+                            for offset, length, flag in zip(offsets, lengths, flags)
+                        )
+                    )
+                    f.write(encoded_meta)
+                    shutil.copyfileobj(body, f)
+                    f.flush()
+                    profiling.count_written(f.tell())
+                    os.fsync(f.fileno())
+        os.replace(tmp_filepath, filepath)
+    except BaseException:
+        tmp_filepath.unlink(missing_ok=True)
+        raise
+    finally:
+        body_filepath.unlink(missing_ok=True)
+    return count
+
+
+class CompactFile:
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def load(self) -> dict:
+        """Returns the whole document."""
+        with profiling.phase("read compact"):
+            with open(self.filepath, "rb") as f:
+                data = f.read()
+            profiling.count_read(len(data))
+            header = self._header(data)
+            _, _, _, _, meta_offset, meta_length, records_offset, records_length = (
+                header
+            )
+            return {
+                **json.loads(data[meta_offset : meta_offset + meta_length]),
+                "todos": json.loads(
+                    data[records_offset : records_offset + records_length]
+                ),
+            }
+
+    def meta(self) -> dict:
+        """Returns the document keys other than ``todos``."""
+        with open(self.filepath, "rb") as f:
+            header = self._header(f.read(HEADER.size))
+            _, _, _, _, meta_offset, meta_length, _, _ = header
+            f.seek(meta_offset)
+            return json.loads(f.read(meta_length))
+
+    def records(self) -> Iterator[dict]:
+        """Yields the todos in document order, decoding one record at a time."""
+        with open(self.filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self._header(b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _, _, count, *_ = self._header(mm[: HEADER.size])
+                for i in range(count):
+                    start = HEADER.size + i * ENTRY.size
+                    offset, length, _ = ENTRY.unpack(mm[start : start + ENTRY.size])
+                    yield json.loads(mm[offset : offset + length])
+
+    def iter_todos(self, done: bool | None = None) -> Iterator[dict]:
+        """
+        Yields the todos open ones first, each group in document order.
+
+        Pass `done` to only yield open (False) or completed (True) todos. Records
+        are decoded one at a time as they are yielded.
+        """
+        with open(self.filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self._header(b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _, _, count, open_count, *_ = self._header(mm[: HEADER.size])
+                for status in (False, True) if done is None else (done,):
+                    remaining = count - open_count if status else open_count
+                    i = 0
+                    # Stop scanning once every todo with `status` was yielded.
+                    while remaining:
+                        start = HEADER.size + i * ENTRY.size
+                        offset, length, flags = ENTRY.unpack(
+                            mm[start : start + ENTRY.size]
+                        )
+                        i += 1
+                        if bool(flags & DONE_FLAG) == status:
+                            remaining -= 1
+                            yield json.loads(mm[offset : offset + length])
+
+    def _header(self, data: bytes) -> tuple:
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ValueError(f"'{self.filepath}' is not a compact todoforge file")
+        header = HEADER.unpack_from(data)
+        if header[1] != VERSION:
+            raise ValueError(
+                f"'{self.filepath}' has unsupported compact format version {header[1]}"
+            )
+        return header
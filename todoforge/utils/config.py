@@ -1,15 +1,61 @@
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TextIO
 
+from todoforge.utils import profiling
 from todoforge.utils.constants import (
     DEFAULT_TODO_CONFIG,
 )
+from todoforge.utils.locking import file_lock
+
+DEFAULT_CACHE_MAX_ENTRIES = 64
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+
+
+class _CacheEntry(NamedTuple):
+    stamp: tuple[int, int, int]
+    content: dict[Any, Any]
 
 
 class TodoConfig:
-    def __init__(self) -> None:
-        self._cached_config: dict[str, dict[Any, Any]] = {}
+    """
+    Reads and writes the JSON files of todoforge through an in-memory cache.
+
+    A cached file is only served while its ``(st_ino, st_mtime_ns, st_size)``
+    is unchanged, so writes from other processes are picked up on the next
+    read. The least recently used files are evicted once the cache holds more
+    than `max_entries` files or `max_bytes` bytes of them (counted on disk).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cached_config: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._cached_bytes = 0
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
 
     def get_space_config(self) -> dict:
         return self._load_config(DEFAULT_TODO_CONFIG)
@@ -35,27 +81,166 @@ class TodoConfig:
 
     def save(self, filepath: Path, content: dict) -> None:
         self._write_to_file(filepath=filepath, content=content)
-        self._cached_config[str(filepath)] = content
+        self._cache(str(filepath), _stamp(filepath), content)
+
+    def update(self, filepath: Path, change: Callable[[dict], dict]) -> dict:
+        """
+        Saves what `change` returns for the content of `filepath`, and returns it.
+
+        Every read-modify-write of config.json goes through here, holding the
+        ``.lock`` file next to it, so commands running at the same time never
+        write back a config that misses the other's change. A missing file
+        reads as empty.
+        """
+        with file_lock(filepath.with_suffix(".lock")):
+            self.invalidate(filepath)
+            try:
+                content = self.get(filepath)
+            except FileNotFoundError:
+                content = {}
+            content = change(content)
+            self.save(filepath=filepath, content=content)
+        return content
+
+    def iter_items(
+        self, filepath: Path, key: str, rest: dict | None = None
+    ) -> Iterator[Any]:
+        """
+        Yields the items of the `key` list of the JSON object in `filepath`.
+
+        The file is parsed a chunk at a time and items are decoded one by one,
+        so memory stays flat however long the list is. Nothing is cached. The
+        other keys of the object are put in `rest` as they are parsed.
+        """
+        if not filepath.exists():
+            raise FileNotFoundError(f"Configuration file '{filepath}' does not exists")
+
+        with open(filepath, "r", encoding="utf-8") as f:
+            reader = _JsonReader(f)
+            try:
+                yield from reader.iter_items(key, {} if rest is None else rest)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse JSON from '{filepath}': {e}")
+
+    def save_items(
+        self,
+        filepath: Path,
+        key: str,
+        items: Iterable[Any],
+        content: dict | None = None,
+    ) -> int:
+        """
+        Writes a JSON object whose `key` list holds `items`, one item at a time.
+
+        `key` comes first and the other keys of `content` after it, so `content`
+        is only read once every item was written and may be filled while `items`
+        is consumed. Returns the number of items written.
+        """
+        count = 0
+
+        def write(f: TextIO) -> None:
+            nonlocal count
+            f.write(f"{{\n    {json.dumps(key)}: [")
+            for item in items:
+                dumped = json.dumps(item, sort_keys=True, indent=4)
+                f.write(("," if count else "") + "\n        ")
+                f.write(dumped.replace("\n", "\n        "))
+                count += 1
+            f.write("\n    ]" if count else "]")
+            for name, value in sorted((content or {}).items()):
+                if name != key:
+                    dumped = json.dumps(value, sort_keys=True, indent=4)
+                    f.write(f",\n    {json.dumps(name)}: ")
+                    f.write(dumped.replace("\n", "\n    "))
+            f.write("\n}")
+
+        self._write_atomically(filepath, write)
+        self.invalidate(filepath)
+        return count
+
+    def invalidate(self, filepath: Path) -> None:
+        """Drops the cached content of `filepath` so the next read hits the disk."""
+        with self._cache_lock:
+            self._evict(str(filepath))
+
+    def cache_info(self) -> CacheInfo:
+        with self._cache_lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._cached_config),
+                bytes=self._cached_bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cached_config.clear()
+            self._cached_bytes = 0
 
     def _load_config(self, filepath: Path) -> dict[Any, Any]:
         filepath_str = str(filepath)
-        if filepath_str not in self._cached_config:
-            self._cached_config[filepath_str] = self._read_from_file(filepath)
-        return self._cached_config.get(filepath_str, {})
+        # Stamp before reading: if the file changes while it is being read, the
+        # stamp is already stale and the next load reads it again.
+        stamp = _stamp(filepath)
+        with self._cache_lock:
+            entry = self._cached_config.get(filepath_str)
+            if entry is not None and stamp is not None and entry.stamp == stamp:
+                self._cached_config.move_to_end(filepath_str)
+                self._hits += 1
+                return entry.content
+            self._misses += 1
+
+        content = self._read_from_file(filepath)
+        self._cache(filepath_str, stamp, content)
+        return content
+
+    def _cache(
+        self, filepath_str: str, stamp: tuple[int, int, int] | None, content: dict
+    ) -> None:
+        with self._cache_lock:
+            self._evict(filepath_str)
+            if stamp is None or stamp[2] > self.max_bytes:
+                return
+
+            self._cached_config[filepath_str] = _CacheEntry(stamp, content)
+            self._cached_bytes += stamp[2]
+            while self._cached_config and (
+                len(self._cached_config) > self.max_entries
+                or self._cached_bytes > self.max_bytes
+            ):
+                self._evict(next(iter(self._cached_config)))
+                self._evictions += 1
+
+    def _evict(self, filepath_str: str) -> None:
+        entry = self._cached_config.pop(filepath_str, None)
+        if entry is not None:
+            self._cached_bytes -= entry.stamp[2]
 
     def _read_from_file(self, filepath: Path) -> dict:
         if not filepath.exists():
             raise FileNotFoundError(f"Configuration file '{filepath}' does not exists")
 
         try:
-            with open(filepath, "r") as f:
-                return json.load(f)
+            with profiling.phase("read json"), open(filepath, "r") as f:
+                data = f.read()
+                profiling.count_read(len(data))
+                return json.loads(data)
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse JSON from '{filepath}': {e}")
 
     def _write_to_file(self, filepath: Path, content: dict) -> None:
-        with open(filepath, "w") as f:
-            json.dump(content, f, sort_keys=True, indent=4)
+        self._write_atomically(
+            filepath, lambda f: json.dump(content, f, sort_keys=True, indent=4)
+        )
+
+    def _write_atomically(
+        self, filepath: Path, write: Callable[[TextIO], None]
+    ) -> None:
+        with profiling.phase("write json"):
+            write_atomically(filepath, write)
 
     def _get_value_from_config(
         self, field: str, expected_type: Any = None
@@ -71,4 +256,127 @@ class TodoConfig:
         return value
 
 
+class _JsonReader:
+    """Decodes the values of a JSON object from a file, refilling a buffer as it goes."""
+
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def iter_items(self, key: str, rest: dict) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            name = self._value()
+            self._expect(":")
+            if name == key:
+                self._expect("[")
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._peek() != ",":
+                            break
+                        self.pos += 1
+                    self._expect("]")
+            else:
+                rest[name] = self._value()
+
+            if self._peek() != ",":
+                break
+            self.pos += 1
+        self._expect("}")
+
+    def _fill(self) -> bool:
+        # Read at least as much as is buffered, so a value spanning many chunks
+        # is decoded a logarithmic number of times rather than once per chunk.
+        chunk = self.f.read(max(READ_CHUNK_SIZE, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        profiling.count_read(len(chunk))
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skips whitespace and returns the next character."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise json.JSONDecodeError(
+                    "Unexpected end of document", self.buffer, self.pos
+                )
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value goes on in the next chunk.
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may not be complete yet.
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def write_atomically(filepath: Path, write: Callable[[TextIO], None]) -> None:
+    """
+    Replaces `filepath` with what `write` writes to the file it is passed.
+
+    It writes to a temporary file in the same folder, which is then renamed
+    over `filepath`, so a crash never leaves a truncated file behind, and the
+    folder is synced so the rename itself survives one.
+    """
+    tmp_filepath = filepath.with_name(
+        f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(tmp_filepath, "w") as f:
+            write(f)
+            f.flush()
+            profiling.count_written(f.tell())
+            os.fsync(f.fileno())
+        os.replace(tmp_filepath, filepath)
+    except BaseException:
+        tmp_filepath.unlink(missing_ok=True)
+        raise
+    _fsync_folder(filepath.parent)
+
+
+def _fsync_folder(dirpath: Path) -> None:
+    if not hasattr(os, "O_DIRECTORY"):  # pragma: no cover - Windows
+        return
+    fd = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _stamp(filepath: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
 todo_config = TodoConfig()
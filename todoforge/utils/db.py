@@ -1,16 +1,159 @@
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from todoforge.utils import registry
+from todoforge.utils.archive import Archive
+from todoforge.utils.backends import get_backend
 from todoforge.utils.config import todo_config
-from todoforge.utils.constants import (
-    DEFAULT_TODO_FOLDER,
-)
+
+if TYPE_CHECKING:
+    from todoforge.utils.search import SearchIndex, Term
 
 
 def get_todos() -> dict:
     curr_space = todo_config.get_current_space()
-    todo_filename = f"{curr_space}_todo.json"
-    return todo_config.get(filepath=DEFAULT_TODO_FOLDER / todo_filename)
+    return get_backend().load(curr_space)
+
+
+def iter_todos(done: bool | None = None) -> Iterator[dict]:
+    """Yields the todos of the current space, open ones first."""
+    curr_space = todo_config.get_current_space()
+    return get_backend().iter_todos(curr_space, done=done)
+
+
+def stream_todos(space: str | None = None) -> Iterator[dict]:
+    """
+    Yields the todos of `space`, the current space by default, in insertion order.
+
+    The space is locked while it is read, and read a todo at a time where the
+    backend allows it.
+    """
+    space = space or todo_config.get_current_space()
+    backend = get_backend()
+    with backend.lock(space):
+        yield from backend.stream_todos(space)
+
+
+def iter_archived_todos(space: str | None = None) -> Iterator[dict]:
+    """Yields the archived todos of `space`, the current space by default, as they are read."""
+    space = space or todo_config.get_current_space()
+    backend = get_backend()
+    return Archive(backend.root, space).iter_todos(
+        live=lambda todo_ids: backend.existing_ids(space, todo_ids)
+    )
+
+
+def load_spaces(spaces: list[str] | None = None) -> dict[str, dict]:
+    """Loads `spaces`, every space by default, concurrently and keyed by name."""
+    if spaces is None:
+        spaces = todo_config.get_spaces_list()
+    return get_backend().load_many(spaces)
+
+
+def id_prefix_lengths() -> dict[str, int]:
+    """Returns the length of the shortest unique prefix of each id in the space."""
+    return get_backend().id_prefix_lengths(todo_config.get_current_space())
 
 
 def save_todos(todos: dict) -> None:
     curr_space = todo_config.get_current_space()
-    todo_filename = f"{curr_space}_todo.json"
-    todo_config.save(filepath=DEFAULT_TODO_FOLDER / todo_filename, content=todos)
+    backend = get_backend()
+    backend.save(curr_space, todos)
+    registry.record_document(backend, curr_space, todos)
+
+    index = _search_index(backend.root, curr_space)
+    if index.exists():
+        index.build(todos["todos"], backend.space_stamp(curr_space))
+
+
+def resolve_todo_id(todo_id: str) -> str | None:
+    """
+    Returns the full id of the todo in the current space starting with `todo_id`.
+
+    Raises:
+        AmbiguousIdError: If more than one todo id starts with `todo_id`.
+    """
+    return get_backend().resolve(todo_config.get_current_space(), todo_id)
+
+
+def add_todos(todos: list[dict], space: str | None = None) -> None:
+    """Adds new todos to `space`, the current space by default, without rewriting it."""
+    curr_space = space or todo_config.get_current_space()
+    backend = get_backend()
+    backend.add(curr_space, todos)
+    registry.record_change(
+        backend,
+        curr_space,
+        todos=len(todos),
+        open_todos=sum(1 for todo in todos if not todo.get("done")),
+    )
+    _search_index(backend.root, curr_space).add(todos, backend.space_stamp(curr_space))
+
+
+def update_todos(todo_ids: list[str], updates: dict, space: str | None = None) -> None:
+    """Applies the same field updates to every todo in `todo_ids` of `space`, the current space by default."""
+    curr_space = space or todo_config.get_current_space()
+    backend = get_backend()
+    if "done" in updates:
+        # Only todos whose status flips change the open count.
+        open_count, done_count = backend.status_counts(curr_space, todo_ids)
+    backend.update(curr_space, todo_ids, updates)
+    if "done" in updates:
+        registry.record_change(
+            backend,
+            curr_space,
+            open_todos=-open_count if updates["done"] else done_count,
+        )
+    index, stamp = _search_index(backend.root, curr_space), backend.space_stamp(
+        curr_space
+    )
+    if "title" in updates:
+        index.update_title(todo_ids, updates["title"], stamp)
+    else:
+        index.touch(stamp)
+
+
+def remove_todos(todo_ids: list[str], space: str | None = None) -> None:
+    """Removes every todo in `todo_ids` from `space`, the current space by default."""
+    curr_space = space or todo_config.get_current_space()
+    backend = get_backend()
+    open_count, done_count = backend.status_counts(curr_space, todo_ids)
+    backend.remove(curr_space, todo_ids)
+    registry.record_change(
+        backend,
+        curr_space,
+        todos=-(open_count + done_count),
+        open_todos=-open_count,
+    )
+    _search_index(backend.root, curr_space).remove(
+        todo_ids, backend.space_stamp(curr_space)
+    )
+
+
+def search_todos(terms: list["Term"], space: str) -> list[dict]:
+    """Returns the ``{"id", "title"}`` of every todo in `space` matching all `terms`."""
+    backend = get_backend()
+    index = _search_index(backend.root, space)
+    if not index.is_fresh(backend.space_stamp(space)):
+        with backend.lock(space):
+            stamp = backend.space_stamp(space)
+            if not index.is_fresh(stamp):
+                index.build(backend.load(space)["todos"], stamp)
+    return index.search(terms)
+
+
+def short_todo_id(todo_id: str, space: str) -> str:
+    """Returns the shortest prefix of `todo_id` that still resolves to it in `space`."""
+    return get_backend().short_id(space, todo_id)
+
+
+def space_lock() -> AbstractContextManager:
+    """Keeps other processes from changing the current space inside the block."""
+    return get_backend().lock(todo_config.get_current_space())
+
+
+def _search_index(root: Path, space: str) -> "SearchIndex":
+    from todoforge.utils.search import SearchIndex
+
+    return SearchIndex(root, space)
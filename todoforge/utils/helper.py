@@ -1,23 +1,158 @@
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable
+
 from rich import print
 
+from todoforge.utils import archive, journal, registry, toggles
+from todoforge.utils.backends import copy_space, get_backend
 from todoforge.utils.config import todo_config
 from todoforge.utils.constants import (
     DEFAULT_TODO_CONFIG,
     DEFAULT_TODO_FOLDER,
 )
-from todoforge.utils.db import get_todos
+from todoforge.utils.db import (
+    add_todos,
+    get_todos,
+    remove_todos,
+    resolve_todo_id,
+    space_lock,
+    update_todos,
+)
+from todoforge.utils.idindex import AmbiguousIdError
+from todoforge.utils.selectors import TodoSelector, parse_duration
 
 
 def init_folders():
-    if not DEFAULT_TODO_FOLDER.exists():
-        DEFAULT_TODO_FOLDER.mkdir(parents=True, exist_ok=True)
-        spaces_object = {"current_space": "", "spaces": []}
-        todo_config.save(filepath=DEFAULT_TODO_CONFIG, content=spaces_object)
+    # This runs before every command, so the common case is three syscalls.
+    if DEFAULT_TODO_CONFIG.exists():
+        # Finish a space rename or remove that was cut short by a crash, and
+        # apply the toggles of a menu session that never got to.
+        journal.recover()
+        toggles.recover()
+        return
+
+    DEFAULT_TODO_FOLDER.mkdir(parents=True, exist_ok=True)
+    # Another command may have created the config in the meantime.
+    todo_config.update(
+        DEFAULT_TODO_CONFIG,
+        lambda config: {"current_space": "", "spaces": [], **config},
+    )
+
+
+BULK_BATCH_SIZE = 1000
+
+
+def add_todos_from_lines(
+    lines: Iterable[str], done: bool = False, batch_size: int = BULK_BATCH_SIZE
+) -> int:
+    """
+    Adds one todo per non-blank line of `lines` in a single write.
+
+    Lines are streamed and validated `batch_size` at a time, and every todo is
+    committed to the current space at once at the end. Returns the number of
+    todos added.
+    """
+    from todoforge.utils.models import TodoModel, validate_todos
+
+    created_at = datetime.now(timezone.utc).isoformat()
+    todos: list[dict] = []
+    batch: list[dict] = []
+    for line in lines:
+        title = line.rstrip("\r\n")
+        if not title.strip():
+            continue
+
+        batch.append(
+            {
+                "id": TodoModel.generate_id(),
+                "title": title,
+                "done": done,
+                "created_at": created_at,
+            }
+        )
+        if len(batch) >= batch_size:
+            todos.extend(validate_todos(batch))
+            batch = []
+    todos.extend(validate_todos(batch))
+
+    if todos:
+        add_todos(todos=todos)
+    return len(todos)
+
+
+IMPORT_BATCH_SIZE = 10_000
+
+
+def import_todos(
+    records: Iterable[dict], space: str, batch_size: int = IMPORT_BATCH_SIZE
+) -> tuple[int, int]:
+    """
+    Adds the todos of `records` to `space`, `batch_size` at a time.
+
+    Records are streamed, every batch is validated against ``TodoModel`` in one
+    call and committed with a single write, so memory depends on `batch_size`
+    and not on how many records there are. Records without an id get a new
+    one. A record whose id is already in the space, or earlier in the batch,
+    is skipped.
+
+    Returns:
+        tuple: How many todos were imported, and how many were skipped.
+
+    Raises:
+        ValueError: If a record is not a valid todo. The batches before the one
+            holding it stay imported.
+    """
+    from pydantic import ValidationError
+
+    from todoforge.utils.models import TodoModel, validate_todos
+
+    backend = get_backend()
+    records = iter(records)
+    imported = skipped = number = 0
+    with backend.bulk(space):
+        while batch := list(islice(records, batch_size)):
+            for record in batch:
+                if not record.get("id"):
+                    record["id"] = TodoModel.generate_id()
+            try:
+                todos = validate_todos(batch)
+            except ValidationError as e:
+                error = e.errors()[0]
+                index, *loc = error["loc"]
+                reason = " ".join([*(str(part) for part in loc), error["msg"].lower()])
+                raise ValueError(
+                    f"Record {number + int(index) + 1} is not a valid todo: {reason}"
+                )
+            number += len(batch)
+
+            unique: dict[str, dict] = {}
+            for todo in todos:
+                unique.setdefault(todo["id"], todo)
+            existing = backend.existing_ids(space, list(unique))
+            new_todos = [todo for i, todo in unique.items() if i not in existing]
+
+            skipped += len(todos) - len(new_todos)
+            if new_todos:
+                add_todos(todos=new_todos, space=space)
+                imported += len(new_todos)
+    return imported, skipped
 
 
 def update_todo_status(todo_id: str, status: bool) -> None:
+    update_todos_status(todo_ids=[todo_id], status=status)
+
+
+def update_todos_status(
+    todo_ids: list[str], status: bool, selector: TodoSelector | None = None
+) -> None:
+    """Marks the given todos, plus every todo matching `selector`, done or undone."""
     updates = {"done": status}
-    _update_todo(todo_id=todo_id, updates=updates)
+    _update_todos(todo_ids=todo_ids, updates=updates, selector=selector)
+    if status:
+        count = auto_archive()
+        if count:
+            print(f"Archived {count} completed todos.")
 
 
 def edit_task_title_from_todo(todo_id: str, edited_title: str) -> None:
@@ -28,43 +163,203 @@ def edit_task_title_from_todo(todo_id: str, edited_title: str) -> None:
 
 def remove_task_from_todo(todo_id: str) -> None:
     """Removes a task from given todo id."""
+    remove_tasks_from_todo(todo_ids=[todo_id])
+
 
-    todos = get_todos()
-    current_space = todo_config.get_current_space()
-    todo_filename = f"{current_space}_todo.json"
+def remove_tasks_from_todo(
+    todo_ids: list[str], selector: TodoSelector | None = None
+) -> None:
+    """Removes the given todos, plus every todo matching `selector`, in one write."""
 
-    filtered_todos = [todo for todo in todos["todos"] if todo_id not in todo["id"]]
+    with space_lock():
+        try:
+            matched_ids, missing_ids = _select_todo_ids(todo_ids, selector)
+        except AmbiguousIdError as e:
+            print(f"[red]{e}[/red]")
+            return
 
-    # Check if anything was removed
-    if len(filtered_todos) == len(todos["todos"]):
-        print(f"Id '[green]{todo_id}[/green]' not found.")
+        if missing_ids:
+            print(f"Id '[green]{', '.join(missing_ids)}[/green]' not found.")
+            return
+        if not matched_ids:
+            print("No todos matched the given filters.")
+            return
+        remove_todos(todo_ids=matched_ids)
+
+    if _is_single_id(todo_ids, selector):
+        print(f"Todo with id '[green]{todo_ids[0]}[/green]' has been removed.")
     else:
-        todos["todos"] = filtered_todos
-        todo_config.save(filepath=DEFAULT_TODO_FOLDER / todo_filename, content=todos)
-        print(f"Todo with id '[green]{todo_id}[/green]' has been removed.")
+        print(f"{len(matched_ids)} todos have been removed.")
+
+
+def archive_todos(
+    space: str, older_than: timedelta | None = None, keep: int | None = None
+) -> int:
+    """
+    Moves the completed todos of `space` that ``archive.select_todos`` picks
+    into the archive of the space, and returns how many were moved.
+    """
+    backend = get_backend()
+    space_archive = archive.Archive(backend.root, space)
+    with backend.lock(space):
+        # Finishes a run that a crash cut short between the append and the removal.
+        pending_ids = space_archive.recover()
+        if pending_ids:
+            remove_todos(todo_ids=pending_ids, space=space)
+            backend.sync(space)
+        space_archive.commit()
+
+        todos = archive.select_todos(
+            list(backend.iter_todos(space, done=True)), older_than, keep
+        )
+        if todos:
+            space_archive.append(todos)
+            remove_todos(todo_ids=[todo["id"] for todo in todos], space=space)
+            # The marker may only go once the removal is on disk, which the
+            # daemon's buffered backend otherwise leaves for later.
+            backend.sync(space)
+            space_archive.commit()
+        space_archive.touch()
+    return len(todos)
+
+
+AUTO_ARCHIVE_SLACK = 100
+AUTO_ARCHIVE_INTERVAL = timedelta(days=1)
+
 
+def auto_archive(space: str | None = None) -> int:
+    """
+    Applies the archive policy of config.json to `space`, the current space by default.
 
-def handle_toggle_space_key(todos, idx):
+    The `keep` rule only runs once the registry counts `AUTO_ARCHIVE_SLACK`
+    completed todos more than it keeps, and the `older_than` rule at most once
+    per `AUTO_ARCHIVE_INTERVAL`, so most calls read nothing but the config.
+    Returns how many todos were archived.
+    """
+    try:
+        policy = todo_config.get(DEFAULT_TODO_CONFIG).get(archive.POLICY_KEY)
+    except FileNotFoundError:
+        return 0
+    if not policy:
+        return 0
+
+    space = space or todo_config.get_current_space()
+    backend = get_backend()
+    keep, older_than = policy.get("keep"), policy.get("older_than")
+    due = False
+    if keep is not None:
+        entry = registry.get_stats(backend, [space]).get(space)
+        due = (
+            entry is None or entry["todos"] - entry["open"] > keep + AUTO_ARCHIVE_SLACK
+        )
+    if older_than is not None and not due:
+        checked_at = archive.Archive(backend.root, space).checked_at()
+        now = datetime.now(timezone.utc)
+        due = checked_at is None or now - checked_at > AUTO_ARCHIVE_INTERVAL
+    if not due:
+        return 0
+
+    return archive_todos(
+        space, older_than=parse_duration(older_than) if older_than else None, keep=keep
+    )
+
+
+def handle_toggle_space_key(
+    todos, idx, toggle_journal: "toggles.ToggleJournal | None" = None
+):
     item_to_toggle = todos[idx]
     todos[idx]["done"] = not item_to_toggle["done"]
+    if toggle_journal is not None:
+        toggle_journal.append(item_to_toggle["id"], todos[idx]["done"])
     return todos
 
 
 def _update_todo(todo_id: str, updates: dict) -> None:
-    current_space = todo_config.get_current_space()
-    todo_filename = f"{current_space}_todo.json"
+    _update_todos(todo_ids=[todo_id], updates=updates)
 
-    todos = get_todos()
 
-    is_updated = False
-    for todo in todos["todos"]:
-        if todo["id"].startswith(todo_id):
-            todo.update(updates)
-            is_updated = True
-            break
+def _update_todos(
+    todo_ids: list[str], updates: dict, selector: TodoSelector | None = None
+) -> None:
+    with space_lock():
+        try:
+            matched_ids, missing_ids = _select_todo_ids(todo_ids, selector)
+        except AmbiguousIdError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        if missing_ids:
+            print(
+                "Cannot find todo in todos list. Please check your todo id once."
+                if len(todo_ids) == 1
+                else f"Cannot find todos '[green]{', '.join(missing_ids)}[/green]' in todos list. Please check your todo ids once."
+            )
+            return
+        if not matched_ids:
+            print("No todos matched the given filters.")
+            return
+        update_todos(todo_ids=matched_ids, updates=updates)
+
+    if _is_single_id(todo_ids, selector):
+        print("Todo task updated successfully.")
+    else:
+        print(f"{len(matched_ids)} todos updated successfully.")
 
-    if not is_updated:
-        print("Cannot find todo in todos list. Please check your todo id once.")
+
+def _select_todo_ids(
+    todo_ids: list[str], selector: TodoSelector | None
+) -> tuple[list[str], list[str]]:
+    """
+    Resolves `todo_ids` and collects every todo matching `selector` in one pass.
+
+    Returns:
+        tuple: The selected full ids, and the given ids that matched no todo.
+
+    Raises:
+        AmbiguousIdError: If one of `todo_ids` matches more than one todo.
+    """
+    selected: dict[str, None] = {}
+    missing_ids = []
+    for todo_id in todo_ids:
+        matched_id = resolve_todo_id(todo_id=todo_id)
+        if matched_id is None:
+            missing_ids.append(todo_id)
+        else:
+            selected[matched_id] = None
+
+    if selector is not None and not selector.is_empty():
+        now = datetime.now(timezone.utc)
+        for todo in get_todos()["todos"]:
+            if selector.matches(todo, now=now):
+                selected[todo["id"]] = None
+
+    return list(selected), missing_ids
+
+
+def _is_single_id(todo_ids: list[str], selector: TodoSelector | None) -> bool:
+    return len(todo_ids) == 1 and (selector is None or selector.is_empty())
+
+
+def migrate_spaces(backend_name: str) -> None:
+    """Moves every space into the storage backend called `backend_name`."""
+
+    source = get_backend()
+    target = get_backend(backend_name)
+    if source is target:
+        print(f"Spaces are already stored in '[green]{target.name}[/green]'.")
         return
-    todo_config.save(filepath=DEFAULT_TODO_FOLDER / todo_filename, content=todos)
-    print("Todo task updated successfully.")
+
+    spaces = [s for s in todo_config.get_spaces_list() if source.has_space(s)]
+    for space in spaces:
+        count = copy_space(source=source, target=target, space=space)
+        registry.refresh_size(target, space)
+        print(f"Moved {count} todos of space '[green]{space}[/green]'.")
+
+    todo_config.update(
+        DEFAULT_TODO_CONFIG, lambda config: {**config, "backend": target.name}
+    )
+
+    # Only drop the old copies once the config points at the new backend.
+    for space in spaces:
+        source.remove_space(space)
+    print(f"Spaces are now stored in '[green]{target.name}[/green]'.")
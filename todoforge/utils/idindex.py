@@ -0,0 +1,205 @@
+"""
+Sorted todo id index.
+
+The index is a file of fixed-width, sorted ids that is binary searched in place
+through ``mmap``, so resolving a partial id reads O(log N) records instead of
+loading the whole space.
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable
+
+HEADER = struct.Struct("<4sIQ")
+MAGIC = b"TDFI"
+
+MIN_PREFIX_LENGTH = 4
+
+
+class AmbiguousIdError(ValueError):
+    def __init__(self, todo_id: str, matches: list[str]) -> None:
+        self.todo_id = todo_id
+        self.matches = matches
+        super().__init__(
+            f"Id '{todo_id}' is ambiguous, it matches {', '.join(matches)}. "
+            "Please use a longer id."
+        )
+
+
+class IdIndex:
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def build(self, ids: Iterable[str]) -> None:
+        """Replaces the index with `ids`."""
+        sorted_ids = sorted(set(ids))
+        width = max((len(todo_id) for todo_id in sorted_ids), default=0)
+
+        records = b"".join(
+            todo_id.encode("ascii").ljust(width, b"\0") for todo_id in sorted_ids
+        )
+        tmp_filepath = self.filepath.with_name(self.filepath.name + ".tmp")
+        with open(tmp_filepath, "wb") as f:
+            f.write(HEADER.pack(MAGIC, width, len(sorted_ids)))
+            f.write(records)
+        os.replace(tmp_filepath, self.filepath)
+
+    def ids(self) -> list[str]:
+        with open(self.filepath, "rb") as f:
+            _, width, count = HEADER.unpack(f.read(HEADER.size))
+            data = f.read(width * count)
+        if count == 0:
+            return []
+        return [
+            data[i : i + width].rstrip(b"\0").decode("ascii")
+            for i in range(0, width * count, width)
+        ]
+
+    def add(self, ids: Iterable[str]) -> None:
+        new_ids = sorted(set(ids))
+        if not self._append(new_ids):
+            self.build([*self.ids(), *new_ids])
+
+    def _append(self, new_ids: list[str]) -> bool:
+        """
+        Appends `new_ids` in place when they all sort after the indexed ids.
+
+        Time-ordered ids always do, so adding todos costs O(added) instead of a
+        rewrite. Records are written before the header that counts them, so a
+        crash in between leaves the previous index intact.
+        """
+        try:
+            f = open(self.filepath, "r+b")
+        except FileNotFoundError:
+            return False
+        with f:
+            _, width, count = HEADER.unpack(f.read(HEADER.size))
+            if count == 0 or any(len(todo_id) > width for todo_id in new_ids):
+                return False
+            if new_ids:
+                f.seek(HEADER.size + (count - 1) * width)
+                last_id = f.read(width).rstrip(b"\0").decode("ascii")
+                if new_ids[0] <= last_id:
+                    return False
+
+                f.write(
+                    b"".join(
+                        todo_id.encode("ascii").ljust(width, b"\0")
+                        for todo_id in new_ids
+                    )
+                )
+                f.truncate()
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, width, count + len(new_ids)))
+        return True
+
+    def remove(self, ids: Iterable[str]) -> None:
+        self.build(set(self.ids()).difference(ids))
+
+    def matches(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Returns the ids starting with `prefix`, in sorted order."""
+        with open(self.filepath, "rb") as f:
+            _, width, count = HEADER.unpack(f.read(HEADER.size))
+            if count == 0:
+                return []
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                records = _Records(mm, width, count)
+                needle = prefix.encode("ascii", errors="replace")
+
+                found = []
+                i = bisect_left(records, needle)
+                while i < count and records[i].startswith(needle):
+                    found.append(records[i].decode("ascii"))
+                    if limit is not None and len(found) >= limit:
+                        break
+                    i += 1
+                return found
+
+    def find(self, ids: Iterable[str]) -> set[str]:
+        """Returns the ids of `ids` that are in the index."""
+        with open(self.filepath, "rb") as f:
+            _, width, count = HEADER.unpack(f.read(HEADER.size))
+            if count == 0:
+                return set()
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                records = _Records(mm, width, count)
+                found = set()
+                for todo_id in ids:
+                    needle = todo_id.encode("ascii", errors="replace")
+                    i = bisect_left(records, needle)
+                    if i < count and records[i] == needle:
+                        found.add(todo_id)
+                return found
+
+    def resolve(self, prefix: str) -> str | None:
+        """
+        Returns the only id starting with `prefix`, or None if there is no such id.
+
+        Raises:
+            AmbiguousIdError: If more than one id starts with `prefix`.
+        """
+        return resolve_prefix(prefix, self.matches(prefix, limit=2))
+
+    def is_fresh(self, *sources: Path) -> bool:
+        """Checks that the index was written after every existing `sources` file."""
+        try:
+            index_mtime = self.filepath.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return all(
+            index_mtime >= source.stat().st_mtime_ns
+            for source in sources
+            if source.exists()
+        )
+
+    def touch(self) -> None:
+        """Marks the index as up to date without rewriting it."""
+        os.utime(self.filepath)
+
+
+class _Records:
+    """Sequence view over the fixed-width records of an mmapped index."""
+
+    def __init__(self, mm: mmap.mmap, width: int, count: int) -> None:
+        self.mm = mm
+        self.width = width
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = HEADER.size + i * self.width
+        return self.mm[start : start + self.width].rstrip(b"\0")
+
+
+def resolve_prefix(prefix: str, matches: list[str]) -> str | None:
+    if prefix in matches:
+        return prefix
+    if len(matches) > 1:
+        raise AmbiguousIdError(prefix, matches)
+    return matches[0] if matches else None
+
+
+def unique_prefix_lengths(
+    ids: Iterable[str], min_length: int = MIN_PREFIX_LENGTH
+) -> dict[str, int]:
+    """
+    Returns the shortest prefix length that tells each id of `ids` apart.
+
+    Only the neighbours of an id in sorted order can share a longer prefix
+    with it than any other id, so ids created in one batch, which share most
+    of their characters, do not make every other id longer.
+    """
+    sorted_ids = sorted(set(ids))
+    lengths = dict.fromkeys(sorted_ids, min_length)
+    for previous, current in zip(sorted_ids, sorted_ids[1:]):
+        length = len(os.path.commonprefix([previous, current])) + 1
+        lengths[previous] = max(lengths[previous], length)
+        lengths[current] = max(lengths[current], length)
+    return lengths
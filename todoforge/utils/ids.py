@@ -0,0 +1,97 @@
+"""
+Time-ordered todo ids.
+
+Ids follow the ULID layout: a 48-bit millisecond timestamp followed by 80
+random bits, written as 26 lowercase Crockford base32 characters. They sort by
+creation time, so a space's ids can be range scanned and new ids land at the
+end of sorted indexes. Ids made in the same millisecond by one process get the
+previous random part plus a random step of up to `STEP_BITS` bits. They still
+sort in creation order and never collide, yet ids made in one batch differ
+within the first characters of their random part, so their prefixes stay short.
+
+Todos created before this scheme have 40 character sha1 ids, which keep
+working everywhere but carry no timestamp.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+TIME_LENGTH = 10
+RANDOM_LENGTH = 16
+ID_LENGTH = TIME_LENGTH + RANDOM_LENGTH
+
+MAX_TIMESTAMP = (1 << 48) - 1
+MAX_RANDOM = (1 << 80) - 1
+# Leaves room for a few hundred ids per millisecond on average.
+STEP_BITS = 72
+
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+_lock = threading.Lock()
+_last_timestamp = -1
+_last_random = 0
+
+
+def new_id(timestamp_ms: int | None = None) -> str:
+    """Returns a new id, greater than every id this process returned before."""
+    global _last_timestamp, _last_random
+
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+
+    with _lock:
+        if timestamp_ms <= _last_timestamp:
+            # Same millisecond, or the clock went back: keep counting up from
+            # the previous id, moving on to the next millisecond on overflow.
+            timestamp_ms = _last_timestamp
+            random_part = _last_random + 1 + _random(STEP_BITS)
+            if random_part > MAX_RANDOM:
+                timestamp_ms += 1
+                random_part = _random(80)
+        else:
+            random_part = _random(80)
+        if timestamp_ms > MAX_TIMESTAMP:
+            raise ValueError("Timestamp is too large to be encoded in an id")
+        _last_timestamp, _last_random = timestamp_ms, random_part
+
+    return format_id(timestamp_ms, random_part)
+
+
+def format_id(timestamp_ms: int, random_part: int) -> str:
+    """Returns the id made of `timestamp_ms` and the 80-bit `random_part`."""
+    return _encode(timestamp_ms, TIME_LENGTH) + _encode(random_part, RANDOM_LENGTH)
+
+
+def id_timestamp(todo_id: str) -> datetime | None:
+    """Returns when the todo `todo_id` was created, or None if the id has no timestamp."""
+    if len(todo_id) != ID_LENGTH:
+        return None
+    try:
+        timestamp_ms = _decode(todo_id[:TIME_LENGTH])
+    except KeyError:
+        return None
+    if timestamp_ms > MAX_TIMESTAMP:
+        return None
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def _random(bits: int) -> int:
+    return int.from_bytes(os.urandom(bits // 8), "big")
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _decode(text: str) -> int:
+    value = 0
+    for char in text:
+        value = value * 32 + _DECODE[char]
+    return value
@@ -0,0 +1,163 @@
+"""
+Write-ahead journal for space operations that change several files.
+
+Renaming or removing a space touches config.json, the files of the space, its
+search index, its archive and the spaces registry, and a crash half way through would leave
+them disagreeing with each other. ``run`` writes the whole operation to
+``spaces.journal`` before its first step and deletes the journal after its
+last one. Every step can safely run again, so ``recover``, which
+``init_folders`` calls before every command, finishes an interrupted operation
+by running all of its steps once more.
+
+The journal is replaced atomically, so it is either missing, and no step ran
+yet, or holds the whole operation.
+"""
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from todoforge.utils import registry
+from todoforge.utils.config import todo_config, write_atomically
+from todoforge.utils.constants import DEFAULT_TODO_CONFIG, DEFAULT_TODO_FOLDER
+from todoforge.utils.locking import file_lock
+
+if TYPE_CHECKING:
+    from todoforge.utils.backends import StorageBackend
+
+JOURNAL_FILENAME = "spaces.journal"
+
+RENAME = "rename"
+REMOVE = "remove"
+
+
+def run(backend: "StorageBackend", operation: dict) -> None:
+    """Journals `operation`, then applies it to `backend` and the config."""
+    filepath = backend.root / JOURNAL_FILENAME
+    with file_lock(_lock_filepath(backend.root)):
+        _write(filepath, operation)
+        _apply(backend, operation)
+        filepath.unlink()
+
+
+def recover(
+    root: Path = DEFAULT_TODO_FOLDER, backend: "StorageBackend | None" = None
+) -> dict | None:
+    """Finishes the operation a crash left in the journal, and returns it."""
+    filepath = root / JOURNAL_FILENAME
+    if not filepath.exists():
+        return None
+
+    with file_lock(_lock_filepath(root)):
+        try:
+            operation = json.loads(filepath.read_text())
+        except FileNotFoundError:
+            # Another process finished it while we waited for the lock.
+            return None
+
+        if backend is None:
+            from todoforge.utils.backends import get_backend
+
+            backend = get_backend()
+        _apply(backend, operation)
+        filepath.unlink()
+    return operation
+
+
+def _apply(backend: "StorageBackend", operation: dict) -> None:
+    for step in STEPS[operation["op"]]:
+        step(backend, operation)
+
+
+def _write(filepath: Path, operation: dict) -> None:
+    write_atomically(filepath, lambda f: json.dump(operation, f, sort_keys=True))
+
+
+def _lock_filepath(root: Path) -> Path:
+    return root / "spaces.lock"
+
+
+def _rename_in_config(backend: "StorageBackend", operation: dict) -> None:
+    old_name, new_name = operation["old_name"], operation["new_name"]
+
+    def rename(config: dict) -> dict:
+        spaces = [new_name if s == old_name else s for s in config.get("spaces", [])]
+        current_space = config.get("current_space", "")
+        return {
+            **config,
+            "current_space": new_name if current_space == old_name else current_space,
+            "spaces": list(dict.fromkeys(spaces)),
+        }
+
+    todo_config.update(DEFAULT_TODO_CONFIG, rename)
+
+
+def _rename_space_files(backend: "StorageBackend", operation: dict) -> None:
+    backend.rename_space(operation["old_name"], operation["new_name"])
+
+
+def _rename_search_index(backend: "StorageBackend", operation: dict) -> None:
+    from todoforge.utils.search import SearchIndex
+
+    SearchIndex(backend.root, operation["old_name"]).rename(operation["new_name"])
+
+
+def _rename_archive(backend: "StorageBackend", operation: dict) -> None:
+    from todoforge.utils.archive import Archive
+
+    Archive(backend.root, operation["old_name"]).rename(operation["new_name"])
+
+
+def _rename_in_registry(backend: "StorageBackend", operation: dict) -> None:
+    registry.rename_space(operation["old_name"], operation["new_name"])
+
+
+def _remove_from_config(backend: "StorageBackend", operation: dict) -> None:
+    space = operation["space"]
+
+    def remove(config: dict) -> dict:
+        spaces = [s for s in config.get("spaces", []) if s != space]
+        current_space = config.get("current_space", "")
+        if current_space == space:
+            current_space = spaces[0] if len(spaces) > 0 else ""
+        return {**config, "current_space": current_space, "spaces": spaces}
+
+    todo_config.update(DEFAULT_TODO_CONFIG, remove)
+
+
+def _remove_space_files(backend: "StorageBackend", operation: dict) -> None:
+    backend.remove_space(operation["space"])
+
+
+def _remove_search_index(backend: "StorageBackend", operation: dict) -> None:
+    from todoforge.utils.search import SearchIndex
+
+    SearchIndex(backend.root, operation["space"]).clear()
+
+
+def _remove_archive(backend: "StorageBackend", operation: dict) -> None:
+    from todoforge.utils.archive import Archive
+
+    Archive(backend.root, operation["space"]).clear()
+
+
+def _remove_from_registry(backend: "StorageBackend", operation: dict) -> None:
+    registry.remove_space(operation["space"])
+
+
+STEPS: dict[str, tuple[Callable[["StorageBackend", dict], None], ...]] = {
+    RENAME: (
+        _rename_in_config,
+        _rename_space_files,
+        _rename_search_index,
+        _rename_archive,
+        _rename_in_registry,
+    ),
+    REMOVE: (
+        _remove_from_config,
+        _remove_space_files,
+        _remove_search_index,
+        _remove_archive,
+        _remove_from_registry,
+    ),
+}
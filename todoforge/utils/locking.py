@@ -0,0 +1,62 @@
+"""
+Inter-process advisory locks for space files.
+
+Locks are taken with ``fcntl.flock`` on a ``<name>.lock`` file next to the space
+files, so concurrent ``tdf`` invocations serialize their read-modify-write
+cycles. They are reentrant within a process. On platforms without ``fcntl`` the
+locks only serialize threads of the current process.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+_thread_locks: defaultdict[str, threading.RLock] = defaultdict(threading.RLock)
+_held: dict[str, tuple[int, int]] = {}
+_registry_lock = threading.Lock()
+
+
+@contextmanager
+def file_lock(filepath: Path) -> Iterator[None]:
+    """Holds an exclusive lock on `filepath` for the duration of the block."""
+    key = str(filepath)
+    with _registry_lock:
+        thread_lock = _thread_locks[key]
+
+    with thread_lock:
+        fd, depth = _held.get(key, (-1, 0))
+        if depth == 0:
+            fd = os.open(filepath, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        _held[key] = (fd, depth + 1)
+
+        try:
+            yield
+        finally:
+            fd, depth = _held.pop(key)
+            if depth > 1:
+                _held[key] = (fd, depth - 1)
+            else:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+def try_lock(fd: int) -> bool:
+    """Takes an exclusive lock on the open file `fd` if no other process holds one."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
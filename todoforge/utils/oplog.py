@@ -0,0 +1,243 @@
+"""
+Append-only operation log for spaces.
+
+Every mutation of a space is stored as one JSON line in ``<space>_todo.log``,
+next to the space's ``<space>_todo.json`` snapshot. Loading a space replays the
+log on top of the snapshot. Once the log grows past ``COMPACT_THRESHOLD`` bytes
+it is folded back into the snapshot, which stays the import/export format.
+
+A crash while appending can leave the last line torn. The next append cuts it
+off before writing, so records never share a line, and readers skip any line
+that is not a record rather than stopping at it.
+"""
+
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from todoforge.utils import profiling
+
+COMPACT_THRESHOLD = 256 * 1024
+
+ADD = "add"
+UPDATE = "update"
+REMOVE = "remove"
+
+
+class OpLog:
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def append(self, *records: dict) -> int:
+        """Appends records to the log and returns the resulting log size in bytes."""
+        lines = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        ).encode("utf-8")
+        with open(self.filepath, "a+b") as f:
+            _drop_torn_line(f)
+            f.write(lines)
+            profiling.count_written(len(lines))
+            return f.tell()
+
+    def read(self) -> list[dict]:
+        if not self.filepath.exists():
+            return []
+
+        records = []
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                profiling.count_read(len(line))
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn write, left by a crash before ``append`` cut it off.
+                    continue
+        return records
+
+    def replay(self, todos: list[dict]) -> list[dict]:
+        """Returns a new todos list with every logged operation applied."""
+        records = self.read()
+        if not records:
+            return todos
+
+        todos_by_id = {todo["id"]: dict(todo) for todo in todos}
+        for record in records:
+            op = record.get("op")
+            if op == ADD:
+                for todo in record["todos"]:
+                    todos_by_id[todo["id"]] = todo
+            elif op == UPDATE:
+                for todo_id in record["ids"]:
+                    if todo_id in todos_by_id:
+                        todos_by_id[todo_id].update(record["fields"])
+            elif op == REMOVE:
+                for todo_id in record["ids"]:
+                    todos_by_id.pop(todo_id, None)
+        return list(todos_by_id.values())
+
+    def replay_iter(self, todos: Iterable[dict]) -> Iterator[dict]:
+        """
+        Yields what ``replay`` returns for `todos`, in the same order.
+
+        The log is read once up front to find out what it does to each id it
+        mentions, then `todos` is streamed through. Logged todos are read back
+        from the log when they are yielded, so only the ids the log mentions are
+        held in memory, never the todos themselves.
+        """
+        states = _States()
+        for offset, record in self._iter_records():
+            op = record.get("op")
+            if op == ADD:
+                for i, todo in enumerate(record["todos"]):
+                    states.add(todo["id"], offset, i)
+            elif op == UPDATE:
+                for todo_id in record["ids"]:
+                    states.update(todo_id, record["fields"])
+            elif op == REMOVE:
+                for todo_id in record["ids"]:
+                    states.remove(todo_id)
+
+        reader = _RecordReader(self.filepath)
+        seen = bytearray(len(states.slots))
+        for todo in todos:
+            slot = states.slots.get(todo["id"])
+            if slot is None:
+                yield dict(todo)
+                continue
+            seen[slot] = 1
+            if states.removed[slot]:
+                # Removed, and added again at the end if at all.
+                continue
+            body = todo if states.offsets[slot] < 0 else reader.todo(states, slot)
+            yield {**body, **states.fields.get(slot, {})}
+
+        appended = [
+            slot
+            for slot in range(len(states.slots))
+            if states.offsets[slot] >= 0 and (states.removed[slot] or not seen[slot])
+        ]
+        # Slots are in order already unless an id was removed and added again.
+        orders = states.orders
+        if any(orders[a] > orders[b] for a, b in zip(appended, appended[1:])):
+            appended.sort(key=states.orders.__getitem__)
+        for slot in appended:
+            yield {**reader.todo(states, slot), **states.fields.get(slot, {})}
+
+    def records(self) -> Iterator[dict]:
+        """Yields the records of the log one at a time."""
+        for _, record in self._iter_records():
+            yield record
+
+    def _iter_records(self) -> Iterator[tuple[int, dict]]:
+        """Yields every record of the log with the offset of its line."""
+        if not self.filepath.exists():
+            return
+        with open(self.filepath, "rb") as f:
+            offset = 0
+            for line in f:
+                profiling.count_read(len(line))
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn write, left by a crash before ``append`` cut it off.
+                    record = None
+                if record is not None:
+                    yield offset, record
+                offset += len(line)
+
+    def size(self) -> int:
+        try:
+            return self.filepath.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def clear(self) -> None:
+        self.filepath.unlink(missing_ok=True)
+
+    def needs_compaction(self, size: int | None = None) -> bool:
+        return (self.size() if size is None else size) > COMPACT_THRESHOLD
+
+
+def _drop_torn_line(f) -> None:
+    """Cuts a line a crash left without its newline off the end of the log `f`."""
+    size = f.seek(0, os.SEEK_END)
+    if not size:
+        return
+    f.seek(size - 1)
+    if f.read(1) == b"\n":
+        return
+    f.seek(0)
+    f.truncate(f.read().rfind(b"\n") + 1)
+    f.seek(0, os.SEEK_END)
+
+
+class _States:
+    """
+    What the log does to each id it mentions, one slot per id.
+
+    Per slot, `offsets` and `indexes` locate the todo of the last add, with an
+    offset of -1 while there is none, `orders` tells where an added todo goes
+    among the others and `removed` whether the todo was removed at some point.
+    Plain arrays keep this at a few dozen bytes per id.
+    """
+
+    def __init__(self) -> None:
+        self.slots: dict[str, int] = {}
+        self.offsets = array("q")
+        self.indexes = array("l")
+        self.orders = array("q")
+        self.removed = bytearray()
+        self.fields: dict[int, dict] = {}
+        self._added = 0
+
+    def add(self, todo_id: str, offset: int, i: int) -> None:
+        slot = self._slot(todo_id)
+        if self.offsets[slot] < 0:
+            self.orders[slot] = self._added
+        self.offsets[slot] = offset
+        self.indexes[slot] = i
+        self.fields.pop(slot, None)
+        self._added += 1
+
+    def update(self, todo_id: str, fields: dict) -> None:
+        slot = self._slot(todo_id)
+        # An update of a todo that is not there, e.g. because it was removed,
+        # changes nothing. A todo that was never mentioned may be in the snapshot.
+        if not self.removed[slot] or self.offsets[slot] >= 0:
+            self.fields.setdefault(slot, {}).update(fields)
+
+    def remove(self, todo_id: str) -> None:
+        slot = self._slot(todo_id)
+        self.offsets[slot] = -1
+        self.removed[slot] = 1
+        self.fields.pop(slot, None)
+
+    def _slot(self, todo_id: str) -> int:
+        slot = self.slots.get(todo_id)
+        if slot is None:
+            slot = self.slots[todo_id] = len(self.slots)
+            self.offsets.append(-1)
+            self.indexes.append(0)
+            self.orders.append(0)
+            self.removed.append(0)
+        return slot
+
+
+class _RecordReader:
+    """Reads logged todos back by line offset, keeping the last line decoded."""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        self._offset = -1
+        self._todos: list[dict] = []
+
+    def todo(self, states: _States, slot: int) -> dict:
+        offset = states.offsets[slot]
+        if offset != self._offset:
+            with open(self.filepath, "rb") as f:
+                f.seek(offset)
+                self._todos = json.loads(f.readline())["todos"]
+            self._offset = offset
+        return self._todos[states.indexes[slot]]
@@ -0,0 +1,87 @@
+"""
+Machine-readable and plain renderers for `tdf ls`.
+
+Every renderer writes rows to the file as soon as they are produced, so piping
+``tdf ls --format ndjson`` into ``head`` returns immediately, even for huge
+spaces. Titles are written verbatim, never interpreted as rich markup.
+"""
+
+import json
+from enum import Enum
+from typing import Iterable, TextIO
+
+
+class OutputFormat(str, Enum):
+    table = "table"
+    plain = "plain"
+    json = "json"
+    ndjson = "ndjson"
+    tsv = "tsv"
+
+
+class TodoStatus(str, Enum):
+    open = "open"
+    done = "done"
+
+
+TSV_FIELDS = ("id", "title", "done")
+
+
+def write_todos(
+    todos: Iterable[dict],
+    output_format: OutputFormat,
+    file: TextIO,
+    with_space: bool = False,
+) -> int:
+    """
+    Streams `todos` to `file` in `output_format` and returns how many were written.
+
+    With `with_space`, every todo carries a ``space`` key that plain and TSV
+    output show as their first column.
+    """
+    writer = {
+        OutputFormat.plain: _write_plain,
+        OutputFormat.json: _write_json,
+        OutputFormat.ndjson: _write_ndjson,
+        OutputFormat.tsv: _write_tsv,
+    }[output_format]
+    return writer(todos, file, with_space)
+
+
+def _write_plain(todos: Iterable[dict], file: TextIO, with_space: bool) -> int:
+    count = 0
+    for todo in todos:
+        status = "x" if todo["done"] else " "
+        space = f"{todo['space']}  " if with_space else ""
+        file.write(f"{space}[{status}] {todo['id']}  {todo['title'].strip()}\n")
+        count += 1
+    return count
+
+
+def _write_json(todos: Iterable[dict], file: TextIO, with_space: bool) -> int:
+    count = 0
+    file.write("[")
+    for todo in todos:
+        file.write(("," if count else "") + "\n    " + json.dumps(todo, sort_keys=True))
+        count += 1
+    file.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _write_ndjson(todos: Iterable[dict], file: TextIO, with_space: bool) -> int:
+    count = 0
+    for todo in todos:
+        file.write(json.dumps(todo, sort_keys=True) + "\n")
+        count += 1
+    return count
+
+
+def _write_tsv(todos: Iterable[dict], file: TextIO, with_space: bool) -> int:
+    count = 0
+    file.write("\t".join(("space", *TSV_FIELDS) if with_space else TSV_FIELDS) + "\n")
+    for todo in todos:
+        space = f"{todo['space']}\t" if with_space else ""
+        title = todo["title"].replace("\t", " ").replace("\n", " ")
+        file.write(f"{space}{todo['id']}\t{title}\t{str(todo['done']).lower()}\n")
+        count += 1
+    return count
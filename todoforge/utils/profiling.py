@@ -0,0 +1,237 @@
+"""
+Per-phase profiling of a single ``tdf`` invocation.
+
+Enabled with ``tdf --profile <command>`` or by setting ``TDF_TRACE`` (``table``
+or ``json``). Code wraps its expensive steps in ``phase(name)`` and reports the
+bytes it reads and writes with ``count_read``/``count_written``; both cost a
+single global lookup while profiling is off. When the command ends, every phase
+is reported with its call count, wall and CPU time and bytes, followed by the
+``TodoConfig`` cache hits and misses of the invocation:
+
+- ``table``: a human readable table on stderr,
+- ``json``: one JSON object per phase and a final summary line, appended to
+  ``TDF_TRACE_FILE`` when it is set so traces of many invocations add up.
+
+Times of a phase include the phases nested in it. ``startup`` runs from the
+import of the ``todoforge`` package to the start of the command, so it is
+mostly the cost of imports.
+
+``tdf --cprofile PATH`` (or ``TDF_CPROFILE``) also dumps cProfile stats of the
+command to PATH, or to a new file in PATH when it is a folder.
+"""
+
+import os
+import sys
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, TextIO
+
+import todoforge
+
+if TYPE_CHECKING:
+    from todoforge.utils.config import CacheInfo
+
+TRACE_ENV = "TDF_TRACE"
+TRACE_FILE_ENV = "TDF_TRACE_FILE"
+CPROFILE_ENV = "TDF_CPROFILE"
+
+TABLE_FORMAT = "table"
+JSON_FORMAT = "json"
+DISABLED_VALUES = ("", "0", "false", "no", "off")
+
+
+class _Phase:
+    __slots__ = ("name", "depth", "calls", "wall", "cpu", "bytes_read", "bytes_written")
+
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        self.depth = depth
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "phase": self.name,
+            "depth": self.depth,
+            "calls": self.calls,
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class Profiler:
+    def __init__(self, cache_info: Callable[[], "CacheInfo"] | None = None) -> None:
+        self.cache_info = cache_info
+        self.phases: dict[str, _Phase] = {}
+        self.startup = _Phase("startup", 0)
+        self.command = _Phase("command", 0)
+        self._stack: list[_Phase] = [self.command]
+        self._cache_start = cache_info() if cache_info else None
+        self._start = (time.perf_counter(), time.process_time())
+
+        started_wall, started_cpu = todoforge.STARTED_AT
+        self.startup.calls = 1
+        self.startup.wall = self._start[0] - started_wall
+        self.startup.cpu = self._start[1] - started_cpu
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        record = self.phases.get(name)
+        if record is None:
+            record = self.phases[name] = _Phase(name, len(self._stack))
+        record.calls += 1
+        self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record.wall += time.perf_counter() - wall
+            record.cpu += time.process_time() - cpu
+            self._stack.pop()
+
+    def count(self, read: int = 0, written: int = 0) -> None:
+        # Like times, bytes count towards every phase they happened in.
+        for record in self._stack:
+            record.bytes_read += read
+            record.bytes_written += written
+
+    def finish(self) -> list[dict]:
+        """Closes the command phase and returns every phase as a dict."""
+        self.command.calls = 1
+        self.command.wall = time.perf_counter() - self._start[0]
+        self.command.cpu = time.process_time() - self._start[1]
+        return [
+            record.as_dict()
+            for record in (self.startup, self.command, *self.phases.values())
+        ]
+
+    def cache_stats(self) -> dict:
+        if self.cache_info is None or self._cache_start is None:
+            return {}
+        end = self.cache_info()
+        return {
+            "cache_hits": end.hits - self._cache_start.hits,
+            "cache_misses": end.misses - self._cache_start.misses,
+            "cache_entries": end.entries,
+            "cache_bytes": end.bytes,
+        }
+
+    def report(self, output_format: str, file: TextIO | None = None) -> None:
+        phases = self.finish()
+        summary = {
+            "argv": sys.argv[1:],
+            "pid": os.getpid(),
+            "total_ms": round((self.startup.wall + self.command.wall) * 1000, 3),
+            **self.cache_stats(),
+        }
+
+        if file is None:
+            trace_file = os.environ.get(TRACE_FILE_ENV)
+            if trace_file:
+                with open(trace_file, "a", encoding="utf-8") as f:
+                    self._write(output_format, phases, summary, f)
+                return
+            file = sys.stderr
+        self._write(output_format, phases, summary, file)
+
+    def _write(
+        self, output_format: str, phases: list[dict], summary: dict, file: TextIO
+    ) -> None:
+        if output_format == JSON_FORMAT:
+            import json
+
+            for phase_ in phases:
+                file.write(json.dumps({"pid": summary["pid"], **phase_}) + "\n")
+            file.write(json.dumps({"summary": summary}) + "\n")
+            return
+
+        file.write(
+            f"{'phase':<24}{'calls':>7}{'wall ms':>10}{'cpu ms':>10}"
+            f"{'read':>10}{'written':>10}\n"
+        )
+        for phase_ in phases:
+            name = "  " * phase_["depth"] + phase_["phase"]
+            file.write(
+                f"{name:<24}{phase_['calls']:>7}{phase_['wall_ms']:>10.2f}"
+                f"{phase_['cpu_ms']:>10.2f}{_size(phase_['bytes_read']):>10}"
+                f"{_size(phase_['bytes_written']):>10}\n"
+            )
+        file.write(f"total {summary['total_ms']:.2f} ms")
+        if "cache_hits" in summary:
+            file.write(
+                f", cache {summary['cache_hits']} hits / {summary['cache_misses']} misses"
+                f" ({summary['cache_entries']} files, {_size(summary['cache_bytes'])})"
+            )
+        file.write("\n")
+
+
+_profiler: Profiler | None = None
+
+
+def trace_format(value: str | None) -> str | None:
+    """Returns the report format asked for by a ``TDF_TRACE`` value, or None."""
+    if value is None or value.strip().lower() in DISABLED_VALUES:
+        return None
+    return JSON_FORMAT if value.strip().lower() == JSON_FORMAT else TABLE_FORMAT
+
+
+def start(cache_info: Callable[[], "CacheInfo"] | None = None) -> Profiler:
+    global _profiler
+    _profiler = Profiler(cache_info)
+    return _profiler
+
+
+def stop() -> None:
+    global _profiler
+    _profiler = None
+
+
+def phase(name: str) -> AbstractContextManager:
+    """Times the block as phase `name` when profiling is on."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.phase(name)
+
+
+def count_read(size: int) -> None:
+    if _profiler is not None:
+        _profiler.count(read=size)
+
+
+def count_written(size: int) -> None:
+    if _profiler is not None:
+        _profiler.count(written=size)
+
+
+def start_cprofile(path: Path) -> Callable[[], Path]:
+    """Starts cProfile and returns a function that stops it and dumps the stats."""
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+
+    def dump() -> Path:
+        profile.disable()
+        filepath = path
+        if path.is_dir():
+            filepath = path / f"tdf-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof"
+        profile.dump_stats(filepath)
+        return filepath
+
+    return dump
+
+
+def _size(size: int) -> str:
+    if size == 0:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
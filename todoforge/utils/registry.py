@@ -0,0 +1,157 @@
+"""
+Registry of spaces and their stats, kept in config.json.
+
+The ``registry`` object of ``config.json`` has one entry per space::
+
+    {"todos": 120, "open": 42, "size": 18304, "modified": "2026-10-18T09:12:44+00:00"}
+
+Every mutation made through ``todoforge.utils.db`` and ``tdf spaces`` updates
+the entry of its space from the change it made, so listing spaces with their
+counts never opens a space file. An entry that is missing, e.g. in a config
+written by an older version, is computed from the space the first time it is
+needed. ``tdf spaces reindex`` rebuilds the whole registry from the backend.
+
+`size` is the number of bytes the space takes on disk, or None for backends
+that do not keep a file per space.
+"""
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable
+
+from todoforge.utils.config import todo_config
+from todoforge.utils.constants import DEFAULT_TODO_CONFIG
+
+if TYPE_CHECKING:
+    from todoforge.utils.backends import StorageBackend
+
+REGISTRY_KEY = "registry"
+
+
+def get_registry() -> dict[str, dict]:
+    """Returns the registry entries, keyed by space."""
+    try:
+        return todo_config.get(DEFAULT_TODO_CONFIG).get(REGISTRY_KEY, {})
+    except FileNotFoundError:
+        return {}
+
+
+def get_stats(backend: "StorageBackend", spaces: list[str]) -> dict[str, dict]:
+    """Returns the entries of `spaces`, computing and saving the missing ones."""
+    registry = get_registry()
+    missing = [space for space in spaces if space not in registry]
+    if missing:
+        documents = backend.load_many(missing)
+
+        def add_missing(registry: dict[str, dict]) -> None:
+            for space, document in documents.items():
+                registry[space] = _entry(backend, space, document["todos"])
+
+        registry = _update(add_missing)
+    return {space: registry[space] for space in spaces if space in registry}
+
+
+def record_change(
+    backend: "StorageBackend", space: str, todos: int = 0, open_todos: int = 0
+) -> None:
+    """Adds `todos` and `open_todos` (both may be negative) to the counts of `space`."""
+
+    def apply(registry: dict[str, dict]) -> None:
+        entry = registry.get(space)
+        if entry is None:
+            registry[space] = _entry(backend, space, backend.load(space)["todos"])
+            return
+        registry[space] = _touch(
+            backend,
+            space,
+            {
+                **entry,
+                "todos": entry["todos"] + todos,
+                "open": entry["open"] + open_todos,
+            },
+        )
+
+    _update(apply)
+
+
+def record_document(backend: "StorageBackend", space: str, document: dict) -> None:
+    """Sets the counts of `space` from its whole `document`."""
+
+    def apply(registry: dict[str, dict]) -> None:
+        registry[space] = _entry(backend, space, document.get("todos", []))
+
+    _update(apply)
+
+
+def refresh_size(backend: "StorageBackend", space: str) -> None:
+    """Updates the size of `space` after it was rewritten without changing its todos."""
+
+    def apply(registry: dict[str, dict]) -> None:
+        if space in registry:
+            size = backend.space_size(space)
+            registry[space] = {**registry[space], "size": size}
+
+    _update(apply)
+
+
+def rename_space(old_name: str, new_name: str) -> None:
+    def apply(registry: dict[str, dict]) -> None:
+        if old_name in registry:
+            registry[new_name] = registry.pop(old_name)
+
+    _update(apply)
+
+
+def remove_space(space: str) -> None:
+    def apply(registry: dict[str, dict]) -> None:
+        registry.pop(space, None)
+
+    _update(apply)
+
+
+def reindex(backend: "StorageBackend", spaces: list[str]) -> dict[str, dict]:
+    """Replaces the registry with entries computed from every space in `spaces`."""
+    documents = backend.load_many(spaces)
+    registry = {
+        space: _entry(backend, space, document["todos"])
+        for space, document in documents.items()
+    }
+
+    def replace(current: dict[str, dict]) -> None:
+        # Counts are recomputed, but when a space was last changed is not
+        # something the space itself records.
+        for space, entry in registry.items():
+            if "modified" in current.get(space, {}):
+                entry["modified"] = current[space]["modified"]
+        current.clear()
+        current.update(registry)
+
+    return _update(replace)
+
+
+def _update(apply: Callable[[dict[str, dict]], None]) -> dict[str, dict]:
+    # Mutations of different spaces run in parallel, so the read-modify-write
+    # of config.json is serialized across processes.
+    if not DEFAULT_TODO_CONFIG.exists():
+        return {}
+    registry: dict[str, dict] = {}
+
+    def change(config: dict) -> dict:
+        registry.update(config.get(REGISTRY_KEY, {}))
+        apply(registry)
+        return {**config, REGISTRY_KEY: registry}
+
+    todo_config.update(DEFAULT_TODO_CONFIG, change)
+    return registry
+
+
+def _entry(backend: "StorageBackend", space: str, todos: list[dict]) -> dict:
+    open_todos = sum(1 for todo in todos if not todo.get("done"))
+    return _touch(backend, space, {"todos": len(todos), "open": open_todos})
+
+
+def _touch(backend: "StorageBackend", space: str, entry: dict) -> dict:
+    return {
+        **entry,
+        "size": backend.space_size(space),
+        "modified": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
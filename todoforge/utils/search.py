@@ -0,0 +1,367 @@
+"""
+Full-text search over todo titles.
+
+Every space has an inverted index from title tokens to todos, stored the same
+way as the spaces themselves: an immutable ``<space>_search.idx`` segment that
+is binary searched in place through ``mmap``, plus a ``<space>_search.log``
+operation log holding every change made since the segment was written. Once the
+log grows past ``MERGE_THRESHOLD`` bytes it is merged into a new segment.
+
+``<space>_search.stamp`` holds the stamp the backend gave the space (see
+``StorageBackend.space_stamp``) as of the last change written to the index.
+A crash between a change to the space and the one to its index, or a hand
+edit, leaves the stamp behind, and the next search rebuilds the index.
+
+All query terms must match. A term ending in ``*`` matches every token that
+starts with it, e.g. ``rep*`` matches "report" and "repo".
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from todoforge.utils import oplog
+from todoforge.utils.locking import file_lock
+from todoforge.utils.oplog import OpLog
+
+# magic, doc count, token count, then the file offsets of the doc blob, the
+# token blob and the postings. The doc, token and postings offset tables sit
+# between the header and the doc blob.
+HEADER = struct.Struct("<4sIIQQQ")
+MAGIC = b"TDFS"
+OFFSET = struct.Struct("<I")
+
+MERGE_THRESHOLD = 64 * 1024
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class Term:
+    text: str
+    prefix: bool = False
+
+    def matches(self, token: str) -> bool:
+        return token.startswith(self.text) if self.prefix else token == self.text
+
+
+def tokenize(text: str) -> set[str]:
+    return set(TOKEN_RE.findall(text.lower()))
+
+
+def parse_query(query: str) -> list[Term]:
+    """Splits `query` into terms, e.g. ``"fix rep*"`` into fix and the prefix rep."""
+    terms = []
+    for word in query.lower().split():
+        tokens = TOKEN_RE.findall(word)
+        for i, token in enumerate(tokens):
+            is_last = i == len(tokens) - 1
+            terms.append(Term(token, prefix=is_last and word.endswith("*")))
+    return terms
+
+
+def matches_all(title: str, terms: list[Term]) -> bool:
+    tokens = tokenize(title)
+    return all(any(term.matches(token) for token in tokens) for term in terms)
+
+
+class SearchIndex:
+    def __init__(self, root: Path, space: str) -> None:
+        self.root = root
+        self.space = space
+        self.filepath = root / f"{space}_search.idx"
+        self.log = OpLog(root / f"{space}_search.log")
+        self.stamp_filepath = root / f"{space}_search.stamp"
+
+    def exists(self) -> bool:
+        return self.filepath.exists()
+
+    def is_fresh(self, stamp: int | None) -> bool:
+        """
+        Checks that the index was last written when the space had `stamp`.
+
+        Without a stamp, when the backend cannot tell, an existing index is.
+        """
+        if not self.exists():
+            return False
+        if stamp is None:
+            return True
+        try:
+            return int(self.stamp_filepath.read_text()) == stamp
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def build(self, todos: Iterable[dict], stamp: int | None = None) -> None:
+        """Replaces the index with `todos` and empties its log."""
+        with self._lock():
+            _write_segment(
+                self.filepath, [(todo["id"], todo["title"]) for todo in todos]
+            )
+            self.log.clear()
+            self._write_stamp(stamp)
+
+    def add(self, todos: list[dict], stamp: int | None = None) -> None:
+        self._append(
+            {
+                "op": oplog.ADD,
+                "todos": [{"id": todo["id"], "title": todo["title"]} for todo in todos],
+            },
+            stamp,
+        )
+
+    def update_title(
+        self, todo_ids: list[str], title: str, stamp: int | None = None
+    ) -> None:
+        self._append(
+            {"op": oplog.UPDATE, "ids": todo_ids, "fields": {"title": title}}, stamp
+        )
+
+    def remove(self, todo_ids: list[str], stamp: int | None = None) -> None:
+        self._append({"op": oplog.REMOVE, "ids": todo_ids}, stamp)
+
+    def touch(self, stamp: int | None) -> None:
+        """Records that the space changed to `stamp` without changing any title."""
+        if not self.exists():
+            return
+        with self._lock():
+            self._write_stamp(stamp)
+
+    def search(self, terms: list[Term]) -> list[dict]:
+        """Returns the ``{"id", "title"}`` of every todo whose title matches all `terms`."""
+        if not terms:
+            return []
+
+        changes = self._changes()
+        found = [
+            {"id": todo_id, "title": title}
+            for todo_id, title in self._segment_search(terms)
+            if todo_id not in changes
+        ]
+        found.extend(
+            {"id": todo_id, "title": title}
+            for todo_id, title in changes.items()
+            if title is not None and matches_all(title, terms)
+        )
+        return found
+
+    def rename(self, new_space: str) -> None:
+        renamed = SearchIndex(self.root, new_space)
+        for old, new in (
+            (self.filepath, renamed.filepath),
+            (self.log.filepath, renamed.log.filepath),
+            (self.stamp_filepath, renamed.stamp_filepath),
+        ):
+            if old.exists():
+                old.rename(new)
+        self._lock_filepath().unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        self.filepath.unlink(missing_ok=True)
+        self.log.clear()
+        self.stamp_filepath.unlink(missing_ok=True)
+        self._lock_filepath().unlink(missing_ok=True)
+
+    def _append(self, record: dict, stamp: int | None) -> None:
+        # Without a segment there is nothing to keep up to date, the next
+        # search builds the index from the space itself.
+        if not self.exists():
+            return
+        with self._lock():
+            size = self.log.append(record)
+            if size > MERGE_THRESHOLD:
+                self._merge()
+            self._write_stamp(stamp)
+
+    def _write_stamp(self, stamp: int | None) -> None:
+        # A missing or torn stamp only ever makes the index stale.
+        self.stamp_filepath.write_text("" if stamp is None else str(stamp))
+
+    def _merge(self) -> None:
+        documents = dict(self._segment_documents())
+        for todo_id, title in self._changes().items():
+            if title is None:
+                documents.pop(todo_id, None)
+            else:
+                documents[todo_id] = title
+        _write_segment(self.filepath, list(documents.items()))
+        self.log.clear()
+
+    def _changes(self) -> dict[str, str | None]:
+        """Maps every todo changed since the segment was written to its title, None if removed."""
+        changes: dict[str, str | None] = {}
+        for record in self.log.read():
+            op = record.get("op")
+            if op == oplog.ADD:
+                for todo in record["todos"]:
+                    changes[todo["id"]] = todo["title"]
+            elif op == oplog.UPDATE:
+                for todo_id in record["ids"]:
+                    changes[todo_id] = record["fields"]["title"]
+            elif op == oplog.REMOVE:
+                for todo_id in record["ids"]:
+                    changes[todo_id] = None
+        return changes
+
+    def _segment_search(self, terms: list[Term]) -> list[tuple[str, str]]:
+        with open(self.filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            segment = _Segment(mm)
+
+            postings = sorted((segment.postings(term) for term in terms), key=len)
+            ordinals = set(postings[0])
+            for other in postings[1:]:
+                if not ordinals:
+                    break
+                ordinals.intersection_update(other)
+
+            return [segment.document(ordinal) for ordinal in sorted(ordinals)]
+
+    def _segment_documents(self) -> list[tuple[str, str]]:
+        with open(self.filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            segment = _Segment(mm)
+            return [segment.document(i) for i in range(segment.doc_count)]
+
+    def _lock(self):
+        return file_lock(self._lock_filepath())
+
+    def _lock_filepath(self) -> Path:
+        return self.root / f"{self.space}_search.lock"
+
+
+class _Segment:
+    """Read-only view over an mmapped index segment."""
+
+    def __init__(self, mm: mmap.mmap) -> None:
+        (
+            magic,
+            self.doc_count,
+            self.token_count,
+            self.doc_blob,
+            self.token_blob,
+            self.postings_start,
+        ) = HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            raise ValueError("Not a todoforge search index")
+
+        self.mm = mm
+        self.doc_offsets = HEADER.size
+        self.token_offsets = self.doc_offsets + OFFSET.size * (self.doc_count + 1)
+        self.posting_offsets = self.token_offsets + OFFSET.size * (self.token_count + 1)
+
+    def __len__(self) -> int:
+        return self.token_count
+
+    def __getitem__(self, i: int) -> bytes:
+        start, end = self._offsets(self.token_offsets, i)
+        return self.mm[self.token_blob + start : self.token_blob + end]
+
+    def document(self, ordinal: int) -> tuple[str, str]:
+        start, end = self._offsets(self.doc_offsets, ordinal)
+        todo_id, title = (
+            self.mm[self.doc_blob + start : self.doc_blob + end]
+            .decode("utf-8")
+            .split("\0", 1)
+        )
+        return todo_id, title
+
+    def postings(self, term: Term) -> set[int]:
+        """Returns the ordinals of the documents containing a token matching `term`."""
+        needle = term.text.encode("utf-8")
+        found: set[int] = set()
+        i = bisect_left(self, needle)
+        while i < self.token_count:
+            token = self[i]
+            if not (token.startswith(needle) if term.prefix else token == needle):
+                break
+            start, end = self._offsets(self.posting_offsets, i)
+            found.update(
+                _uint32_array(
+                    self.mm[
+                        self.postings_start
+                        + OFFSET.size * start : self.postings_start
+                        + OFFSET.size * end
+                    ]
+                )
+            )
+            i += 1
+        return found
+
+    def _offsets(self, table: int, i: int) -> tuple[int, int]:
+        start = table + OFFSET.size * i
+        return (
+            OFFSET.unpack_from(self.mm, start)[0],
+            OFFSET.unpack_from(self.mm, start + OFFSET.size)[0],
+        )
+
+
+def _write_segment(filepath: Path, documents: list[tuple[str, str]]) -> None:
+    postings_by_token: dict[bytes, list[int]] = {}
+    doc_blob = bytearray()
+    doc_offsets = [0]
+    for ordinal, (todo_id, title) in enumerate(documents):
+        doc_blob += f"{todo_id}\0{title}".encode("utf-8")
+        doc_offsets.append(len(doc_blob))
+        for token in tokenize(title):
+            postings_by_token.setdefault(token.encode("utf-8"), []).append(ordinal)
+
+    tokens = sorted(postings_by_token)
+    token_blob = bytearray()
+    token_offsets = [0]
+    postings = array("I")
+    posting_offsets = [0]
+    for token in tokens:
+        token_blob += token
+        token_offsets.append(len(token_blob))
+        postings.extend(postings_by_token[token])
+        posting_offsets.append(len(postings))
+
+    tables = b"".join(
+        _uint32_bytes(offsets)
+        for offsets in (doc_offsets, token_offsets, posting_offsets)
+    )
+    doc_blob_start = HEADER.size + len(tables)
+    token_blob_start = doc_blob_start + len(doc_blob)
+    postings_start = token_blob_start + len(token_blob)
+
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                len(documents),
+                len(tokens),
+                doc_blob_start,
+                token_blob_start,
+                postings_start,
+            )
+        )
+        f.write(tables)
+        f.write(doc_blob)
+        f.write(token_blob)
+        f.write(_uint32_bytes(postings))
+    os.replace(tmp_filepath, filepath)
+
+
+def _uint32_bytes(values: Iterable[int]) -> bytes:
+    values = array("I", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _uint32_array(data: bytes) -> array:
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
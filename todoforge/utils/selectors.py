@@ -0,0 +1,84 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from todoforge.utils.ids import id_timestamp
+
+DURATION_UNITS = {
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+}
+
+
+@dataclass(frozen=True)
+class TodoSelector:
+    """
+    Filters that select todos in bulk. Every filter that is set must match.
+    """
+
+    all_done: bool = False
+    title_matches: re.Pattern | None = None
+    older_than: timedelta | None = None
+
+    def is_empty(self) -> bool:
+        return not (self.all_done or self.title_matches or self.older_than)
+
+    def matches(self, todo: dict, now: datetime | None = None) -> bool:
+        if self.all_done and not todo.get("done"):
+            return False
+        if self.title_matches and not self.title_matches.search(todo["title"]):
+            return False
+        if self.older_than is not None:
+            created_at = todo_created_at(todo)
+            now = now or datetime.now(timezone.utc)
+            if created_at is None or now - created_at < self.older_than:
+                return False
+        return True
+
+
+def build_selector(
+    all_done: bool = False,
+    title_matches: str | None = None,
+    older_than: str | None = None,
+) -> TodoSelector:
+    """
+    Builds a TodoSelector from command line values.
+
+    Raises:
+        ValueError: If `title_matches` is not a valid regex or `older_than` is not
+            a valid duration.
+    """
+    try:
+        pattern = re.compile(title_matches) if title_matches else None
+    except re.error as e:
+        raise ValueError(f"Invalid regex '{title_matches}': {e}")
+
+    return TodoSelector(
+        all_done=all_done,
+        title_matches=pattern,
+        older_than=parse_duration(older_than) if older_than else None,
+    )
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parses durations like '45m', '12h', '30d' or '2w'."""
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", value.lower())
+    if match is None:
+        raise ValueError(
+            f"Invalid duration '{value}'. Use a number followed by m, h, d or w, e.g. 30d"
+        )
+    amount, unit = match.groups()
+    return int(amount) * DURATION_UNITS[unit]
+
+
+def todo_created_at(todo: dict) -> datetime | None:
+    created_at = todo.get("created_at")
+    if not created_at:
+        # Time-ordered ids carry their creation time, sha1 ones do not.
+        return id_timestamp(todo.get("id", ""))
+    created_at = datetime.fromisoformat(created_at)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at
@@ -0,0 +1,272 @@
+"""
+Sharded snapshot format for spaces.
+
+A sharded space keeps its todos in ``<space>_todo.<n>.shard`` files, each one
+holding the todos of a range of ids as a JSON list sorted by id, plus a small
+``<space>_todo.manifest`` that lists the shards in id order::
+
+    {"meta": {}, "next": 7, "shards": [{"n": 5, "first": "", "todos": 1024, "open": 12}, ...]}
+
+A shard holds the ids from its `first` up to the `first` of the next shard,
+the first shard starting at "". Ids made by ``todoforge.utils.ids`` sort in
+the order todos were created in, so new todos land in the last shard and the
+shards list the todos in the order they were added in. The sha1 ids of todos
+created before those ids carry no order, so ``write`` refuses a space whose
+todos are not already in id order rather than reorder them.
+
+The operation log of the space works as for the other formats, but folding it
+into the snapshot only rewrites the shards it touched, so a `tdf done` on a
+recent todo never rewrites the old ones. A shard that grew past
+`MAX_SHARD_TODOS` is split and an emptied one is dropped along the way.
+
+Shard files are never changed in place. Rewritten shards get a new number and
+the manifest is replaced atomically to point at them, so a crash leaves either
+the old or the new shards in use. Reads take no lock, so the shards a manifest
+stops listing are only deleted once the manifest after it is written, and a
+read that started on the old manifest can still finish.
+"""
+
+import json
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from todoforge.utils import oplog, profiling
+from todoforge.utils.config import todo_config
+
+SHARD_TODOS = 1024
+MAX_SHARD_TODOS = 2 * SHARD_TODOS
+# Shards folded per read of the log, and the todos held in memory while folding
+# before they are written out early, which leaves room for what the log adds.
+MAX_LOADED_SHARDS = 32
+MAX_LOADED_TODOS = 2 * MAX_LOADED_SHARDS * MAX_SHARD_TODOS
+
+
+class ShardedSpace:
+    def __init__(self, root: Path, space: str) -> None:
+        self.root = root
+        self.space = space
+        self.manifest_filepath = root / f"{space}_todo.manifest"
+
+    def exists(self) -> bool:
+        return self.manifest_filepath.exists()
+
+    def manifest(self) -> dict:
+        return todo_config.get(self.manifest_filepath)
+
+    def load(self) -> dict:
+        """Returns the whole document."""
+        manifest = self.manifest()
+        return {**manifest["meta"], "todos": list(self.records(manifest))}
+
+    def records(self, manifest: dict | None = None) -> Iterator[dict]:
+        """Yields the todos in id order, reading one shard at a time."""
+        for shard in (manifest or self.manifest())["shards"]:
+            yield from self._read(shard["n"])
+
+    def iter_todos(self, done: bool | None = None) -> Iterator[dict]:
+        """
+        Yields the todos open ones first, each group in id order.
+
+        Pass `done` to only yield open (False) or completed (True) todos. Shards
+        without todos of the wanted status are never read.
+        """
+        shards = self.manifest()["shards"]
+        for status in (False, True) if done is None else (done,):
+            for shard in shards:
+                count = shard["todos"] - shard["open"] if status else shard["open"]
+                if count:
+                    for todo in self._read(shard["n"]):
+                        if bool(todo.get("done")) == status:
+                            yield todo
+
+    def write(self, document: dict) -> None:
+        """
+        Replaces every shard with `document`, in shards of `SHARD_TODOS` todos.
+
+        Raises:
+            ValueError: If the todos of `document` are not in id order, which
+                the shards would list them in.
+        """
+        todos = document.get("todos", [])
+        if any(a["id"] >= b["id"] for a, b in zip(todos, todos[1:])):
+            raise ValueError(
+                "Only spaces whose todos are in id order can be sharded, "
+                "e.g. not ones holding todos with sha1 ids."
+            )
+        next_n = self._next_n()
+        shards = []
+        for i in range(0, max(len(todos), 1), SHARD_TODOS):
+            shards.append(self._write(next_n, todos[i : i + SHARD_TODOS], i == 0))
+            next_n += 1
+        self._commit(
+            {key: value for key, value in document.items() if key != "todos"},
+            shards,
+            next_n,
+        )
+
+    def fold(self, records: Callable[[], Iterable[dict]]) -> None:
+        """
+        Applies the operation log to the shards it touches.
+
+        `records` returns a new iterator over the log on every call. The
+        touched shards are loaded `MAX_LOADED_SHARDS` at a time, reading the
+        log once per group, so each of them is only written once.
+        """
+        manifest = self.manifest()
+        shards = [dict(shard) for shard in manifest["shards"]]
+        firsts = [shard["first"] for shard in shards]
+        next_n = manifest["next"]
+        loaded: dict[int, dict[str, dict]] = {}
+        loaded_todos = 0
+
+        def todos_of(todo_id: str) -> dict[str, dict]:
+            nonlocal loaded_todos
+            if loaded_todos >= MAX_LOADED_TODOS:
+                flush()
+            i = bisect_right(firsts, todo_id) - 1
+            if i not in loaded:
+                loaded[i] = {todo["id"]: todo for todo in self._read(shards[i]["n"])}
+                loaded_todos += len(loaded[i])
+            return loaded[i]
+
+        def flush() -> None:
+            # Shards grown past `MAX_SHARD_TODOS` are split, which shifts the
+            # ones after them, so the loaded shards are written last to first.
+            nonlocal next_n, loaded_todos
+            for i in sorted(loaded, reverse=True):
+                by_id = loaded[i]
+                todos = [by_id[todo_id] for todo_id in sorted(by_id)]
+                parts = 1
+                if len(todos) > MAX_SHARD_TODOS:
+                    parts = -(-len(todos) // SHARD_TODOS)
+                size = max(-(-len(todos) // parts), 1)
+                written = []
+                for start in range(0, max(len(todos), 1), size):
+                    part = self._write(next_n, todos[start : start + size])
+                    first = firsts[i] if start == 0 else todos[start]["id"]
+                    written.append({**part, "first": first})
+                    next_n += 1
+                shards[i : i + 1] = written
+                firsts[i : i + 1] = [shard["first"] for shard in written]
+            loaded.clear()
+            loaded_todos = 0
+
+        for low, high in _ranges(records(), firsts):
+
+            def wanted(todo_id: str) -> bool:
+                return low <= todo_id and (high is None or todo_id < high)
+
+            for record in records():
+                op = record.get("op")
+                if op == oplog.ADD:
+                    for todo in record["todos"]:
+                        if wanted(todo["id"]):
+                            todos_of(todo["id"])[todo["id"]] = todo
+                            loaded_todos += 1
+                elif op == oplog.UPDATE:
+                    for todo_id in filter(wanted, record["ids"]):
+                        todo = todos_of(todo_id).get(todo_id)
+                        if todo is not None:
+                            todo.update(record["fields"])
+                elif op == oplog.REMOVE:
+                    for todo_id in filter(wanted, record["ids"]):
+                        todos_of(todo_id).pop(todo_id, None)
+            flush()
+
+        # Emptied shards are dropped, but there is always a first one.
+        kept = [shard for shard in shards[1:] if shard["todos"]]
+        if shards[0]["todos"] or not kept:
+            kept.insert(0, shards[0])
+        kept[0]["first"] = ""
+        self._commit(manifest["meta"], kept, next_n)
+
+    def files(self) -> list[Path]:
+        """Returns every file of the space: its shards, then its manifest."""
+        return [
+            *self.root.glob(f"{self.space}_todo.*.shard"),
+            self.manifest_filepath,
+        ]
+
+    def size(self) -> int:
+        size = 0
+        for filepath in self.files():
+            try:
+                size += filepath.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def clear(self) -> None:
+        for filepath in self.files():
+            filepath.unlink(missing_ok=True)
+        todo_config.invalidate(self.manifest_filepath)
+
+    def _commit(self, meta: dict, shards: list[dict], next_n: int) -> None:
+        try:
+            previous = self.manifest()["shards"]
+        except FileNotFoundError:
+            previous = []
+        todo_config.save(
+            filepath=self.manifest_filepath,
+            content={"meta": meta, "next": next_n, "shards": shards},
+        )
+        in_use = {self._filepath(shard["n"]) for shard in [*previous, *shards]}
+        for filepath in self.files():
+            if filepath.suffix == ".shard" and filepath not in in_use:
+                filepath.unlink(missing_ok=True)
+
+    def _next_n(self) -> int:
+        try:
+            return self.manifest()["next"]
+        except FileNotFoundError:
+            return 0
+
+    def _read(self, n: int) -> list[dict]:
+        with profiling.phase("read shard"), open(self._filepath(n), "rb") as f:
+            data = f.read()
+            profiling.count_read(len(data))
+            return json.loads(data)
+
+    def _write(self, n: int, todos: list[dict], first: bool = False) -> dict:
+        """Writes `todos` to the new shard `n` and returns its manifest entry."""
+        data = json.dumps(todos, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        with profiling.phase("write shard"), open(self._filepath(n), "wb") as f:
+            f.write(data)
+            f.flush()
+            profiling.count_written(len(data))
+            os.fsync(f.fileno())
+        return {
+            "n": n,
+            "first": "" if first or not todos else todos[0]["id"],
+            "todos": len(todos),
+            "open": sum(1 for todo in todos if not todo.get("done")),
+        }
+
+    def _filepath(self, n: int) -> Path:
+        return self.root / f"{self.space}_todo.{n}.shard"
+
+
+def _ranges(records: Iterable[dict], firsts: list[str]) -> list[tuple[str, str | None]]:
+    """
+    Returns the id ranges that cover the shards `records` touch.
+
+    Each range spans at most `MAX_LOADED_SHARDS` touched shards, and the last
+    one has no upper bound.
+    """
+    touched = set()
+    for record in records:
+        if record.get("op") == oplog.ADD:
+            ids = [todo["id"] for todo in record["todos"]]
+        else:
+            ids = record.get("ids", [])
+        touched.update(bisect_right(firsts, todo_id) - 1 for todo_id in ids)
+
+    indexes = sorted(touched)
+    ranges = []
+    for start in range(0, len(indexes), MAX_LOADED_SHARDS):
+        group = indexes[start : start + MAX_LOADED_SHARDS]
+        end = group[-1] + 1
+        ranges.append((firsts[group[0]], firsts[end] if end < len(firsts) else None))
+    return ranges
@@ -0,0 +1,300 @@
+"""
+Persisted status index of a space.
+
+A ``<space>_todo.status`` file lists the todos of a space in the order they
+are stored in, which is the order they were created in, each with its done
+flag:
+
+    header | records
+
+Every record is the id, padded to a fixed width, followed by one flag byte, so
+the flags form a column of their own. Listing the open (or the completed)
+todos in creation order is a single walk over the space that picks them with
+that column, through ``itertools.compress``, without decoding a flag per todo
+in Python or sorting anything.
+
+The index is kept up to date a mutation at a time: added todos are appended,
+a status change flips flag bytes in place and counting the open todos among
+some ids is a lookup, so neither needs the space to be loaded. Time-ordered ids
+keep the records sorted by id, which the header records so those lookups are a
+binary search.
+
+The header also holds a stamp of the files the space is read from, their
+inode, size and modification time, as of the last write to the index. An
+index whose stamp no longer matches those files is stale, even when they were
+written within the same mtime tick, since every write to them changes their
+size or replaces them.
+"""
+
+import os
+import struct
+from bisect import bisect_left
+from itertools import chain, compress
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, TypeVar
+
+HEADER = struct.Struct("<4sIIQQq")
+MAGIC = b"TDFD"
+
+SORTED_FLAG = 1
+DONE = b"\x01"
+OPEN = b"\x00"
+# Turns the column of done flags into one of open flags.
+FLIP = bytes.maketrans(OPEN + DONE, DONE + OPEN)
+
+T = TypeVar("T")
+
+
+def entries_of(todos: Iterable[dict]) -> Iterator[tuple[str, bool]]:
+    """Yields the ``(id, done)`` entry of every todo of `todos`."""
+    for todo in todos:
+        yield todo["id"], bool(todo.get("done"))
+
+
+class StatusIndex:
+    def __init__(self, filepath: Path, sources: Sequence[Path] = ()) -> None:
+        self.filepath = filepath
+        self.sources = sources
+
+    def build(self, todo_entries: Iterable[tuple[str, bool]]) -> None:
+        """Replaces the index with `todo_entries`, in the order the todos are stored in."""
+        todo_entries = list(todo_entries)
+        width = max((len(todo_id) for todo_id, _ in todo_entries), default=0)
+        ids = [todo_id for todo_id, _ in todo_entries]
+        is_sorted = all(a < b for a, b in zip(ids, ids[1:]))
+
+        tmp_filepath = self.filepath.with_name(self.filepath.name + ".tmp")
+        with open(tmp_filepath, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    width,
+                    SORTED_FLAG if is_sorted else 0,
+                    len(todo_entries),
+                    sum(1 for _, done in todo_entries if not done),
+                    self.stamp(),
+                )
+            )
+            f.write(_records(todo_entries, width))
+        os.replace(tmp_filepath, self.filepath)
+
+    def entries(self) -> list[tuple[str, bool]]:
+        with open(self.filepath, "rb") as f:
+            data = f.read()
+        view = _Entries(data)
+        return [(view.id(i), view.done(i)) for i in range(view.count)]
+
+    def __len__(self) -> int:
+        with open(self.filepath, "rb") as f:
+            _, _, _, count, _, _ = _unpack(f.read(HEADER.size))
+        return count
+
+    def is_sorted(self) -> bool:
+        """Checks that the records are in id order, as time-ordered ids keep them."""
+        with open(self.filepath, "rb") as f:
+            _, _, flags, _, _, _ = _unpack(f.read(HEADER.size))
+        return bool(flags & SORTED_FLAG)
+
+    def select(
+        self, items: Sequence[T], done: bool | None = None, stamp: int | None = None
+    ) -> Iterator[T]:
+        """
+        Returns `items` open ones first, each group in creation order.
+
+        `items` holds something for each todo in the order they are stored in,
+        usually the todos themselves, read when the sources had `stamp`, by
+        default their current one. Pass `done` to only return the items of
+        open (False) or completed (True) todos.
+
+        Raises:
+            ValueError: The index does not describe `items`, e.g. as the space
+                changed while they were read.
+        """
+        with open(self.filepath, "rb") as f:
+            data = f.read()
+        _, width, _, count, _, index_stamp = _unpack(data)
+        current_stamp = self.stamp()
+        if stamp is None:
+            stamp = current_stamp
+        if count != len(items) or not index_stamp == current_stamp == stamp:
+            raise ValueError(f"{self.filepath} does not describe the todos read")
+        column = data[HEADER.size + width :: width + 1][:count]
+        return chain.from_iterable(
+            compress(items, column if status else column.translate(FLIP))
+            for status in ((False, True) if done is None else (done,))
+        )
+
+    def add(self, todo_entries: Iterable[tuple[str, bool]]) -> None:
+        """
+        Appends the todos of `todo_entries` after the indexed ones.
+
+        A todo that is indexed already keeps its place and only takes the new
+        status, as adding it again to a space does.
+        """
+        todo_entries = list(todo_entries)
+        with open(self.filepath, "r+b") as f:
+            data = f.read()
+            _, width, flags, count, open_count, _ = _unpack(data)
+            view = _Entries(data)
+            found = view.find(todo_id for todo_id, _ in todo_entries)
+
+            new_entries = dict(entry for entry in todo_entries if entry[0] not in found)
+            if any(len(todo_id) > width for todo_id in new_entries):
+                self.build(
+                    [*self._updated(view, found, todo_entries), *new_entries.items()]
+                )
+                return
+
+            open_count += self._set(f, view, found, dict(todo_entries))
+            if new_entries:
+                new_ids = list(new_entries)
+                last_id = view.id(count - 1) if count else ""
+                if not (
+                    last_id < new_ids[0]
+                    and all(a < b for a, b in zip(new_ids, new_ids[1:]))
+                ):
+                    flags &= ~SORTED_FLAG
+                # Records go before the header that counts them, so a crash in
+                # between leaves the previous index intact.
+                f.seek(HEADER.size + count * (width + 1))
+                f.write(_records(new_entries.items(), width))
+                f.truncate()
+                count += len(new_entries)
+                open_count += sum(1 for done in new_entries.values() if not done)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, width, flags, count, open_count, self.stamp()))
+
+    def set_done(self, todo_ids: Iterable[str], done: bool) -> None:
+        """Sets the status of every indexed todo of `todo_ids` in place."""
+        with open(self.filepath, "r+b") as f:
+            data = f.read()
+            _, width, flags, count, open_count, _ = _unpack(data)
+            view = _Entries(data)
+            found = view.find(todo_ids)
+            open_count += self._set(f, view, found, dict.fromkeys(found, done))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, width, flags, count, open_count, self.stamp()))
+
+    def remove(self, todo_ids: Iterable[str]) -> None:
+        removed = set(todo_ids)
+        self.build(entry for entry in self.entries() if entry[0] not in removed)
+
+    def counts(self, todo_ids: Iterable[str]) -> tuple[int, int]:
+        """Returns how many of `todo_ids` are indexed as open and how many as done."""
+        with open(self.filepath, "rb") as f:
+            data = f.read()
+        view = _Entries(data)
+        done = [view.done(i) for i in view.find(todo_ids).values()]
+        return done.count(False), done.count(True)
+
+    def stamp(self) -> int:
+        """Returns the stamp of the sources of the index as they are now."""
+        return stamp_of(self.sources)
+
+    def is_fresh(self) -> bool:
+        """Checks that the index was last written when the sources were as they are now."""
+        try:
+            with open(self.filepath, "rb") as f:
+                _, _, _, _, _, stamp = _unpack(f.read(HEADER.size))
+        except (FileNotFoundError, ValueError):
+            return False
+        return stamp == self.stamp()
+
+    def touch(self) -> None:
+        """Marks the index as up to date with the sources without rewriting it."""
+        with open(self.filepath, "r+b") as f:
+            header = _unpack(f.read(HEADER.size))
+            f.seek(0)
+            f.write(HEADER.pack(*header[:-1], self.stamp()))
+
+    def clear(self) -> None:
+        self.filepath.unlink(missing_ok=True)
+
+    def _set(self, f, view: "_Entries", found: dict[str, int], status: dict) -> int:
+        """Writes the flag of every todo in `found` and returns the change in open todos."""
+        change = 0
+        for todo_id, i in found.items():
+            done = status[todo_id]
+            if view.done(i) != done:
+                f.seek(HEADER.size + i * (view.width + 1) + view.width)
+                f.write(DONE if done else OPEN)
+                change += -1 if done else 1
+        return change
+
+    def _updated(
+        self,
+        view: "_Entries",
+        found: dict[str, int],
+        todo_entries: list[tuple[str, bool]],
+    ) -> Iterator[tuple[str, bool]]:
+        status = {todo_id: done for todo_id, done in todo_entries if todo_id in found}
+        for i in range(view.count):
+            todo_id = view.id(i)
+            yield todo_id, status.get(todo_id, view.done(i))
+
+
+class _Entries:
+    """Sequence view over the ids of the fixed-width records of an index."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        _, self.width, self.flags, self.count, _, _ = _unpack(data)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = HEADER.size + i * (self.width + 1)
+        return self.data[start : start + self.width].rstrip(b"\0")
+
+    def id(self, i: int) -> str:
+        return self[i].decode("ascii")
+
+    def done(self, i: int) -> bool:
+        return self.data[HEADER.size + i * (self.width + 1) + self.width] == DONE[0]
+
+    def find(self, todo_ids: Iterable[str]) -> dict[str, int]:
+        """Returns the position of every indexed id of `todo_ids`."""
+        if not self.flags & SORTED_FLAG:
+            wanted = set(todo_ids)
+            return {
+                todo_id: i
+                for i in range(self.count)
+                if (todo_id := self.id(i)) in wanted
+            }
+
+        found = {}
+        for todo_id in todo_ids:
+            needle = todo_id.encode("ascii", errors="replace")
+            i = bisect_left(self, needle)
+            if i < self.count and self[i] == needle:
+                found[todo_id] = i
+        return found
+
+
+def stamp_of(filepaths: Iterable[Path]) -> int:
+    """Returns a stamp of `filepaths` that changes with every write to them."""
+    return hash(tuple(_file_stamp(filepath) for filepath in filepaths))
+
+
+def _unpack(data: bytes) -> tuple:
+    """Returns the header fields at the start of `data`."""
+    if len(data) < HEADER.size or data[:4] != MAGIC:
+        raise ValueError("Not a status index")
+    return HEADER.unpack_from(data)
+
+
+def _file_stamp(filepath: Path) -> tuple[int, int, int]:
+    # Only ints, whose hash is the same in every process.
+    try:
+        stat = filepath.stat()
+    except FileNotFoundError:
+        return 0, 0, 0
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _records(todo_entries: Iterable[tuple[str, bool]], width: int) -> bytes:
+    return b"".join(
+        todo_id.encode("ascii").ljust(width, b"\0") + (DONE if done else OPEN)
+        for todo_id, done in todo_entries
+    )
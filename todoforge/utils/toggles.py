@@ -0,0 +1,180 @@
+"""
+Journal of the toggles made in the ``tdf toggle`` menu.
+
+Each toggle is appended to a journal of its own menu session, in the
+``toggles`` folder, as a JSON line holding the space, the todo id and the
+status the todo was set to. A flusher thread applies what was appended to the
+space every `FLUSH_INTERVAL` seconds, with one update per status, so the curses
+input loop only ever writes a line and never waits for the space. The journal
+is deleted once the menu closes and every toggle in it was applied.
+
+Lines hold the status a todo was set to rather than a flip, so applying them
+twice changes nothing. A session holds a lock on its journal while it runs,
+and ``recover``, which ``init_folders`` calls before every command, applies and
+deletes the journals no running session holds, e.g. after the terminal was
+closed mid-session.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from todoforge.utils.backends import get_backend
+from todoforge.utils.constants import DEFAULT_TODO_FOLDER
+from todoforge.utils.db import update_todos
+from todoforge.utils.locking import try_lock
+
+TOGGLES_DIRNAME = "toggles"
+JOURNAL_SUFFIX = ".journal"
+FLUSH_INTERVAL = 0.25
+
+
+class ToggleJournal:
+    def __init__(
+        self,
+        space: str,
+        root: Path = DEFAULT_TODO_FOLDER,
+        interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.space = space
+        self.dirpath = root / TOGGLES_DIRNAME
+        self.interval = interval
+        self.filepath: Path | None = None
+        self.error: Exception | None = None
+        self._fd = -1
+        self._offset = 0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ToggleJournal":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Creates the journal and starts flushing it in the background."""
+        import tempfile
+
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        # The journal is locked before it takes a name ``recover`` looks at.
+        self._fd, tmp_filepath = tempfile.mkstemp(
+            prefix=".", suffix=".tmp", dir=self.dirpath
+        )
+        tmp_filepath = Path(tmp_filepath)
+        if not try_lock(self._fd):
+            os.close(self._fd)
+            tmp_filepath.unlink(missing_ok=True)
+            raise OSError(f"Could not lock the toggle journal {tmp_filepath}")
+        self.filepath = tmp_filepath.with_name(tmp_filepath.stem[1:] + JOURNAL_SUFFIX)
+        tmp_filepath.rename(self.filepath)
+        self._thread = threading.Thread(
+            target=self._run, name="toggle-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, todo_id: str, done: bool) -> None:
+        """Records that the todo `todo_id` was set to `done`."""
+        line = json.dumps({"space": self.space, "id": todo_id, "done": done}) + "\n"
+        os.write(self._fd, line.encode("utf-8"))
+
+    def flush(self) -> int:
+        """Applies the toggles appended since the last flush and returns how many."""
+        data = os.pread(
+            self._fd, os.fstat(self._fd).st_size - self._offset, self._offset
+        )
+        # A line is only complete once its newline was written.
+        data = data[: data.rfind(b"\n") + 1]
+        if not data:
+            return 0
+
+        toggles = _read(data)
+        for space, statuses in toggles.items():
+            _apply(space, statuses)
+        self._offset += len(data)
+        return sum(len(statuses) for statuses in toggles.values())
+
+    def close(self) -> None:
+        """
+        Stops the flusher, applies the last toggles and deletes the journal.
+
+        Raises:
+            Exception: What kept the flusher from applying toggles. The journal
+                is kept, so the next command applies them again.
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            if self.error is None:
+                self.flush()
+                self.filepath.unlink(missing_ok=True)
+        finally:
+            os.close(self._fd)
+        if self.error is not None:
+            raise self.error
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.error = e
+                return
+
+
+def recover(root: Path = DEFAULT_TODO_FOLDER) -> int:
+    """Applies the journals of sessions that ended without closing them, and returns how many."""
+    dirpath = root / TOGGLES_DIRNAME
+    try:
+        names = os.listdir(dirpath)
+    except FileNotFoundError:
+        return 0
+
+    recovered = 0
+    for name in names:
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        filepath = dirpath / name
+        try:
+            fd = os.open(filepath, os.O_RDONLY)
+        except FileNotFoundError:
+            # Another process recovered it, or its session just ended.
+            continue
+        try:
+            if not try_lock(fd):
+                continue
+            with open(fd, "rb", closefd=False) as f:
+                data = f.read()
+            # A torn write can only ever be the last line of the journal.
+            for space, statuses in _read(data[: data.rfind(b"\n") + 1]).items():
+                _apply(space, statuses)
+            filepath.unlink(missing_ok=True)
+            recovered += 1
+        finally:
+            os.close(fd)
+    return recovered
+
+
+def _read(data: bytes) -> dict[str, dict[str, bool]]:
+    """Returns the last status set for each todo of the journal lines in `data`, by space."""
+    toggles: dict[str, dict[str, bool]] = {}
+    for line in data.splitlines():
+        toggle = json.loads(line)
+        toggles.setdefault(toggle["space"], {})[toggle["id"]] = toggle["done"]
+    return toggles
+
+
+def _apply(space: str, statuses: dict[str, bool]) -> None:
+    backend = get_backend()
+    with backend.lock(space):
+        if not backend.has_space(space):
+            return
+        for done in (True, False):
+            todo_ids = [i for i, status in statuses.items() if status is done]
+            if todo_ids:
+                update_todos(todo_ids, {"done": done}, space=space)
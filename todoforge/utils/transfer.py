@@ -0,0 +1,75 @@
+"""
+Streaming NDJSON and CSV formats for `tdf export` and `tdf import`.
+
+Records are read and written one at a time through generators, so moving a
+space of any size in or out only ever holds the record at hand. CSV files have
+an ``id,title,done,created_at`` header, and empty cells count as missing.
+
+This module is imported by every ``tdf`` command, so ``csv`` is only imported
+when a CSV file is read or written.
+"""
+
+import json
+from enum import Enum
+from typing import Iterable, Iterator, TextIO
+
+
+class TransferFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+CSV_FIELDS = ("id", "title", "done", "created_at")
+
+
+def read_records(file: TextIO, transfer_format: TransferFormat) -> Iterator[dict]:
+    """
+    Yields the records of `file` one at a time.
+
+    Raises:
+        ValueError: If an NDJSON line is not a JSON object.
+    """
+    if transfer_format is TransferFormat.csv:
+        import csv
+
+        for row in csv.DictReader(file):
+            yield {
+                field: value
+                for field, value in row.items()
+                if field is not None and value not in (None, "")
+            }
+        return
+
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number} is not valid JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number} is not a JSON object.")
+        yield record
+
+
+def write_records(
+    todos: Iterable[dict], transfer_format: TransferFormat, file: TextIO
+) -> int:
+    """Streams `todos` to `file` in `transfer_format` and returns how many were written."""
+    count = 0
+    if transfer_format is TransferFormat.csv:
+        import csv
+
+        writer = csv.DictWriter(
+            file, fieldnames=CSV_FIELDS, extrasaction="ignore", lineterminator="\n"
+        )
+        writer.writeheader()
+        for todo in todos:
+            writer.writerow({**todo, "done": str(bool(todo.get("done"))).lower()})
+            count += 1
+        return count
+
+    for todo in todos:
+        file.write(json.dumps(todo, sort_keys=True) + "\n")
+        count += 1
+    return count
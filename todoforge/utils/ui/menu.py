@@ -4,10 +4,82 @@ Interactive menu to select items
 """
 
 import curses
+from bisect import bisect_left, insort
 
 EXIT_KEYS = [113, 27, 127, 10]
 SPACE_KEY = 32
 
+TITLE_Y = 2
+OFFSET_Y = 5
+FOOTER_HEIGHT = 6
+HELP_TEXT_X = 21
+
+
+class MenuState:
+    """
+    Cursor, viewport and sort order of the menu, kept apart from curses.
+
+    Items are shown open first, then done, each group in list order. The order
+    is kept as two sorted lists of item indices, so toggling an item moves one
+    index between them instead of re-sorting every item.
+    """
+
+    def __init__(self, items: list[dict], height: int = 10) -> None:
+        self.items = items
+        self.open = [i for i, item in enumerate(items) if not item.get("done")]
+        self.done = [i for i, item in enumerate(items) if item.get("done")]
+        self.current_pos = 0
+        self.top = 0
+        self.height = max(1, height)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def item_index(self, pos: int) -> int:
+        """Returns the index in `items` of the item shown at `pos`."""
+        if pos < len(self.open):
+            return self.open[pos]
+        return self.done[pos - len(self.open)]
+
+    def visible(self) -> range:
+        return range(self.top, min(self.top + self.height, len(self)))
+
+    def resize(self, height: int) -> None:
+        self.height = max(1, height)
+        self._scroll_to_cursor()
+
+    def move(self, delta: int, wrap: bool = True) -> None:
+        if not self.items:
+            return
+        pos = self.current_pos + delta
+        if wrap and abs(delta) == 1:
+            pos %= len(self)
+        self.current_pos = min(max(pos, 0), len(self) - 1)
+        self._scroll_to_cursor()
+
+    def move_to(self, pos: int) -> None:
+        self.move(pos - self.current_pos, wrap=False)
+
+    def toggled(self, item_index: int, items: list[dict]) -> None:
+        """Moves `item_index` to the group matching its new done state."""
+        self.items = items
+        source, target = (
+            (self.open, self.done)
+            if items[item_index].get("done")
+            else (self.done, self.open)
+        )
+        i = bisect_left(source, item_index)
+        if i < len(source) and source[i] == item_index:
+            del source[i]
+            insort(target, item_index)
+
+    def _scroll_to_cursor(self) -> None:
+        if self.current_pos < self.top:
+            self.top = self.current_pos
+        elif self.current_pos >= self.top + self.height:
+            self.top = self.current_pos - self.height + 1
+        self.top = max(0, min(self.top, len(self) - self.height))
+
 
 def show_options(
     title="TodoForge List",
@@ -15,10 +87,10 @@ def show_options(
     items=[],
     callback=None,
 ):
-    screen = curses.initscr()
+    if len(items) == 0:
+        return items
 
-    def checked(todo):
-        return todo.get("done")
+    screen = curses.initscr()
 
     try:
         curses.start_color()
@@ -39,65 +111,96 @@ def show_options(
         curses.init_pair(3, curses.COLOR_WHITE, -1)
         info_style = curses.color_pair(3)
 
-        current_pos = 0
-        offset_y = 5
+        state = MenuState(items, height=_list_height(screen))
+        # What is currently drawn on each row, so only rows that changed are
+        # redrawn after a keypress.
+        drawn: dict[int, tuple] = {}
+
+        def draw_line(y, segments):
+            if drawn.get(y) == segments:
+                return
+            drawn[y] = segments
+            height, width = screen.getmaxyx()
+            if y >= height:
+                return
+            screen.move(y, 0)
+            screen.clrtoeol()
+            for x, text, attr in segments:
+                if x < width - 1:
+                    try:
+                        screen.addstr(y, x, text[: width - 1 - x], attr)
+                    except curses.error:
+                        pass
 
         while True:
-            items_sorted = sorted(items, key=checked)
-
-            no_items = len(items) if len(items) < 10 else 10
-            if no_items == 0:
-                return items
-
-            screen.refresh()
-
-            screen.addstr(2, 7, title, curses.A_BOLD | highlighted)
-            screen.addstr(3, 7, subtitle, subtitle_style)
-
-            pos = 0
-
-            for item in items_sorted[:10]:
-                is_done = item.get("done")
-                status = " ✓ " if is_done else " x "
-
-                if pos == current_pos:
-                    screen.addstr(
-                        pos + offset_y,
-                        4,
-                        "❯ {}  {}".format(status, item["title"]),
-                        highlighted,
-                    )
+            draw_line(TITLE_Y, ((7, title, curses.A_BOLD | highlighted),))
+            draw_line(TITLE_Y + 1, ((7, subtitle, subtitle_style),))
+
+            rows = state.visible()
+            for y, pos in enumerate(rows, OFFSET_Y):
+                item = state.items[state.item_index(pos)]
+                status = " ✓ " if item.get("done") else " x "
+                if pos == state.current_pos:
+                    line = (4, "❯ {}  {}".format(status, item["title"]), highlighted)
                 else:
-                    screen.addstr(
-                        pos + offset_y, 4, "  {}  {}".format(status, item["title"])
-                    )
-
-                pos += 1
-
-            if len(items) > 10:
-                screen.addstr(pos + offset_y, 4, "   ...", info_style)
-
-            screen.addstr(pos + offset_y + 3, 7, "<SPACE>", curses.A_BOLD | info_style)
-            screen.addstr(pos + offset_y + 3, 18, "to toggle", info_style)
-
-            screen.addstr(pos + offset_y + 4, 7, "<k, j>", curses.A_BOLD | info_style)
-            screen.addstr(pos + offset_y + 4, 18, "navigate up and down", info_style)
-
-            screen.addstr(pos + offset_y + 5, 7, "<q>", curses.A_BOLD | info_style)
-            screen.addstr(pos + offset_y + 5, 18, "to exit", info_style)
+                    line = (4, "  {}  {}".format(status, item["title"]), 0)
+                draw_line(y, (line,))
+
+            y = OFFSET_Y + len(rows)
+
+            hidden_above, hidden_below = rows.start, len(state) - rows.stop
+            if hidden_above or hidden_below:
+                more = f"   ... {hidden_above} above, {hidden_below} below"
+                draw_line(y, ((4, more, info_style),))
+            else:
+                draw_line(y, ())
+
+            for help_y, (keys, text) in enumerate(
+                (
+                    ("<SPACE>", "to toggle"),
+                    ("<k, j>", "navigate up and down"),
+                    ("<PgUp, PgDn>", "scroll a page, <g, G> jump to first or last"),
+                    ("<q>", "to exit"),
+                ),
+                y + 2,
+            ):
+                draw_line(
+                    help_y,
+                    (
+                        (7, keys, curses.A_BOLD | info_style),
+                        (HELP_TEXT_X, text, info_style),
+                    ),
+                )
 
+            screen.refresh()
             key = screen.getch()
 
-            screen.erase()
-
             if key in (curses.KEY_DOWN, ord("j")):
-                current_pos = current_pos + 1 if current_pos + 1 < no_items else 0
+                state.move(1)
             elif key in (curses.KEY_UP, ord("k")):
-                current_pos = current_pos - 1 if current_pos > 0 else no_items - 1
+                state.move(-1)
+            elif key == curses.KEY_NPAGE:
+                state.move(state.height, wrap=False)
+            elif key == curses.KEY_PPAGE:
+                state.move(-state.height, wrap=False)
+            elif key in (curses.KEY_HOME, ord("g")):
+                state.move_to(0)
+            elif key in (curses.KEY_END, ord("G")):
+                state.move_to(len(state) - 1)
             elif key == SPACE_KEY:
-                item_index = items.index(items_sorted[current_pos])
-                items = callback(items, item_index)
+                item_index = state.item_index(state.current_pos)
+                state.toggled(item_index, callback(state.items, item_index))
+            elif key == curses.KEY_RESIZE:
+                curses.update_lines_cols()
+                state.resize(_list_height(screen))
+                screen.erase()
+                drawn.clear()
             elif key in EXIT_KEYS:
-                return items
+                return state.items
     finally:
         curses.endwin()
+
+
+def _list_height(screen) -> int:
+    height, _ = screen.getmaxyx()
+    return height - OFFSET_Y - FOOTER_HEIGHT